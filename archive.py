@@ -0,0 +1,166 @@
+"""Archivierung alter Bestellungen und Kontakte.
+
+Bestellungen (inkl. Positionen) und Kontakte, die älter als ``ARCHIVE_AFTER_DAYS``
+sind, werden batchweise per ``INSERT ... SELECT`` in die Archivtabellen kopiert
+und danach aus den Live-Tabellen gelöscht. Der Umsatz archivierter Bestellungen
+wird dabei in ``archived_revenue`` aufsummiert, sodass die Kunden-KPIs weiterhin
+stimmen, ohne das Archiv lesen zu müssen.
+"""
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert, delete, select
+
+from fx import convert_cents
+from http_cache import LISTS, bump, customer_key
+from models import (
+    db, Order, OrderItem, Contact,
+    ArchivedOrder, ArchivedOrderItem, ArchivedContact, ArchivedRevenue,
+)
+
+
+DEFAULT_ARCHIVE_AFTER_DAYS = 730
+DEFAULT_BATCH_SIZE = 500
+
+ORDER_COLUMNS = ["id", "customer_id", "order_number", "order_date", "status",
+                 "total_amount_cents", "currency", "created_at"]
+ORDER_ITEM_COLUMNS = ["id", "order_id", "product_id", "quantity", "unit_price_cents"]
+CONTACT_COLUMNS = ["id", "customer_id", "user_id", "channel", "subject", "notes",
+                   "rating", "contact_at", "created_at"]
+
+
+def _columns(model, names):
+    return [getattr(model, name) for name in names]
+
+
+def _add_revenue(order_ids):
+    """Addiert den Umsatz der übergebenen Bestellungen auf ``archived_revenue``."""
+    year = db.extract("year", Order.order_date)
+    month = db.extract("month", Order.order_date)
+    rows = db.session.execute(
+        select(
+            Order.customer_id, year, month, Order.currency,
+            db.func.sum(Order.total_amount_cents), db.func.count(Order.id),
+        )
+        .where(Order.id.in_(order_ids), Order.status != "storniert")
+        .group_by(Order.customer_id, year, month, Order.currency)
+    ).all()
+
+    for customer_id, y, m, currency, revenue_cents, count in rows:
+        key = (customer_id, int(y), int(m), currency)
+        agg = db.session.get(ArchivedRevenue, key)
+        if agg is None:
+            agg = ArchivedRevenue(
+                customer_id=customer_id, year=int(y), month=int(m),
+                currency=currency, revenue_cents=0, order_count=0,
+            )
+            db.session.add(agg)
+        agg.revenue_cents = (agg.revenue_cents or 0) + (revenue_cents or 0)
+        agg.order_count = (agg.order_count or 0) + count
+
+
+def archive_orders(cutoff: datetime, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Verschiebt Bestellungen vor ``cutoff`` samt Positionen ins Archiv."""
+    moved = 0
+    while True:
+        rows = db.session.execute(
+            select(Order.id, Order.customer_id)
+            .where(Order.order_date < cutoff)
+            .order_by(Order.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        order_ids = [row.id for row in rows]
+
+        _add_revenue(order_ids)
+
+        db.session.execute(
+            insert(ArchivedOrder).from_select(
+                ORDER_COLUMNS,
+                select(*_columns(Order, ORDER_COLUMNS)).where(Order.id.in_(order_ids)),
+            )
+        )
+        db.session.execute(
+            insert(ArchivedOrderItem).from_select(
+                ORDER_ITEM_COLUMNS,
+                select(*_columns(OrderItem, ORDER_ITEM_COLUMNS))
+                .where(OrderItem.order_id.in_(order_ids)),
+            )
+        )
+        db.session.execute(delete(OrderItem).where(OrderItem.order_id.in_(order_ids)))
+        db.session.execute(delete(Order).where(Order.id.in_(order_ids)))
+
+        # Ein Commit pro Batch hält Sperren kurz
+        db.session.commit()
+        bump(LISTS, *(customer_key(row.customer_id) for row in rows))
+        moved += len(order_ids)
+    return moved
+
+
+def archive_contacts(cutoff: datetime, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Verschiebt Kontakte vor ``cutoff`` ins Archiv."""
+    moved = 0
+    while True:
+        rows = db.session.execute(
+            select(Contact.id, Contact.customer_id)
+            .where(Contact.contact_at < cutoff)
+            .order_by(Contact.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        contact_ids = [row.id for row in rows]
+
+        db.session.execute(
+            insert(ArchivedContact).from_select(
+                CONTACT_COLUMNS,
+                select(*_columns(Contact, CONTACT_COLUMNS)).where(Contact.id.in_(contact_ids)),
+            )
+        )
+        db.session.execute(delete(Contact).where(Contact.id.in_(contact_ids)))
+
+        db.session.commit()
+        bump(LISTS, *(customer_key(row.customer_id) for row in rows))
+        moved += len(contact_ids)
+    return moved
+
+
+def archive_old_data(days: int = DEFAULT_ARCHIVE_AFTER_DAYS,
+                     batch_size: int = DEFAULT_BATCH_SIZE) -> tuple[int, int]:
+    """Archiviert alles, was älter als ``days`` Tage ist. Gibt (Bestellungen, Kontakte) zurück."""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    return archive_orders(cutoff, batch_size), archive_contacts(cutoff, batch_size)
+
+
+# ------------------ Read-Through für KPIs ------------------
+def archived_revenue(customer_id: int, currency: str, year: int | None = None) -> tuple[int, int]:
+    """Archivierter Umsatz eines Kunden in Cent, umgerechnet in ``currency``.
+
+    Die Monats-Aggregate werden mit dem Kurs zum Monatsende umgerechnet.
+    Gibt ``(Cent, Anzahl Bestellungen ohne Kurs)`` zurück.
+    """
+    query = select(
+        ArchivedRevenue.year, ArchivedRevenue.month, ArchivedRevenue.currency,
+        ArchivedRevenue.revenue_cents, ArchivedRevenue.order_count,
+    ).where(ArchivedRevenue.customer_id == customer_id)
+    if year is not None:
+        query = query.where(ArchivedRevenue.year == year)
+
+    total = missing = 0
+    for y, m, source_currency, cents, order_count in db.session.execute(query):
+        month_end = date(y + m // 12, m % 12 + 1, 1) - timedelta(days=1)
+        converted = convert_cents(cents, source_currency, currency, month_end)
+        if converted is None:
+            missing += order_count
+        else:
+            total += converted
+    return total, missing
+
+
+def last_archived_contact(customer_id: int):
+    """Letzter archivierter Kontakt – Fallback, wenn keine Live-Kontakte existieren."""
+    return (
+        ArchivedContact.query.filter_by(customer_id=customer_id)
+        .order_by(ArchivedContact.contact_at.desc())
+        .first()
+    )
@@ -0,0 +1,297 @@
+"""Append-only Audit-Log für Kunden, Bestellungen und Kontakte.
+
+Ablauf:
+1. ``before_flush`` erfasst die Feld-Diffs der geänderten Objekte (danach ist
+   die History von SQLAlchemy zurückgesetzt).
+2. ``after_flush_postexec`` ergänzt die jetzt vergebenen IDs.
+3. ``after_commit`` übergibt die Einträge an einen In-Memory-Puffer,
+   ``after_rollback`` verwirft sie.
+4. Ein Hintergrund-Thread schreibt den Puffer per Batch-Insert in ``audit_log``.
+
+Der Request selbst macht dadurch keinen zusätzlichen Datenbank-Roundtrip.
+"""
+import atexit
+import json
+import threading
+from collections import deque
+from datetime import datetime
+
+from flask import has_request_context
+from flask_login import current_user
+from sqlalchemy import event, insert, inspect, select
+from sqlalchemy.exc import DataError, IntegrityError
+
+from models import db, Customer, Order, Contact, AuditLog
+
+
+AUDITED_MODELS = {Customer: "customer", Order: "order", Contact: "contact"}
+
+# Felder, die sich ohnehin bei jedem Update ändern
+IGNORED_FIELDS = {"updated_at"}
+
+PENDING_KEY = "audit_pending"
+
+
+# ------------------ Diff-Erfassung ------------------
+def _json_value(value):
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _diff(obj, include_unchanged=False) -> dict:
+    """Geänderte Spalten als ``{feld: [alt, neu]}``."""
+    state = inspect(obj)
+    changes = {}
+    for attr in state.mapper.column_attrs:
+        key = attr.key
+        if key in IGNORED_FIELDS:
+            continue
+        hist = state.attrs[key].history
+        if hist.has_changes():
+            old = hist.deleted[0] if hist.deleted else None
+            new = hist.added[0] if hist.added else None
+            changes[key] = [_json_value(old), _json_value(new)]
+        elif include_unchanged:
+            value = getattr(obj, key)
+            if value is not None:
+                changes[key] = [None, _json_value(value)]
+    return changes
+
+
+def _current_user_id():
+    if has_request_context() and current_user and current_user.is_authenticated:
+        return current_user.id
+    return None
+
+
+def _before_flush(session, flush_context, instances):
+    pending = session.info.setdefault(PENDING_KEY, [])
+    user_id = _current_user_id()
+
+    for obj in session.new:
+        if type(obj) in AUDITED_MODELS:
+            pending.append([obj, "insert", _diff(obj, include_unchanged=True), user_id])
+
+    for obj in session.dirty:
+        if type(obj) in AUDITED_MODELS and session.is_modified(obj, include_collections=False):
+            changes = _diff(obj)
+            if not changes:
+                continue
+            action = "update"
+            if "deleted_at" in changes:
+                action = "soft_delete" if changes["deleted_at"][1] else "restore"
+            pending.append([obj, action, changes, user_id])
+
+    for obj in session.deleted:
+        if type(obj) in AUDITED_MODELS:
+            pending.append([obj, "delete", {}, user_id])
+
+
+def _after_flush_postexec(session, flush_context):
+    """Wandelt die erfassten Objekte in fertige Zeilen um (IDs sind jetzt bekannt)."""
+    rows = session.info.setdefault("audit_rows", [])
+    now = datetime.utcnow()
+    for obj, action, changes, user_id in session.info.pop(PENDING_KEY, []):
+        customer_id = obj.id if isinstance(obj, Customer) else obj.customer_id
+        rows.append({
+            "entity": AUDITED_MODELS[type(obj)],
+            "entity_id": obj.id,
+            "customer_id": customer_id,
+            "action": action,
+            "changes": json.dumps(changes, ensure_ascii=False),
+            "user_id": user_id,
+            "created_at": now,
+        })
+
+
+def _after_commit(session):
+    rows = session.info.pop("audit_rows", None)
+    if rows:
+        writer.enqueue(rows)
+
+
+def _after_rollback(session):
+    session.info.pop(PENDING_KEY, None)
+    session.info.pop("audit_rows", None)
+
+
+def record_inserts(entity: str, rows: list[dict], user_id: int | None = None) -> None:
+    """Audit-Einträge für per Core eingefügte Zeilen (dort greifen die Session-Events nicht).
+
+    Erst nach dem Commit aufrufen; jede Zeile braucht ``id`` und ``customer_id``.
+    """
+    user_id = user_id or _current_user_id()
+    now = datetime.utcnow()
+    writer.enqueue([
+        {
+            "entity": entity,
+            "entity_id": row["id"],
+            "customer_id": row["customer_id"],
+            "action": "insert",
+            "changes": json.dumps(
+                {key: [None, _json_value(value)] for key, value in row.items()
+                 if value is not None and key not in IGNORED_FIELDS},
+                ensure_ascii=False,
+            ),
+            "user_id": user_id,
+            "created_at": now,
+        }
+        for row in rows
+    ])
+
+
+# ------------------ Gepufferter Writer ------------------
+class AuditWriter:
+    """Sammelt Audit-Zeilen im Speicher und schreibt sie gebündelt in ``audit_log``."""
+
+    def __init__(self):
+        self.app = None
+        self.batch_size = 500
+        self.interval = 2.0
+        self.max_retries = 3
+        self._buffer = deque(maxlen=100_000)
+        self._failures = 0  # Fehlversuche des vordersten Batches in Folge
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._atexit_registered = False
+
+    def init_app(self, app):
+        # Ein Writer je Prozess: er schreibt in die Datenbank der zuletzt initialisierten App
+        self.app = app
+        self.batch_size = app.config.get("AUDIT_BATCH_SIZE", self.batch_size)
+        self.interval = app.config.get("AUDIT_FLUSH_INTERVAL", self.interval)
+        self.max_retries = app.config.get("AUDIT_MAX_RETRIES", self.max_retries)
+        with self._lock:
+            self._buffer = deque(self._buffer, maxlen=app.config.get("AUDIT_MAX_BUFFER", 100_000))
+        if not self._atexit_registered:
+            atexit.register(self._flush_logged)
+            self._atexit_registered = True
+
+    def enqueue(self, rows):
+        # Der Puffer ist begrenzt (maxlen): bei langem DB-Ausfall fallen die ältesten Zeilen heraus
+        overflow = len(self._buffer) + len(rows) - self._buffer.maxlen
+        if overflow > 0 and self.app is not None:
+            self.app.logger.error("Audit-Puffer voll: %d älteste Zeilen verworfen", min(overflow, self._buffer.maxlen))
+        self._buffer.extend(rows)
+        self._ensure_thread()
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            # Nach einem fork() existiert der Thread im Kindprozess nicht mehr
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self._flush_logged()
+
+    def _flush_logged(self):
+        try:
+            self.flush()
+        except Exception as e:
+            self.app.logger.warning(
+                "Audit-Log konnte nicht geschrieben werden (%d Zeilen bleiben gepuffert): %s",
+                len(self._buffer), e,
+            )
+
+    def flush(self):
+        """Schreibt alle gepufferten Zeilen in Batches von ``batch_size``.
+
+        Schlägt ein INSERT fehl, kommt der Batch zurück an den Anfang des Puffers
+        und der Fehler wird weitergereicht; der nächste Lauf versucht es erneut.
+        Nach ``max_retries`` Fehlversuchen wird der Batch halbiert, bis die
+        fehlerhaften Zeilen einzeln feststehen; diese werden geloggt und verworfen.
+        """
+        if self.app is None:
+            return
+        with self._lock:
+            while self._buffer:
+                batch = []
+                while self._buffer and len(batch) < self.batch_size:
+                    batch.append(self._buffer.popleft())
+                if self._failures >= self.max_retries:
+                    self._write_isolating(batch)
+                    self._failures = 0
+                    continue
+                try:
+                    self._write(batch)
+                except Exception:
+                    self._failures += 1
+                    self._buffer.extendleft(reversed(batch))
+                    raise
+                self._failures = 0
+
+    def _write(self, rows):
+        with self.app.app_context():
+            with db.engine.begin() as conn:
+                conn.execute(insert(AuditLog.__table__), rows)
+
+    def _write_isolating(self, batch):
+        """Schreibt ``batch`` in Hälften; nur Zeilen, die einzeln an ihren Daten scheitern, werden verworfen.
+
+        Andere Fehler (Verbindung, fehlende Tabelle) betreffen jede Zeile – dann
+        kommt der noch nicht geschriebene Rest zurück in den Puffer.
+        """
+        parts = [batch]
+        while parts:
+            part = parts.pop()
+            try:
+                self._write(part)
+            except (DataError, IntegrityError) as e:
+                if len(part) == 1:
+                    self.app.logger.error(
+                        "Audit-Zeile verworfen (%s): %s",
+                        e.orig, json.dumps(part[0], default=str, ensure_ascii=False),
+                    )
+                else:
+                    middle = len(part) // 2
+                    parts += [part[middle:], part[:middle]]
+            except Exception:
+                rest = part + [row for pending in reversed(parts) for row in pending]
+                self._buffer.extendleft(reversed(rest))
+                raise
+
+
+writer = AuditWriter()
+
+
+def init_audit(app):
+    """Registriert die Session-Events und den gepufferten Writer."""
+    writer.init_app(app)
+    if not event.contains(db.session, "before_flush", _before_flush):
+        event.listen(db.session, "before_flush", _before_flush)
+        event.listen(db.session, "after_flush_postexec", _after_flush_postexec)
+        event.listen(db.session, "after_commit", _after_commit)
+        event.listen(db.session, "after_rollback", _after_rollback)
+
+
+# ------------------ Lesen ------------------
+def customer_history(customer_id: int, before_id: int | None = None, limit: int = 25):
+    """Audit-Einträge eines Kunden, neueste zuerst, mit Keyset-Pagination über ``id``.
+
+    Gibt ``(einträge, next_before_id)`` zurück; ``next_before_id`` ist ``None`` auf der letzten Seite.
+    """
+    query = (
+        select(AuditLog)
+        .where(AuditLog.customer_id == customer_id)
+        .order_by(AuditLog.id.desc())
+        .limit(limit + 1)
+    )
+    if before_id is not None:
+        query = query.where(AuditLog.id < before_id)
+
+    entries = db.session.scalars(query).all()
+    next_before_id = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        next_before_id = entries[-1].id
+
+    for entry in entries:
+        entry.changed_fields = json.loads(entry.changes)
+    return entries, next_before_id
@@ -0,0 +1,169 @@
+"""Blueprint "auth": Login mit Zwei-Faktor-Code, Logout und Registrierung."""
+import random
+import time
+from datetime import datetime, timedelta
+
+from flask import (
+    Blueprint, current_app, render_template, request, redirect, url_for, flash, session
+)
+from flask_login import login_user, login_required, logout_user, current_user
+
+from extensions import get_mail
+from forms import LoginForm, RegisterForm
+from login_guard import LoginBusy, hash_password, throttle, verify_password
+from metrics import MAIL_SECONDS
+from models import db, User, LoginCode
+
+
+bp = Blueprint("auth", __name__)
+
+
+# ------------------ Hilfsfunktionen ------------------
+def generate_code() -> str:
+    """Erzeuge 5-stelligen Code (mit führenden Nullen möglich)."""
+    return f"{random.randint(0, 99999):05d}"
+
+def send_login_code(email: str, code: str):
+    """Sende Code per E-Mail. Fallback: Log-Ausgabe, wenn Senden scheitert (z. B. Free-Plan)."""
+    start = time.perf_counter()
+    try:
+        # Wenn MAIL_USERNAME nicht gesetzt ist, schicken wir nicht und loggen nur
+        if not current_app.config.get("MAIL_USERNAME"):
+            raise RuntimeError("MAIL_USERNAME nicht gesetzt – Debug-Fallback aktiv.")
+        from flask_mail import Message
+        msg = Message("Dein Anmeldecode", recipients=[email])
+        msg.body = f"Dein Login-Code lautet: {code}\nEr ist 5 Minuten gültig."
+        get_mail().send(msg)
+        MAIL_SECONDS.observe(time.perf_counter() - start, "sent")
+    except Exception as e:
+        MAIL_SECONDS.observe(time.perf_counter() - start, "failed")
+        # Fallback: Code im Log ausgeben
+        print(f"[WARN] Mail konnte nicht gesendet werden: {e}")
+        print(f"[DEBUG] Login-Code fuer {email}: {code}")
+
+def start_2fa_flow(user: User):
+    """Erzeugt Code, speichert ihn und leitet den Verify-Flow ein."""
+    # Alte Codes des Users invalidieren (optional: löschen)
+    LoginCode.query.filter_by(user_id=user.id).delete()
+
+    code = generate_code()
+    expires = datetime.utcnow() + timedelta(minutes=5)
+    db.session.add(LoginCode(user_id=user.id, code=code, expires_at=expires))
+    db.session.commit()
+
+    send_login_code(user.username, code)
+
+    # Merke pending user in Session (nicht eingeloggt!)
+    session["pending_user_id"] = user.id
+    session["pending_next"] = request.args.get("next") if request.args.get("next", "").startswith("/") else None
+
+def too_many_attempts(template: str, form, retry_after: int):
+    """429 mit ``Retry-After`` – es wurde nicht gehasht."""
+    flash(f"Zu viele Versuche. Bitte in {retry_after} Sekunden erneut versuchen.", "error")
+    return render_template(template, form=form), 429, {"Retry-After": str(retry_after)}
+
+def hashing_busy(template: str, form):
+    """503, wenn der Hash-Pool ausgelastet ist (siehe login_guard.py)."""
+    flash("Gerade melden sich sehr viele Benutzer an. Bitte gleich noch einmal versuchen.", "error")
+    return render_template(template, form=form), 503, {"Retry-After": "5"}
+
+# ------------------ Routes ------------------
+@bp.route("/login", methods=["GET", "POST"])
+def login():
+    if current_user.is_authenticated:
+        return redirect(url_for("crm.customers"))
+
+    form = LoginForm()
+    if form.validate_on_submit():
+        username = form.username.data.strip()
+        # Drosseln vor dem (teuren) Hash: je IP und je Benutzername
+        retry_after = throttle(request.remote_addr or "-", username)
+        if retry_after:
+            return too_many_attempts("login.html", form, retry_after)
+        user = User.query.filter_by(username=username).first()
+        try:
+            valid = user is not None and verify_password(user, form.password.data)
+        except LoginBusy:
+            return hashing_busy("login.html", form)
+        if valid:
+            # Schritt 1: 2FA-Code erzeugen und senden
+            start_2fa_flow(user)
+            flash("Wir haben dir einen 5-stelligen Code geschickt. Bitte gib ihn ein.", "info")
+            return redirect(url_for("auth.verify"))
+        flash("Ungültige E-Mail oder Passwort.", "error")
+    return render_template("login.html", form=form)
+
+@bp.route("/verify", methods=["GET", "POST"])
+def verify():
+    pending_id = session.get("pending_user_id")
+    if not pending_id:
+        flash("Sitzung ist abgelaufen. Bitte erneut anmelden.", "error")
+        return redirect(url_for("auth.login"))
+
+    user = User.query.get_or_404(pending_id)
+
+    if request.method == "POST":
+        code_input = (request.form.get("code") or "").strip()
+        record = (
+            LoginCode.query.filter_by(user_id=user.id, code=code_input)
+            .order_by(LoginCode.id.desc())
+            .first()
+        )
+        now = datetime.utcnow()
+
+        if record and record.expires_at > now:
+            # Gültig -> Code nur einmal verwendbar
+            db.session.delete(record)
+            db.session.commit()
+
+            remember = bool(request.form.get("remember") == "y")
+            login_user(user, remember=remember)
+
+            # Aufräumen der Session
+            next_page = session.pop("pending_next", None)
+            session.pop("pending_user_id", None)
+
+            flash("Login erfolgreich!", "success")
+            return redirect(next_page or url_for("crm.customers"))
+        else:
+            flash("Ungültiger oder abgelaufener Code.", "error")
+
+    # Optional: erneuten Versand ermöglichen
+    if request.args.get("resend") == "1":
+        start_2fa_flow(user)
+        flash("Neuer Code gesendet.", "info")
+        return redirect(url_for("auth.verify"))
+
+    return render_template("verify.html", user=user)
+
+@bp.route("/logout")
+@login_required
+def logout():
+    logout_user()
+    flash("Abgemeldet.", "info")
+    return redirect(url_for("auth.login"))
+
+@bp.route("/register", methods=["GET", "POST"])
+def register():
+    # Hinweis: Für Produktion ggf. deaktivieren oder absichern!
+    if current_user.is_authenticated:
+        return redirect(url_for("crm.customers"))
+    form = RegisterForm()
+    if form.validate_on_submit():
+        username = form.username.data.strip().lower()
+        retry_after = throttle(request.remote_addr or "-")
+        if retry_after:
+            return too_many_attempts("register.html", form, retry_after)
+        if User.query.filter_by(username=username).first():
+            flash("E-Mail bereits registriert.", "error")
+        else:
+            try:
+                password_hash = hash_password(form.password.data)
+            except LoginBusy:
+                return hashing_busy("register.html", form)
+            u = User(username=username, password_hash=password_hash)
+            db.session.add(u)
+            db.session.commit()
+            flash("Benutzer angelegt. Bitte anmelden.", "success")
+            return redirect(url_for("auth.login"))
+    return render_template("register.html", form=form)
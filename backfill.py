@@ -0,0 +1,203 @@
+"""Online-Backfills: große Datenänderungen in kleinen Primärschlüssel-Chunks.
+
+Ein ``UPDATE orders SET …`` über Millionen Zeilen in der Transaktion einer
+Migration sperrt die Tabelle für Minuten. Ein Backfill läuft stattdessen
+
+- in Chunks von ``BACKFILL_BATCH_SIZE`` Zeilen nach Primärschlüssel, je Chunk
+  eine kurze Transaktion,
+- gedrosselt: ``BACKFILL_PAUSE_SECONDS`` Pause nach jedem Chunk, höchstens
+  ``BACKFILL_MAX_ROWS_PER_SECOND`` Zeilen je Sekunde (0 = unbegrenzt),
+- mit Checkpoint in ``backfill_progress`` (im selben Commit wie der Chunk) –
+  ein abgebrochener Lauf macht beim nächsten Start dort weiter,
+- mit Fortschritt und Durchsatz alle ``REPORT_SECONDS`` Sekunden.
+
+Bearbeitet werden nur Zeilen bis zum größten Primärschlüssel beim Start; neuere
+schreibt die App bereits richtig. Backfills müssen idempotent sein (``where``,
+z. B. ``spalte IS NULL``), weil ein Chunk nach einem Abbruch erneut laufen kann.
+
+Starten mit ``flask backfill <name>`` (auf jedem Shard) oder aus einer
+Alembic-Revision (ab ``a1c7e5f3b920``)::
+
+    from backfill import run_from_migration
+
+    def upgrade():
+        with op.batch_alter_table('orders') as batch_op:
+            batch_op.add_column(sa.Column('item_count', sa.Integer(), nullable=True))
+        run_from_migration('orders_item_count')
+
+Neue Backfills mit ``register()`` am Ende dieses Moduls anlegen. Tabellen
+werden dort mit ``sa.table()`` beschrieben statt über die Modelle – so passt
+der Backfill auch zu älteren Revisionen, in denen das Modell schon weiter ist.
+"""
+import time
+from datetime import datetime
+from typing import NamedTuple
+
+import sqlalchemy as sa
+from flask import current_app
+from sqlalchemy import delete, func, insert, select, update
+
+from models import BackfillProgress
+
+REPORT_SECONDS = 5
+
+BACKFILLS = {}
+
+
+class Backfill(NamedTuple):
+    name: str
+    table: sa.TableClause
+    values: dict  # Spalte → SQL-Ausdruck
+    where: tuple  # nur Zeilen, die noch fehlen
+    pk: str
+    description: str
+
+
+def register(name: str, table: sa.TableClause, values: dict, where=(), pk: str = "id",
+             description: str = "") -> Backfill:
+    """Meldet einen Backfill an: ``UPDATE table SET values WHERE where`` je Chunk."""
+    job = Backfill(name, table, values, tuple(where), pk, description)
+    BACKFILLS[name] = job
+    return job
+
+
+# ------------------ Checkpoints ------------------
+def status(engine) -> dict:
+    """``{Name: Zeile aus backfill_progress}`` einer Datenbank."""
+    progress = BackfillProgress.__table__
+    with engine.connect() as conn:
+        return {row.name: row for row in conn.execute(select(progress))}
+
+
+def _start(conn, job: Backfill, restart: bool):
+    """Liest bzw. legt den Checkpoint an: ``(last_id, max_id, finished_at)``."""
+    progress = BackfillProgress.__table__
+    row = conn.execute(select(progress).where(progress.c.name == job.name)).first()
+    if row is not None and not restart:
+        return row.last_id, row.max_id, row.finished_at
+
+    now = datetime.utcnow()
+    max_id = conn.scalar(select(func.max(job.table.c[job.pk])))
+    conn.execute(delete(progress).where(progress.c.name == job.name))
+    conn.execute(insert(progress).values(
+        name=job.name, last_id=None, max_id=max_id, rows_scanned=0, rows_updated=0,
+        started_at=now, updated_at=now, finished_at=now if max_id is None else None,
+    ))
+    return None, max_id, now if max_id is None else None
+
+
+# ------------------ Ausführen ------------------
+def run_backfill(name: str, engine, batch_size: int | None = None, pause: float | None = None,
+                 max_rate: float | None = None, restart: bool = False, shard: int | None = None) -> dict:
+    """Führt den Backfill ``name`` auf ``engine`` aus bzw. setzt ihn fort.
+
+    Gibt ``{"rows", "updated", "seconds"}`` dieses Laufs zurück. Ohne Angaben
+    gelten ``BACKFILL_BATCH_SIZE``, ``BACKFILL_PAUSE_SECONDS`` und
+    ``BACKFILL_MAX_ROWS_PER_SECOND``.
+    """
+    config = current_app.config
+    batch_size = batch_size or config["BACKFILL_BATCH_SIZE"]
+    pause = config["BACKFILL_PAUSE_SECONDS"] if pause is None else pause
+    max_rate = config["BACKFILL_MAX_ROWS_PER_SECOND"] if max_rate is None else max_rate
+    job = BACKFILLS[name]
+    label = f"Backfill {name}" if shard is None else f"Backfill {name} (Shard {shard})"
+    progress = BackfillProgress.__table__
+    pk = job.table.c[job.pk]
+
+    with engine.begin() as conn:
+        last_id, max_id, finished_at = _start(conn, job, restart)
+        if finished_at is None:
+            remaining = conn.scalar(
+                select(func.count()).select_from(job.table)
+                .where(pk <= max_id, *([pk > last_id] if last_id is not None else []))
+            )
+    if max_id is None:
+        print(f"[INFO] {label}: Tabelle {job.table.name} ist leer – nichts zu tun")
+        return {"rows": 0, "updated": 0, "seconds": 0.0}
+    if finished_at is not None:
+        print(f"[INFO] {label}: bereits abgeschlossen ({finished_at:%Y-%m-%d %H:%M}) – --restart für einen neuen Lauf")
+        return {"rows": 0, "updated": 0, "seconds": 0.0}
+
+    started = reported = time.monotonic()
+    rows = updated = 0
+    while True:
+        chunk_started = time.monotonic()
+        with engine.begin() as conn:
+            ids = conn.scalars(
+                select(pk).where(pk <= max_id, *([pk > last_id] if last_id is not None else []))
+                .order_by(pk).limit(batch_size)
+            ).all()
+            if not ids:
+                conn.execute(update(progress).where(progress.c.name == name).values(
+                    updated_at=datetime.utcnow(), finished_at=datetime.utcnow(),
+                ))
+                break
+            result = conn.execute(
+                update(job.table).where(pk.between(ids[0], ids[-1]), *job.where).values(job.values)
+            )
+            # Checkpoint im selben Commit wie der Chunk
+            conn.execute(update(progress).where(progress.c.name == name).values(
+                last_id=ids[-1],
+                rows_scanned=progress.c.rows_scanned + len(ids),
+                rows_updated=progress.c.rows_updated + max(result.rowcount, 0),
+                updated_at=datetime.utcnow(),
+            ))
+        last_id = ids[-1]
+        rows += len(ids)
+        updated += max(result.rowcount, 0)
+
+        now = time.monotonic()
+        if now - reported >= REPORT_SECONDS:
+            reported = now
+            rate = rows / (now - started)
+            eta = (remaining - rows) / rate if rate else 0
+            print(f"[INFO] {label}: {rows}/{remaining} Zeilen ({rows / max(remaining, 1):.0%}), "
+                  f"{rate:.0f} Zeilen/s, {updated} geändert, noch ~{eta:.0f} s")
+
+        # Drosselung: feste Pause, und nie schneller als max_rate
+        wait = pause
+        if max_rate:
+            wait = max(wait, len(ids) / max_rate - (time.monotonic() - chunk_started))
+        if wait > 0:
+            time.sleep(wait)
+
+    seconds = time.monotonic() - started
+    print(f"[INFO] {label}: fertig – {rows} Zeilen in {seconds:.1f} s "
+          f"({rows / seconds if seconds else 0:.0f} Zeilen/s), {updated} geändert")
+    return {"rows": rows, "updated": updated, "seconds": seconds}
+
+
+def run_from_migration(name: str, **options) -> None:
+    """Aus ``upgrade()`` einer Alembic-Revision: läuft außerhalb der Migrations-Transaktion.
+
+    Die bisherigen Schritte der Migration werden vorher committet, damit die
+    Chunks nicht alle in einer großen Transaktion landen.
+    """
+    from alembic import context, op
+
+    if context.is_offline_mode():
+        print(f"[WARN] Backfill {name} im Offline-Modus übersprungen – danach 'flask backfill {name}' ausführen")
+        return
+    with op.get_context().autocommit_block():
+        run_backfill(name, op.get_bind().engine, **options)
+
+
+# ------------------ Backfills ------------------
+def _cents(table: str, decimal_column: str, cents_column: str) -> Backfill:
+    t = sa.table(table, sa.column("id"), sa.column(decimal_column), sa.column(cents_column))
+    return register(
+        f"cents_{table}", t,
+        values={cents_column: func.round(t.c[decimal_column] * 100)},
+        where=[t.c[cents_column].is_(None), t.c[decimal_column].is_not(None)],
+        description=f"{table}.{cents_column} aus {decimal_column}",
+    )
+
+
+# Cent-Spalten (Migration c5a91e3d7b42): Zeilen nachziehen, die während eines Rolling
+# Deploys noch alte Worker ohne Cent-Betrag geschrieben haben. Läuft zuletzt in
+# c4f7a2e9d5b1, bevor die Cent-Spalten NOT NULL werden
+_cents("products", "unit_price", "unit_price_cents")
+_cents("orders", "total_amount", "total_amount_cents")
+_cents("order_items", "unit_price", "unit_price_cents")
+_cents("archived_orders", "total_amount", "total_amount_cents")
+_cents("archived_order_items", "unit_price", "unit_price_cents")
@@ -0,0 +1,116 @@
+"""Benchmark: Backfill als ein ``UPDATE`` vs. in Chunks (``backfill.py``).
+
+Legt eine temporäre SQLite-Datenbank im Schema vor ``c4f7a2e9d5b1`` (Numeric
+maßgeblich, Cent-Spalte nullable) mit ``--orders`` Bestellungen ohne Cent-Betrag
+an und füllt ``total_amount_cents``
+
+- wie bisher in einer Migration: ein ``UPDATE`` über die ganze Tabelle,
+- mit ``run_backfill("cents_orders")`` in Chunks von ``--batch-size`` Zeilen.
+
+Währenddessen ändert ein zweiter Thread alle 10 ms eine Bestellung (wie die
+App im Betrieb) und misst, wie lange er auf die Sperre warten muss.
+
+    python benchmarks/bench_backfill.py --orders 500000 --batch-size 1000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def writer(engine, orders, stop, latencies):
+    from sqlalchemy import text
+
+    rng = random.Random(1)
+    while not stop.is_set():
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE orders SET status = 'bezahlt' WHERE id = :id"), {"id": rng.randint(1, orders)})
+        latencies.append(time.perf_counter() - start)
+        time.sleep(0.01)
+
+
+def measure(engine, orders, fn):
+    stop, latencies = threading.Event(), []
+    thread = threading.Thread(target=writer, args=(engine, orders, stop, latencies))
+    thread.start()
+    time.sleep(0.2)
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    thread.join()
+    return elapsed, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=500_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--pause", type=float, default=0.01)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("SECRET_KEY", "bench")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ["FLASK_RUN_FROM_CLI"] = "true"  # create_app() richtet Flask-Migrate ein
+        from flask_migrate import upgrade
+        from sqlalchemy import MetaData, Table, insert, text
+
+        from app import create_app
+        from backfill import run_backfill
+        from models import db
+
+        app = create_app({"METRICS_ENABLED": False})
+        with app.app_context():
+            upgrade(directory=os.path.join(os.path.dirname(__file__), "..", "migrations"), revision="b6e2d8a4f013")
+            engine = db.engine
+            meta = MetaData()
+            customers = Table("customers", meta, autoload_with=engine)
+            orders = Table("orders", meta, autoload_with=engine)
+            now = datetime.utcnow()
+            with engine.begin() as conn:
+                conn.execute(insert(customers), [{"company": "Firma", "created_at": now, "updated_at": now}])
+                for start in range(0, args.orders, 50_000):
+                    conn.execute(insert(orders), [
+                        {"customer_id": 1, "order_number": f"B{i:08d}", "order_date": now, "status": "offen",
+                         "total_amount": f"{i % 5000}.{i % 100:02d}", "currency": "EUR",
+                         "created_at": now, "updated_at": now}
+                        for i in range(start, min(start + 50_000, args.orders))
+                    ])
+
+            def reset():
+                with engine.begin() as conn:
+                    conn.execute(text("UPDATE orders SET total_amount_cents = NULL"))
+
+            def single_update():
+                with engine.begin() as conn:
+                    conn.execute(text("UPDATE orders SET total_amount_cents = ROUND(total_amount * 100)"))
+
+            def chunked():
+                run_backfill("cents_orders", engine, batch_size=args.batch_size, pause=args.pause, restart=True)
+
+            print(f"{args.orders} Bestellungen, SQLite\n")
+            print(f"{'Variante':<34} {'Sekunden':>9} {'Zeilen/s':>10} {'Schreiber p50 ms':>17} {'max ms':>8}")
+            for name, fn in (("ein UPDATE (bisher)", single_update),
+                             (f"Chunks à {args.batch_size}, {args.pause:g} s Pause", chunked)):
+                reset()
+                elapsed, latencies = measure(engine, args.orders, fn)
+                print(f"{name:<34} {elapsed:>9.2f} {args.orders / elapsed:>10.0f} "
+                      f"{statistics.median(latencies) * 1000:>17.2f} {max(latencies) * 1000:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
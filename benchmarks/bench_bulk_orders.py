@@ -0,0 +1,134 @@
+"""Benchmark: Bestellungen pro Sekunde – einzeln per ORM vs. Massen-Erfassung (``bulk_orders.py``).
+
+Legt eine temporäre SQLite-Datenbank mit Produkten und Kunden an und speichert
+``--orders`` Bestellungen mit je ``--items`` Positionen:
+
+- wie bisher: je Bestellung ``Order`` + ``OrderItem``-Objekte, Summe in Python, ein Commit,
+- ``import_orders()`` in Stapeln von ``--batch-size``,
+- ``POST /api/orders/bulk`` in Stapeln von ``--batch-size`` (inkl. JSON und Login).
+
+Das Audit-Log wird jeweils mitgeschrieben und vor der Zeitmessung geleert.
+
+    python benchmarks/bench_bulk_orders.py --orders 20000 --batch-size 1000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+PRODUCTS = 50
+CUSTOMERS = 500
+
+
+def make_orders(prefix, count, items):
+    rng = random.Random(count)
+    return [
+        {
+            "customer_id": rng.randint(1, CUSTOMERS),
+            "order_number": f"{prefix}-{i:07d}",
+            "order_date": "2026-10-19T09:30:00",
+            "items": [{"sku": f"SKU-{rng.randrange(PRODUCTS):03d}", "quantity": rng.randint(1, 5)}
+                      for _ in range(items)],
+        }
+        for i in range(count)
+    ]
+
+
+def orm_one_by_one(db, orders):
+    from bulk_orders import product_prices
+    from models import Order, OrderItem
+
+    prices = product_prices()
+    for raw in orders:
+        order = Order(customer_id=raw["customer_id"], order_number=raw["order_number"],
+                      order_date=datetime.fromisoformat(raw["order_date"]),
+                      status="offen", currency="EUR")
+        total = 0
+        for item in raw["items"]:
+            product_id, cents = prices[item["sku"]]
+            order.items.append(OrderItem(product_id=product_id, quantity=item["quantity"],
+                                         unit_price_cents=cents))
+            total += cents * item["quantity"]
+        order.total_amount_cents = total
+        db.session.add(order)
+        db.session.commit()
+
+
+def bulk_function(orders, batch_size):
+    from bulk_orders import import_orders
+
+    for start in range(0, len(orders), batch_size):
+        import_orders(orders[start:start + batch_size])
+
+
+def bulk_api(app, user_id, orders, batch_size):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user_id)
+        session["_fresh"] = True
+    for start in range(0, len(orders), batch_size):
+        response = client.post("/api/orders/bulk", json={"orders": orders[start:start + batch_size]})
+        assert response.status_code == 201, response.get_json()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=20_000)
+    parser.add_argument("--items", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("SECRET_KEY", "bench")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        from sqlalchemy import func, insert, select
+
+        from app import create_app
+        from audit import writer
+        from models import db, Customer, Order, OrderItem, Product, User
+
+        app = create_app({"METRICS_ENABLED": False})
+        with app.app_context():
+            db.create_all()
+            user = User(username="bench", password_hash="x")
+            db.session.add(user)
+            db.session.execute(insert(Product.__table__), [
+                {"sku": f"SKU-{i:03d}", "name": f"Produkt {i}", "unit_price_cents": (10 + i) * 100 + 90}
+                for i in range(PRODUCTS)
+            ])
+            db.session.execute(insert(Customer.__table__), [{"company": f"Firma {i:04d}"} for i in range(CUSTOMERS)])
+            db.session.commit()
+            user_id = user.id
+
+            # ORM einzeln ist langsam – dort reicht ein Zehntel der Bestellungen
+            scenarios = (
+                ("ORM, je Bestellung ein Commit", max(1, args.orders // 10),
+                 lambda orders: orm_one_by_one(db, orders)),
+                (f"import_orders(), {args.batch_size} je Stapel", args.orders,
+                 lambda orders: bulk_function(orders, args.batch_size)),
+                (f"POST /api/orders/bulk, {args.batch_size} je Stapel", args.orders,
+                 lambda orders: bulk_api(app, user_id, orders, args.batch_size)),
+            )
+            print(f"{args.items} Positionen je Bestellung, SQLite\n")
+            print(f"{'Variante':<40} {'Bestellungen':>12} {'Sekunden':>9} {'Bestellungen/s':>15}")
+            for n, (name, count, fn) in enumerate(scenarios):
+                orders = make_orders(f"B{n}", count, args.items)
+                writer.flush()
+                start = time.perf_counter()
+                fn(orders)
+                elapsed = time.perf_counter() - start
+                print(f"{name:<40} {count:>12} {elapsed:>9.2f} {count / elapsed:>15.0f}")
+
+            writer.flush()  # nicht erst per atexit in die dann gelöschte Datenbank
+            orders_total = db.session.scalar(select(func.count(Order.id)))
+            items_total = db.session.scalar(select(func.count(OrderItem.id)))
+            print(f"\nGespeichert: {orders_total} Bestellungen, {items_total} Positionen")
+
+
+if __name__ == "__main__":
+    main()
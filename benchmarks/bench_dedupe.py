@@ -0,0 +1,140 @@
+"""Benchmark: Dubletten-Suche mit Blocking-Schlüsseln (``dedupe.py``).
+
+Erzeugt ``--customers`` synthetische Kunden, davon ``--dup-rate`` als leicht
+abgewandelte Kopien ("Acme GmbH" → "ACME Gmbh.", Tippfehler, vertauschte
+Wörter, andere Telefonschreibweise), und misst
+
+- Normalisieren + Schlüssel bilden,
+- ``find_duplicates`` mit einem und mit ``--workers`` Prozessen: verglichene
+  Paare (statt n²/2), gefundene Kopien (Recall), Laufzeit,
+- ``possible_duplicates`` (Warnung in ``customer_new()``) gegen eine
+  temporäre SQLite-Datenbank mit allen Kunden: p50/p99 je Aufruf.
+
+    python benchmarks/bench_dedupe.py --customers 100000 --workers 4
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+SYLLABLES = ["al", "ber", "co", "da", "el", "fin", "gra", "hof", "in", "jo", "ka", "lux", "mar", "no", "or",
+             "pan", "quan", "ri", "sol", "ta", "ul", "ver", "wa", "xa", "yo", "zen", "ste", "bru", "kli", "mo"]
+BRANCHES = ["Bau", "Consulting", "Hotels", "Handel", "Logistik", "Software", "Technik", "Immobilien",
+            "Energie", "Medien", "Reisen", "Holz", "Metall", "Design", "Pflege", "Finanz", "Druck", "Garten"]
+LEGAL = ["GmbH", "OG", "KG", "e.U.", "AG", "GesmbH", "& Co KG"]
+
+
+def make_customer(rng, i):
+    name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(3, 5))).capitalize()
+    company = f"{name} {rng.choice(BRANCHES)} {rng.choice(LEGAL)}"
+    domain = f"{name.lower()}{i}.example"
+    phone = f"+43 {rng.randint(1, 7999)} {rng.randint(100000, 9999999)}"
+    return company, f"office@{domain}", phone
+
+
+def variant(rng, company, email, phone):
+    """Leicht abgewandelte Erfassung desselben Kunden."""
+    words = company.split()
+    kind = rng.randrange(5)
+    if kind == 0:
+        company = company.upper().replace("GMBH", "Gmbh.")
+    elif kind == 1:
+        company = " ".join(words[:2]) + " " + rng.choice(LEGAL)
+    elif kind == 2:
+        pos = rng.randrange(len(words[0]))
+        company = words[0][:pos] + rng.choice("aeiou") + words[0][pos + 1:] + " " + " ".join(words[1:])
+    elif kind == 3:
+        company = f"{words[1]} {words[0]}"
+    else:
+        company = company.lower()
+    email = rng.choice([email, email.replace("office@", "info@"), ""])
+    digits = phone.replace("+43 ", "0").replace(" ", "")
+    phone = rng.choice([phone, f"{digits[:4]}/{digits[4:]}", ""])
+    return company, email, phone
+
+
+def generate(n, dup_rate, seed=1):
+    rng = random.Random(seed)
+    rows, pairs = [], set()
+    originals = max(1, int(n / (1 + dup_rate)))
+    for i in range(originals):
+        rows.append(make_customer(rng, i))
+    while len(rows) < n:
+        source = rng.randrange(originals)
+        rows.append(variant(rng, *rows[source]))
+        pairs.add((source + 1, len(rows)))
+    return rows, pairs
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--customers", type=int, default=100_000)
+    parser.add_argument("--dup-rate", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--threshold", type=float, default=0.85)
+    parser.add_argument("--max-block", type=int, default=500)
+    parser.add_argument("--lookups", type=int, default=500)
+    args = parser.parse_args()
+
+    from dedupe import find_duplicates, make_record
+
+    rows, injected = generate(args.customers, args.dup_rate)
+    start = time.perf_counter()
+    records = [make_record(i, 0, *row) for i, row in enumerate(rows, start=1)]
+    keys = sum(len(r.keys) for r in records)
+    print(f"{len(records)} Kunden, {len(injected)} eingestreute Kopien, {os.cpu_count()} CPU")
+    print(f"Schlüssel bilden: {time.perf_counter() - start:.2f} s ({keys} Schlüssel)\n")
+
+    all_pairs = len(records) * (len(records) - 1) // 2
+    print(f"{'Prozesse':>8} {'Sekunden':>9} {'verglichen':>12} {'von n²/2':>9} {'gefunden':>9} {'Recall':>7}")
+    for workers in sorted({1, args.workers}):
+        duplicates, stats = find_duplicates(records, args.threshold, args.max_block, workers)
+        found = {(d.a.id, d.b.id) for d in duplicates} | {(d.b.id, d.a.id) for d in duplicates}
+        recall = len(injected & found) / len(injected) if injected else 1.0
+        print(f"{workers:>8} {stats['seconds']:>9.2f} {stats['compared']:>12} "
+              f"{stats['compared'] / all_pairs:>9.2e} {len(duplicates):>9} {recall:>7.1%}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("SECRET_KEY", "bench")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        from sqlalchemy import insert
+
+        from app import create_app
+        from dedupe import possible_duplicates, rebuild_keys
+        from models import db, Customer
+
+        app = create_app({"METRICS_ENABLED": False, "DEDUPE_THRESHOLD": args.threshold})
+        with app.app_context():
+            db.create_all()
+            db.session.execute(insert(Customer.__table__), [
+                {"id": i, "company": company, "email": email or None, "phone": phone or None}
+                for i, (company, email, phone) in enumerate(rows, start=1)
+            ])
+            db.session.commit()
+            rebuild_keys(records)
+
+        rng = random.Random(2)
+        probes = [variant(rng, *rows[rng.randrange(len(rows))]) for _ in range(args.lookups)]
+        times, hits = [], 0
+        with app.test_request_context():
+            possible_duplicates(*probes[0])
+            for probe in probes:
+                start = time.perf_counter()
+                hits += bool(possible_duplicates(*probe))
+                times.append(time.perf_counter() - start)
+        print(f"\npossible_duplicates: p50 {statistics.median(times) * 1000:.2f} ms, "
+              f"p99 {percentile(times, 99) * 1000:.2f} ms, Treffer bei {hits / len(probes):.0%} der Varianten")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Time-to-first-byte und Bytes auf der Leitung für große Listenseiten.
+
+Startet gunicorn (1 Worker) einmal mit ``render_template`` und einmal gestreamt
+und lädt die Seiten über einen rohen Socket – gemessen wird bis zum ersten
+empfangenen Byte (TTFB), bis zum letzten Byte (gesamt) und die Anzahl Bytes
+inklusive Header und Chunk-Rahmen, jeweils ohne/mit gzip/brotli.
+
+    python benchmarks/bench_delivery.py --path "/orders?per_page=200" --runs 20
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from loadtest import ROOT, session_cookie, wait_until_ready
+
+MODES = {"render_template": "false", "stream_template": "true"}
+ENCODINGS = ["identity", "gzip", "br"]
+
+
+def fetch(port, path, cookie, encoding):
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nCookie: session={cookie}\r\n"
+        f"Accept-Encoding: {encoding}\r\nConnection: close\r\n\r\n"
+    ).encode()
+    with socket.create_connection(("127.0.0.1", port)) as sock:
+        start = time.perf_counter()
+        sock.sendall(request)
+        first = sock.recv(65536)
+        ttfb = time.perf_counter() - start
+        received = len(first)
+        while data := sock.recv(65536):
+            received += len(data)
+        total = time.perf_counter() - start
+    if not first.startswith(b"HTTP/1.1 200"):
+        raise RuntimeError(first.split(b"\r\n", 1)[0].decode())
+    return ttfb, total, received
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--path", action="append", help="mehrfach möglich (Standard: Bestellungen + Kontakte, 200/Seite)")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+    paths = args.path or ["/orders?per_page=200", "/contacts?per_page=200"]
+
+    cookie = session_cookie()
+    print(f"{'Seite':<24} {'Modus':<16} {'Encoding':<9} {'TTFB ms':>8} {'gesamt ms':>10} {'Bytes':>8}")
+    for mode, stream in MODES.items():
+        env = dict(os.environ, WEB_CONCURRENCY="1", WEB_THREADS="1", STREAM_TEMPLATES=stream,
+                   BIND=f"127.0.0.1:{args.port}", ACCESS_LOG="/dev/null")
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:application"],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_until_ready(args.port)
+            for path in paths:
+                for encoding in ENCODINGS:
+                    fetch(args.port, path, cookie, encoding)  # Warmup
+                    results = [fetch(args.port, path, cookie, encoding) for _ in range(args.runs)]
+                    ttfb, total, size = zip(*results)
+                    print(f"{path:<24} {mode:<16} {encoding:<9} "
+                          f"{statistics.median(ttfb) * 1000:>8.1f} {statistics.median(total) * 1000:>10.1f} "
+                          f"{statistics.median(size):>8.0f}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Benchmark: CRM-Latenz während einer Login-Welle (``login_guard.py``).
+
+Legt eine temporäre SQLite-Datenbank mit einigen Benutzern (scrypt-Hashes) und
+Kunden an. Während ``--flood-threads`` Threads falsche Passwörter für diese
+Benutzer schicken (wechselnde IPs, wie bei Credential Stuffing), misst ein
+weiterer Thread ``GET /customers``:
+
+- ohne Login-Last (Referenz),
+- wie vorher: inline gehasht, ohne Drosselung,
+- nur Hash-Pool (``nice``, begrenzte Warteschlange), ohne Drosselung,
+- Hash-Pool + Token-Buckets (Standardeinstellungen).
+
+Jedes Szenario läuft in einem eigenen Prozess (der Hash-Pool ist prozessweit).
+
+    python benchmarks/bench_login.py --seconds 5 --flood-threads 8
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+UNLIMITED = {"LOGIN_IP_BURST": 10**9, "LOGIN_USER_BURST": 10**9}
+SCENARIOS = {
+    "ohne Login-Last": None,
+    "inline, ungedrosselt": {"LOGIN_HASH_WORKERS": 0, **UNLIMITED},
+    "Hash-Pool, ungedrosselt": UNLIMITED,
+    "Hash-Pool + Drosselung": {},
+}
+USERS = 5
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def populate(db):
+    from werkzeug.security import generate_password_hash
+
+    from models import Customer, User
+
+    for i in range(USERS):
+        db.session.add(User(username=f"user{i}@example.com", password_hash=generate_password_hash("geheim123")))
+    db.session.add_all([Customer(company=f"Firma {i:04d}", contact_name=f"Person {i}") for i in range(500)])
+    db.session.commit()
+
+
+def run_scenario(name, seconds, flood_threads):
+    """Läuft im Kindprozess; gibt das Ergebnis als JSON-Zeile aus."""
+    from app import create_app
+    from login_guard import start_hash_pool
+    from models import db, User
+
+    overrides = SCENARIOS[name]
+    app = create_app({"WTF_CSRF_ENABLED": False, **(overrides or {})})
+    start_hash_pool(app)  # wie gunicorn post_fork: vor den Threads
+    with app.app_context():
+        user_id = db.session.scalar(db.select(User.id).limit(1))
+
+    stop = threading.Event()
+    statuses = Counter()
+
+    def flood(thread):
+        client = app.test_client()
+        n = 0
+        while not stop.is_set():
+            n += 1
+            response = client.post(
+                "/login",
+                data={"username": f"user{n % USERS}@example.com", "password": "falsch123"},
+                environ_base={"REMOTE_ADDR": f"10.{thread}.{n // 250 % 250}.{n % 250}"},
+            )
+            statuses[response.status_code] += 1
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user_id)
+        session["_fresh"] = True
+    client.get("/customers")
+
+    threads = [threading.Thread(target=flood, args=(i,), daemon=True) for i in range(flood_threads if overrides is not None else 0)]
+    for thread in threads:
+        thread.start()
+    times = []
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        t = time.perf_counter()
+        assert client.get("/customers").status_code == 200
+        times.append(time.perf_counter() - t)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    print(json.dumps({
+        "requests": len(times),
+        "p50": statistics.median(times) * 1000,
+        "p99": percentile(times, 99) * 1000,
+        "logins": dict(sorted(statuses.items())),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--flood-threads", type=int, default=8)
+    parser.add_argument("--scenario", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        return run_scenario(args.scenario, args.seconds, args.flood_threads)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, SECRET_KEY=os.environ.get("SECRET_KEY", "bench"),
+                   DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        os.environ.update(env)
+        from app import create_app
+        from models import db
+
+        app = create_app()
+        with app.app_context():
+            db.create_all()
+            populate(db)
+
+        print(f"{os.cpu_count()} CPU, {args.flood_threads} Login-Threads, {args.seconds:g} s je Szenario\n")
+        print(f"{'Szenario':<26} {'GET /customers':>14} {'p50 ms':>8} {'p99 ms':>8}   Logins (Status: Anzahl)")
+        for name in SCENARIOS:
+            output = subprocess.run(
+                [sys.executable, __file__, "--scenario", name,
+                 "--seconds", str(args.seconds), "--flood-threads", str(args.flood_threads)],
+                env=env, check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            logins = ", ".join(f"{status}: {count}" for status, count in result["logins"].items()) or "–"
+            print(f"{name:<26} {result['requests']:>14} {result['p50']:>8.1f} {result['p99']:>8.1f}   {logins}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark: Kosten der Metriken (``metrics.py``).
+
+Misst
+
+- ``Counter.inc`` / ``Histogram.observe`` je Aufruf, mit einem und mit
+  ``--threads`` Threads gleichzeitig – zum Vergleich ein Zähler hinter einem
+  ``threading.Lock``,
+- ``GET /customers`` ohne und mit Metriken (``METRICS_ENABLED``),
+- ``GET /metrics`` (Zusammenführen über alle Threads + Textformat).
+
+    python benchmarks/bench_metrics.py --ops 200000 --threads 8
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+class LockedCounter:
+    """Vergleich: ein gemeinsames Dict hinter einem Lock."""
+
+    def __init__(self):
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+
+def per_op(fn, ops, threads):
+    """Nanosekunden je Aufruf (Wandzeit / Aufrufe), ``threads`` Threads gleichzeitig."""
+    def work():
+        for _ in range(ops // threads):
+            fn()
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return (time.perf_counter() - start) / ops * 1e9
+
+
+def route_ms(app, user_id, path, runs):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user_id)
+        session["_fresh"] = True
+    client.get(path)
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        assert client.get(path).status_code == 200
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ops", type=int, default=200_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("SECRET_KEY", "bench")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        from sqlalchemy import insert
+
+        from app import create_app
+        from metrics import Counter, Histogram
+        from models import db, Customer, User
+
+        counter = Counter("bench_total", "Benchmark.", ("endpoint",))
+        histogram = Histogram("bench_seconds", "Benchmark.", ("endpoint",))
+        locked = LockedCounter()
+
+        print(f"{'Aufruf':<28} {'1 Thread ns':>12} {f'{args.threads} Threads ns':>14}")
+        for name, fn in (
+            ("Counter.inc", lambda: counter.inc("crm.customers")),
+            ("Histogram.observe", lambda: histogram.observe(0.012, "crm.customers")),
+            ("Lock + Dict (Vergleich)", lambda: locked.inc("crm.customers")),
+        ):
+            print(f"{name:<28} {per_op(fn, args.ops, 1):>12.0f} {per_op(fn, args.ops, args.threads):>14.0f}")
+
+        apps = {}
+        for enabled in (False, True):  # ohne zuerst – die DB-Events hängen prozessweit an Engine
+            apps[enabled] = create_app({"METRICS_ENABLED": enabled})
+        with apps[True].app_context():
+            db.create_all()
+            user = User(username="bench", password_hash="x")
+            db.session.add(user)
+            db.session.commit()
+            # ohne ORM, sonst schreibt das Audit-Log nach dem Ende noch in die gelöschte Datenbank
+            db.session.execute(insert(Customer.__table__), [{"company": f"Firma {i:04d}"} for i in range(200)])
+            db.session.commit()
+            user_id = user.id
+
+        print()
+        without = route_ms(apps[False], user_id, "/customers", args.runs)
+        with_metrics = route_ms(apps[True], user_id, "/customers", args.runs)
+        print(f"GET /customers ohne Metriken: {without:.2f} ms, mit: {with_metrics:.2f} ms "
+              f"({(with_metrics - without) * 1000:+.0f} µs)")
+        print(f"GET /metrics: {route_ms(apps[True], user_id, '/metrics', args.runs // 4):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Benchmark: Umsatz-Rollups und Export mit Numeric/Decimal vs. Integer-Cent.
+
+Läuft ohne App/.env gegen eine SQLite-In-Memory-Datenbank:
+
+    python benchmarks/bench_money.py --rows 200000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from decimal import Decimal
+
+import sqlalchemy as sa
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from money import Money, format_money  # noqa: E402
+
+
+def timed(label, fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"  {label:<48} {best * 1000:9.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--customers", type=int, default=1_000)
+    args = parser.parse_args()
+
+    engine = sa.create_engine("sqlite://")
+    meta = sa.MetaData()
+    orders = sa.Table(
+        "orders", meta,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("customer_id", sa.Integer, index=True),
+        sa.Column("total_amount", sa.Numeric(10, 2)),
+        sa.Column("total_amount_cents", sa.BigInteger),
+    )
+    meta.create_all(engine)
+
+    random.seed(42)
+    rows = []
+    for i in range(args.rows):
+        cents = random.randint(100, 5_000_000)
+        rows.append({
+            "id": i + 1,
+            "customer_id": random.randint(1, args.customers),
+            "total_amount": Decimal(cents) / 100,
+            "total_amount_cents": cents,
+        })
+    with engine.begin() as conn:
+        conn.execute(orders.insert(), rows)
+
+    print(f"{args.rows} Bestellungen, {args.customers} Kunden\n")
+
+    print("Rollup: Umsatz je Kunde (SQL GROUP BY)")
+    with engine.connect() as conn:
+        before = timed("vorher  SUM(total_amount) -> Decimal", lambda: conn.execute(
+            sa.select(orders.c.customer_id, sa.func.sum(orders.c.total_amount))
+            .group_by(orders.c.customer_id)
+        ).all())
+        after = timed("nachher SUM(total_amount_cents) -> int", lambda: conn.execute(
+            sa.select(orders.c.customer_id, sa.func.sum(orders.c.total_amount_cents))
+            .group_by(orders.c.customer_id)
+        ).all())
+    assert len(before) == len(after)
+
+    print("\nRollup: Summe in Python")
+    decimals = [r["total_amount"] for r in rows]
+    cents = [r["total_amount_cents"] for r in rows]
+    total_decimal = timed("vorher  sum(Decimal)", lambda: sum(decimals, Decimal(0)))
+    total_cents = timed("nachher sum(int)", lambda: sum(cents))
+    assert Money.from_decimal(total_decimal).cents == total_cents
+
+    print("\nExport: Betrag formatieren (CSV-Zeilen)")
+    timed('vorher  "%.2f" % Decimal (ohne Tausenderpunkt)', lambda: [("%.2f" % d) + " €" for d in decimals])
+    timed("vorher  Decimal im DE-Format", lambda: [
+        f"{d:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".") + " €" for d in decimals
+    ])
+    amounts = [Money(c) for c in cents]
+    timed("nachher format_money(Money)", lambda: [format_money(m) for m in amounts])
+
+
+if __name__ == "__main__":
+    main()
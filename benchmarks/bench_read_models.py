@@ -0,0 +1,126 @@
+"""Benchmark: Listenseiten mit ORM-Entities vs. Lese-Modellen (``read_models.py``).
+
+Legt eine temporäre SQLite-Datenbank mit langen ``notes`` an und lädt je Liste
+eine Seite mit 100 bzw. 1.000 Zeilen – einmal als ORM-Entities (wie vorher,
+inkl. nachgeladener Beziehungen für Firma/Benutzer), einmal als Lese-Modell.
+Gemessen werden Laufzeit (Median) und Spitzen-Speicher (``tracemalloc``):
+
+    python benchmarks/bench_read_models.py --runs 20
+"""
+import argparse
+import gc
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+NOTES = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 40  # ~2 KB je Zeile
+
+
+def populate(db, rows):
+    from models import Customer, Order, Contact, User
+
+    user = User(username="bench", password_hash="x")
+    db.session.add(user)
+    db.session.flush()
+    now = datetime.utcnow()
+    customers = [
+        Customer(company=f"Firma {i:05d}", contact_name=f"Person {i}", email=f"k{i}@example.com",
+                 phone="+43 1 234567", notes=NOTES, street="Hauptstraße 1", zip_code="1010", city="Wien")
+        for i in range(rows)
+    ]
+    db.session.add_all(customers)
+    db.session.flush()
+    for i, customer in enumerate(customers):
+        db.session.add(Order(customer_id=customer.id, order_number=f"B-{i:06d}", status="offen",
+                             order_date=now - timedelta(hours=i), total_amount_cents=i * 1000 + 50))
+        db.session.add(Contact(customer_id=customer.id, user_id=user.id, channel="phone",
+                               subject=f"Rückruf {i}", notes=NOTES, contact_at=now - timedelta(hours=i)))
+    db.session.commit()
+
+
+def lists():
+    """``Name → (ORM-Select, Attribute wie im Template, Lese-Modell, Lese-Select)``."""
+    from sqlalchemy import select
+
+    from models import Customer, Order, Contact
+    from read_models import CustomerRow, ContactRow, OrderRow
+
+    active = Customer.deleted_at.is_(None)
+    return {
+        "Kunden": (
+            select(Customer).where(active).order_by(Customer.company),
+            lambda c: (c.id, c.company, c.contact_name, c.email, c.phone),
+            CustomerRow, CustomerRow.query().order_by(Customer.company),
+        ),
+        "Bestellungen": (
+            select(Order).join(Customer).where(active).order_by(Order.order_date.desc()),
+            lambda o: (o.order_number, o.customer.id, o.customer.company, o.order_date, o.status, o.total),
+            OrderRow, OrderRow.query().order_by(Order.order_date.desc()),
+        ),
+        "Kontakte": (
+            select(Contact).join(Customer).where(active).order_by(Contact.contact_at.desc()),
+            lambda c: (c.contact_at, c.customer.id, c.customer.company, c.channel, c.subject,
+                       c.user.username if c.user else None),
+            ContactRow, ContactRow.query().order_by(Contact.contact_at.desc()),
+        ),
+    }
+
+
+def measure(db, fn, runs):
+    """``(Median-Laufzeit, Spitzen-Speicher)``; danach jeweils frische Session."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+        db.session.remove()
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    db.session.remove()
+    return statistics.median(times), peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("SECRET_KEY", "bench")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        from app import create_app
+        from models import db
+
+        app = create_app()
+        with app.app_context():
+            db.create_all()
+            populate(db, max(args.sizes))
+
+            print(f"{'Liste':<14} {'Zeilen':>6} {'ORM ms':>8} {'Lese-Modell ms':>15} "
+                  f"{'ORM KB':>8} {'Lese-Modell KB':>15}")
+            for name, (orm_stmt, touch, row, row_stmt) in lists().items():
+                for n in args.sizes:
+                    def load_entities():
+                        return [touch(entity) for entity in db.session.scalars(orm_stmt.limit(n))]
+
+                    def load_rows():
+                        return [row._make(r) for r in db.session.execute(row_stmt.limit(n))]
+
+                    orm_time, orm_peak = measure(db, load_entities, args.runs)
+                    row_time, row_peak = measure(db, load_rows, args.runs)
+                    print(f"{name:<14} {n:>6} {orm_time * 1000:>8.1f} {row_time * 1000:>15.1f} "
+                          f"{orm_peak / 1024:>8.0f} {row_peak / 1024:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Startup-Benchmark: Import + App-Erzeugung + erster Request, je in einem frischen Prozess.
+
+    python benchmarks/bench_startup.py --runs 10
+    python benchmarks/bench_startup.py --runs 10 --record   # Ergebnis an startup_history.csv anhängen
+
+Gemessen wird gegen eine temporäre SQLite-Datenbank, damit kein DB-Server nötig ist.
+Mit ``--record`` wird das Ergebnis zusammen mit ``git describe`` protokolliert, um
+die Startzeit über Releases zu verfolgen.
+"""
+import argparse
+import csv
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+HISTORY = os.path.join(os.path.dirname(__file__), "startup_history.csv")
+
+# Läuft im Kindprozess; unterstützt app.py mit und ohne Factory
+CHILD = r"""
+import json, time
+t0 = time.perf_counter()
+import app as app_module
+t1 = time.perf_counter()
+if hasattr(app_module, "create_app"):
+    application = app_module.create_app()
+else:
+    application = app_module.app
+t2 = time.perf_counter()
+response = application.test_client().get("/login")
+t3 = time.perf_counter()
+assert response.status_code == 200, response.status_code
+print(json.dumps({"import": t1 - t0, "create_app": t2 - t1, "first_request": t3 - t2, "total": t3 - t0}))
+"""
+
+
+def run_once(env):
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    # letzte Zeile ist das JSON (ältere Versionen drucken beim Import)
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def git_describe():
+    try:
+        return subprocess.run(
+            ["git", "describe", "--tags", "--always", "--dirty"],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--record", action="store_true", help="Ergebnis an startup_history.csv anhängen")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.setdefault("SECRET_KEY", "bench")
+        env["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+
+        run_once(env)  # Warmlauf (Bytecode-Cache, Dateisystem-Cache)
+        results = [run_once(env) for _ in range(args.runs)]
+
+    medians = {key: statistics.median(r[key] for r in results) for key in results[0]}
+    print(f"Median aus {args.runs} Läufen:")
+    for key, value in medians.items():
+        print(f"  {key:<14} {value * 1000:8.1f} ms")
+
+    if args.record:
+        new_file = not os.path.exists(HISTORY)
+        with open(HISTORY, "a", newline="") as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(["date", "version", "runs", "import_ms", "create_app_ms", "first_request_ms", "total_ms"])
+            writer.writerow([
+                datetime.now().strftime("%Y-%m-%d"), git_describe(), args.runs,
+                *(round(medians[key] * 1000, 1) for key in ("import", "create_app", "first_request", "total")),
+            ])
+        print(f"→ protokolliert in {os.path.relpath(HISTORY, ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Benchmark: Kunden-Typeahead (``suggest.py``) – Latenz und Speicher des Präfix-Index.
+
+Baut den Index aus synthetischen Kunden (ohne Datenbank) und misst
+
+- den Aufbau und den Speicherbedarf,
+- ``PrefixIndex.search`` für zufällige Präfixe (1–4 Zeichen),
+- die komplette Route ``/api/customers/suggest`` über den Test-Client
+  (Login, JSON, Nachladen geänderter Kunden gegen eine leere SQLite-Datenbank).
+
+    python benchmarks/bench_suggest.py --customers 100000 --requests 5000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+WORDS = ["Alpen", "Bau", "Blue", "Digital", "Elektro", "Holz", "Logistik", "Media", "Nova", "Solar",
+         "Tech", "Werk", "Wien", "Zebra", "Müller", "Gruber", "Huber", "Steiner", "Berger", "Wagner"]
+FORMS = ["GmbH", "AG", "OG", "KG", "e.U."]
+FIRST = ["Anna", "Lukas", "Lisa", "Max", "Laura", "David", "Sophie", "Jakob", "Lena", "Paul"]
+
+
+def synthetic(n):
+    random.seed(42)
+    now = datetime.utcnow()
+    for customer_id in range(1, n + 1):
+        company = f"{random.choice(WORDS)} {random.choice(WORDS)}{customer_id} {random.choice(FORMS)}"
+        contact = f"{random.choice(FIRST)} {random.choice(WORDS)}"
+        yield customer_id, company, contact, now
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def report(label, times):
+    print(f"  {label:<28} p50 {statistics.median(times) * 1000:6.3f} ms   "
+          f"p99 {percentile(times, 99) * 1000:6.3f} ms   max {max(times) * 1000:6.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--customers", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=5_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("SECRET_KEY", "bench")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        from app import create_app
+        from models import db, User
+        from suggest import PrefixIndex
+
+        start = time.perf_counter()
+        index = PrefixIndex.from_rows(synthetic(args.customers))
+        stats = index.stats()
+        print(f"{stats['customers']} Kunden, {stats['entries']} Einträge: "
+              f"Aufbau {(time.perf_counter() - start) * 1000:.0f} ms, {stats['memory_kb'] / 1024:.1f} MB")
+
+        random.seed(7)
+        words = [w.lower() for w in WORDS + FIRST]
+        prefixes = [random.choice(words)[:random.randint(1, 4)] for _ in range(args.requests)]
+
+        times = []
+        for prefix in prefixes:
+            t = time.perf_counter()
+            index.search(prefix, 8)
+            times.append(time.perf_counter() - t)
+        report("PrefixIndex.search", times)
+
+        app = create_app()
+        with app.app_context():
+            db.create_all()
+            user = User(username="bench", password_hash="x")
+            db.session.add(user)
+            db.session.commit()
+            user_id = user.id
+        app.extensions["suggest_index"] = index
+
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session["_user_id"] = str(user_id)
+            session["_fresh"] = True
+        times = []
+        for prefix in prefixes:
+            t = time.perf_counter()
+            response = client.get(f"/api/customers/suggest?q={prefix}")
+            times.append(time.perf_counter() - t)
+            assert response.status_code == 200
+        report("GET /api/customers/suggest", times)
+
+
+if __name__ == "__main__":
+    main()
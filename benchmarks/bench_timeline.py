@@ -0,0 +1,155 @@
+"""Benchmark: Kunden-Timeline (``read_models.customer_timeline``) bei vielen Ereignissen.
+
+Legt in einer temporären SQLite-Datenbank einen Kunden mit ``--events``
+Bestellungen und ebenso vielen Kontakten an (plus Rauschen bei anderen Kunden)
+und misst je Seite (20 Einträge):
+
+- erste Seite und Seiten tief in der Historie per Keyset-Cursor,
+- zum Vergleich dieselbe Tiefe per ``OFFSET`` über das ``UNION ALL``,
+- die Route ``/customers/<id>/timeline`` (HTML-Fragment) über den Test-Client.
+
+Außerdem wird der Query-Plan ausgegeben (beide Zweige über den Index).
+
+    python benchmarks/bench_timeline.py --events 100000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def populate(db, events):
+    from sqlalchemy import insert
+
+    from models import Customer, Order, Contact, User
+
+    user = User(username="bench", password_hash="x")
+    db.session.add(user)
+    db.session.add_all([Customer(company=f"Firma {i}") for i in range(20)])
+    db.session.commit()
+
+    now = datetime.utcnow()
+    orders, contacts = [], []
+    for i in range(events):
+        # Kunde 1 bekommt alles, der Rest verteilt sich als Rauschen auf die anderen
+        for customer_id in (1, 2 + i % 19):
+            orders.append({
+                "customer_id": customer_id, "order_number": f"B-{customer_id}-{i:07d}",
+                "order_date": now - timedelta(minutes=7 * i), "status": "offen",
+                "total_amount_cents": 10000, "currency": "EUR",
+                "created_at": now, "updated_at": now,
+            })
+            contacts.append({
+                "customer_id": customer_id, "user_id": user.id, "channel": "phone",
+                "subject": f"Anruf {i}", "contact_at": now - timedelta(minutes=5 * i),
+                "created_at": now, "updated_at": now,
+            })
+        if len(orders) >= 20_000:
+            db.session.execute(insert(Order.__table__), orders)
+            db.session.execute(insert(Contact.__table__), contacts)
+            orders, contacts = [], []
+    if orders:
+        db.session.execute(insert(Order.__table__), orders)
+        db.session.execute(insert(Contact.__table__), contacts)
+    db.session.commit()
+    return user.id
+
+
+def timed(fn, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000, result
+
+
+def offset_page(db, customer_id, offset, limit=20):
+    """Vergleich: dieselbe Seite per OFFSET über das komplette UNION ALL."""
+    from sqlalchemy import literal, select, union_all
+
+    from models import Order, Contact
+
+    timeline = union_all(
+        select(Order.order_date.label("at"), literal("order").label("kind"), Order.id)
+        .where(Order.customer_id == customer_id),
+        select(Contact.contact_at.label("at"), literal("contact").label("kind"), Contact.id)
+        .where(Contact.customer_id == customer_id),
+    ).subquery()
+    return db.session.execute(
+        select(timeline).order_by(timeline.c.at.desc(), timeline.c.kind.desc(), timeline.c.id.desc())
+        .offset(offset).limit(limit)
+    ).all()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=100_000, help="Bestellungen und Kontakte je")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("SECRET_KEY", "bench")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        from sqlalchemy import event
+
+        from app import create_app
+        from models import db
+        from read_models import customer_timeline
+
+        app = create_app()
+        with app.app_context():
+            db.create_all()
+            start = time.perf_counter()
+            user_id = populate(db, args.events)
+            print(f"Kunde 1: {args.events} Bestellungen + {args.events} Kontakte "
+                  f"(angelegt in {time.perf_counter() - start:.1f} s)\n")
+
+        with app.test_request_context():
+            # Cursor für Seiten in verschiedener Tiefe einsammeln
+            cursors, before = {1: None}, None
+            depths = {1, 10, 100, 1000, 5000}
+            for page in range(2, max(depths) + 1):
+                _, before = customer_timeline(1, before=before)
+                if before is None:
+                    break
+                cursors[page] = before
+
+            print(f"{'Seite':>6} {'Keyset ms':>10} {'OFFSET ms':>10}")
+            for page in sorted(depths & cursors.keys()):
+                keyset_ms, (entries, _) = timed(lambda: customer_timeline(1, before=cursors[page]), args.runs)
+                offset_ms, rows = timed(lambda: offset_page(db, 1, (page - 1) * 20), max(3, args.runs // 5))
+                assert [(e.at, e.kind, e.id) for e in entries] == [tuple(r) for r in rows]
+                print(f"{page:>6} {keyset_ms:>10.2f} {offset_ms:>10.2f}")
+
+            print("\nQuery-Plan (Keyset-Seite):")
+            captured = []
+
+            def capture(conn, cursor, statement, parameters, context, executemany):
+                captured.append((statement, parameters))
+
+            event.listen(db.engine, "before_cursor_execute", capture)
+            customer_timeline(1, before=cursors[max(cursors)])
+            event.remove(db.engine, "before_cursor_execute", capture)
+            statement, parameters = captured[-1]
+            with db.engine.connect() as conn:
+                for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters):
+                    print(f"  {row[-1]}")
+
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session["_user_id"] = str(user_id)
+            session["_fresh"] = True
+        route_ms, response = timed(lambda: client.get(f"/customers/1/timeline?before={cursors[max(cursors)]}"),
+                                   args.runs)
+        assert response.status_code == 200 and b"data-timeline-next" in response.data
+        print(f"\nGET /customers/1/timeline (Seite {max(cursors)}): {route_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
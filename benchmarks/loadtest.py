@@ -0,0 +1,123 @@
+"""Lokaler Lasttest: Durchsatz von gunicorn bei unterschiedlicher Worker-Zahl.
+
+Startet ``gunicorn -c gunicorn.conf.py wsgi:application`` nacheinander mit den
+angegebenen Worker-Zahlen und feuert für ``--duration`` Sekunden Requests mit
+``--clients`` parallelen Keep-Alive-Verbindungen ab. Nutzt die Datenbank aus
+``DATABASE_URL`` (vorher ``flask db upgrade`` + ``flask seed``) und meldet sich
+mit einem signierten Session-Cookie als erster User an.
+
+    python benchmarks/loadtest.py --workers 1 2 4 --path /customers
+"""
+import argparse
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+
+def session_cookie() -> str:
+    from flask.sessions import SecureCookieSessionInterface
+
+    from app import create_app
+    from models import User
+
+    app = create_app()
+    with app.app_context():
+        user = User.query.order_by(User.id).first()
+        if user is None:
+            sys.exit("Kein User in der Datenbank – vorher 'flask seed' ausführen.")
+        serializer = SecureCookieSessionInterface().get_signing_serializer(app)
+        return serializer.dumps({"_user_id": str(user.id), "_fresh": True})
+
+
+def wait_until_ready(port: int, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/login")
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("gunicorn nicht erreichbar")
+
+
+def hammer(port, path, cookie, duration, clients):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def client():
+        nonlocal errors
+        local, local_errors = [], 0
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        while time.monotonic() < stop_at:
+            start = time.perf_counter()
+            try:
+                conn.request("GET", path, headers={"Cookie": f"session={cookie}"})
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    local_errors += 1
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+                continue
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+            errors += local_errors
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, default=2)
+    parser.add_argument("--path", default="/customers")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    cookie = session_cookie()
+    print(f"{args.path}, {args.clients} Clients, {args.duration:.0f} s, CPUs: {os.cpu_count()}\n")
+    print(f"{'Worker':>6} {'Req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'Fehler':>7}")
+
+    for workers in args.workers:
+        env = dict(os.environ, WEB_CONCURRENCY=str(workers), WEB_THREADS=str(args.threads),
+                   BIND=f"127.0.0.1:{args.port}", ACCESS_LOG="/dev/null")
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:application"],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_until_ready(args.port)
+            latencies, errors = hammer(args.port, args.path, cookie, args.duration, args.clients)
+        finally:
+            server.terminate()
+            server.wait()
+
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0
+        print(f"{workers:>6} {len(latencies) / args.duration:>9.1f} "
+              f"{statistics.median(latencies) * 1000 if latencies else 0:>8.1f} "
+              f"{p99 * 1000:>8.1f} {errors:>7}")
+
+
+if __name__ == "__main__":
+    main()
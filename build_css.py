@@ -0,0 +1,83 @@
+"""Baut das Stylesheet: Tailwind → minifiziert → mit Hash im Namen → gzip/brotli.
+
+    pip install tailwindcss-bin brotli     # einmalig, kein Node nötig
+    python build_css.py
+
+Tailwind durchsucht ``templates/`` und erzeugt nur die tatsächlich benutzten
+Klassen. Ergebnis in ``static/dist/``::
+
+    app.<hash>.css  app.<hash>.css.gz  app.<hash>.css.br  manifest.json
+
+``manifest.json`` ordnet ``app.css`` der aktuellen Datei zu (siehe ``assets.py``).
+Ältere Builds werden entfernt. Das Tailwind-Binary kann über ``TAILWINDCSS_BIN``
+vorgegeben werden; ohne das Paket ``brotli`` entfällt nur die ``.br``-Variante.
+"""
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+from config import BASE_DIR
+
+SOURCE = os.path.join(BASE_DIR, "static", "src", "app.css")
+DIST = os.path.join(BASE_DIR, "static", "dist")
+MANIFEST = os.path.join(DIST, "manifest.json")
+
+
+def compile_css(source: str = SOURCE) -> bytes:
+    binary = os.environ.get("TAILWINDCSS_BIN") or shutil.which("tailwindcss")
+    if not binary:
+        sys.exit("tailwindcss nicht gefunden – 'pip install tailwindcss-bin' oder TAILWINDCSS_BIN setzen.")
+    result = subprocess.run(
+        [binary, "--input", source, "--output", "-", "--minify"],
+        cwd=BASE_DIR, check=True, stdout=subprocess.PIPE,
+    )
+    return result.stdout
+
+
+def write_variants(path: str, data: bytes) -> list[str]:
+    """Schreibt ``path`` plus vorkomprimierte Varianten, gibt alle Dateinamen zurück."""
+    written = [path]
+    with open(path, "wb") as f:
+        f.write(data)
+    # mtime=0: gleicher Inhalt → byte-gleiche .gz-Datei
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    written.append(path + ".gz")
+    try:
+        import brotli
+    except ImportError:
+        print("brotli nicht installiert – keine .br-Variante")
+    else:
+        with open(path + ".br", "wb") as f:
+            f.write(brotli.compress(data, quality=11, mode=brotli.MODE_TEXT))
+        written.append(path + ".br")
+    return written
+
+
+def build() -> str:
+    css = compile_css()
+    digest = hashlib.sha256(css).hexdigest()[:12]
+    name = f"app.{digest}.css"
+
+    os.makedirs(DIST, exist_ok=True)
+    keep = {os.path.basename(p) for p in write_variants(os.path.join(DIST, name), css)}
+    for old in os.listdir(DIST):
+        if old.startswith("app.") and old not in keep:
+            os.remove(os.path.join(DIST, old))
+
+    with open(MANIFEST, "w", encoding="utf-8") as f:
+        json.dump({"app.css": name}, f, indent=2)
+        f.write("\n")
+
+    for filename in sorted(keep):
+        size = os.path.getsize(os.path.join(DIST, filename))
+        print(f"{filename:<28} {size / 1024:>7.1f} KB")
+    return name
+
+
+if __name__ == "__main__":
+    build()
@@ -0,0 +1,408 @@
+"""CLI-Befehle (``flask seed``, ``flask archive`` …), registriert in ``create_app()``."""
+import json
+import os
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from archive import archive_old_data
+from backfill import BACKFILLS, run_backfill, status as backfill_status
+from bulk_orders import BulkOrderError, import_orders
+from dedupe import find_duplicates, load_records, rebuild_keys
+from deletion import delete_customers, delete_customers_chunked, dependent_row_count, resume_deletions
+from fx import load_rates_csv
+from models import db, Customer
+from sharding import distribute, each_shard, on_shard, shard_count, shard_engines, shard_of, shard_stats
+
+
+# ------------------ Seeder ------------------
+@click.command("seed")
+@with_appcontext
+def seed_command():
+    """Befüllt die Datenbank mit Demodaten (Kunden, Produkte, Bestellungen, Kontakte, User)."""
+    from models import (
+        db, User, Customer, Product, Order, OrderItem, Contact, LoginCode,
+        ArchivedOrder, ArchivedOrderItem, ArchivedContact, ArchivedRevenue, AuditLog, CustomerShard,
+        CustomerDedupeKey,
+    )
+    from datetime import datetime, timedelta
+    import random
+
+    # --- alles löschen, damit wir sauber neu befüllen können (auf jedem Shard) ---
+    for _ in each_shard():
+        ArchivedOrderItem.query.delete()
+        ArchivedOrder.query.delete()
+        ArchivedContact.query.delete()
+        ArchivedRevenue.query.delete()
+        OrderItem.query.delete()
+        Order.query.delete()
+        Contact.query.delete()
+        Product.query.delete()
+        Customer.query.delete()
+        db.session.commit()
+    CustomerShard.query.delete()
+    CustomerDedupeKey.query.delete()
+    LoginCode.query.delete()
+    AuditLog.query.delete()
+    User.query.delete()
+    db.session.commit()
+
+    # --- Demo-User (CHEF) ---
+    chef = User(username="admin@example.com", role="CHEF")
+    chef.set_password("admin123")
+    db.session.add(chef)
+    db.session.commit()
+
+    # --- Produkte ---
+    # Preise in Cent
+    products_data = [
+        ("P-100", "Beratungspaket Basic", 89000),
+        ("P-200", "Beratungspaket Plus", 149000),
+        ("P-300", "Supportvertrag", 59000),
+        ("P-400", "Workshop Tagessatz", 120000),
+        ("P-500", "Lizenz SMALL", 4900),
+        ("P-600", "Lizenz MEDIUM", 9900),
+        ("P-700", "Lizenz LARGE", 19900),
+    ]
+    products = []
+    now = datetime.utcnow()
+    for sku, name, price_cents in products_data:
+        p = Product(
+            sku=sku,
+            name=name,
+            unit_price_cents=price_cents,
+            created_at=now,
+        )
+        db.session.add(p)
+        products.append(p)
+    db.session.commit()
+
+    # --- Kunden ---
+    customers_data = [
+        ("Acme GmbH", "Max Mustermann", "max@acme.example", "+43 1 234567", "Hauptkunde Wien"),
+        ("Blue Widgets OG", "Anna Blau", "anna@blue.example", "+43 699 111", "Interessiert an Upgrade"),
+        ("TechNova GmbH", "Laura Huber", "laura@technova.example", "+43 316 9999", "Cloud-Projekt 2025"),
+        ("Grün & Co KG", "Peter Grün", "peter@gruen.example", "+43 512 8888", "Supportvertrag Bronze"),
+        ("Alpha Consult", "Sabine Weiss", "sabine@alpha.example", "+43 2742 12345", "Workshops geplant"),
+        ("Bergblick Hotels", "Johann Steiner", "johann@bergblick.example", "+43 6542 7777", "Saisonbetrieb"),
+        ("CityShop e.U.", "Martin Schwarz", "martin@cityshop.example", "+43 1 7654321", "E-Commerce"),
+        ("DigiFactory GmbH", "Lisa König", "lisa@digifactory.example", "+43 732 5555", "Automation"),
+        ("EventPro OG", "Thomas Fuchs", "thomas@eventpro.example", "+43 1 4444", "Events & Tickets"),
+        ("FreshFoods KG", "Maria Grün", "maria@freshfoods.example", "+43 662 3333", "Lieferkettenanalyse"),
+    ]
+    customers = []
+    for company, contact_name, email, phone, notes in customers_data:
+        c = Customer(
+            company=company,
+            contact_name=contact_name,
+            email=email,
+            phone=phone,
+            notes=notes,
+            street="Beispielstraße 1",
+            zip_code="1010",
+            city="Wien",
+            created_at=now - timedelta(days=random.randint(30, 400)),
+            updated_at=now,
+        )
+        db.session.add(c)
+        customers.append(c)
+    db.session.commit()
+
+    # --- Hilfsfunktionen ---
+    def random_date_within_last_years(years: int = 2) -> datetime:
+        days = random.randint(0, years * 365)
+        return now - timedelta(days=days, hours=random.randint(0, 23))
+
+    statuses = ["offen", "bezahlt", "storniert"]
+
+    # --- Bestellungen & Positionen ---
+    for customer in customers:
+        # pro Kunde 3–8 Bestellungen
+        for i in range(random.randint(3, 8)):
+            order_date = random_date_within_last_years()
+            status = random.choice(statuses)
+
+            # simple laufende Nummer
+            order_number = f"ORD-{customer.id:03d}-{i+1:03d}"
+
+            o = Order(
+                customer=customer,
+                order_number=order_number,
+                order_date=order_date,
+                status=status,
+                total_amount_cents=0,
+                currency="EUR",
+                created_at=order_date,
+            )
+            db.session.add(o)
+            db.session.flush()  # damit o.id da ist
+
+            total_cents = 0
+            for _ in range(random.randint(1, 4)):
+                product = random.choice(products)
+                qty = random.randint(1, 5)
+                item = OrderItem(
+                    order=o,
+                    product=product,
+                    quantity=qty,
+                    unit_price_cents=product.unit_price_cents,
+                )
+                db.session.add(item)
+                total_cents += product.unit_price_cents * qty
+
+            o.total_amount_cents = total_cents
+
+    db.session.commit()
+
+    # --- Kontakte ---
+    channels = ["phone", "email", "meeting", "chat"]
+    subjects = [
+        "Rückfrage zum Angebot",
+        "Support-Anfrage",
+        "Quartalsgespräch",
+        "Lizenzverlängerung",
+        "Kickoff Meeting",
+        "Status-Update",
+    ]
+
+    for customer in customers:
+        for _ in range(random.randint(3, 8)):
+            contact_date = random_date_within_last_years()
+            channel = random.choice(channels)
+            subject = random.choice(subjects)
+            contact = Contact(
+                customer=customer,
+                user=chef,
+                channel=channel,
+                subject=subject,
+                notes="Beispielkontakt (Seeder).",
+                rating=random.choice([1, 2, 3, 4, 5]),
+                contact_at=contact_date,
+                created_at=contact_date,
+            )
+            db.session.add(contact)
+
+    db.session.commit()
+
+    print("✅ Seeder fertig: Demo-User, Kunden, Produkte, Bestellungen und Kontakte angelegt.")
+
+    if shard_count() > 1:
+        # alles liegt jetzt auf Shard 0 – auf die Shards verteilen
+        distribute()
+        print(f"✅ Auf {shard_count()} Shards verteilt.")
+
+
+@click.command("archive")
+@with_appcontext
+@click.option("--days", type=int, default=None, help="Alter in Tagen (Standard: ARCHIVE_AFTER_DAYS).")
+@click.option("--batch-size", type=int, default=None, help="Zeilen pro Batch (Standard: ARCHIVE_BATCH_SIZE).")
+def archive_command(days, batch_size):
+    """Verschiebt alte Bestellungen und Kontakte in die Archivtabellen."""
+    days = days or current_app.config["ARCHIVE_AFTER_DAYS"]
+    batch_size = batch_size or current_app.config["ARCHIVE_BATCH_SIZE"]
+    orders_moved = contacts_moved = 0
+    for _ in each_shard():
+        orders, contacts = archive_old_data(days=days, batch_size=batch_size)
+        orders_moved += orders
+        contacts_moved += contacts
+    print(f"✅ Archiviert: {orders_moved} Bestellungen, {contacts_moved} Kontakte (älter als {days} Tage).")
+
+
+@click.command("fx-load")
+@with_appcontext
+@click.argument("csv_path", type=click.Path(exists=True, dir_okay=False))
+def fx_load_command(csv_path):
+    """Importiert Tageskurse (CSV: date,currency,rate – Einheiten je 1 EUR)."""
+    # Referenztabelle: auf jedem Shard vollständig, damit Umsätze dort umgerechnet werden können
+    for _ in each_shard():
+        count = load_rates_csv(csv_path)
+    print(f"✅ {count} Tageskurse importiert (inkl. aufgefüllter Lücken).")
+
+
+def _log_info(message: str) -> None:
+    print(f"[INFO] {message}")
+
+
+@click.command("purge-deleted")
+@with_appcontext
+@click.option("--days", type=int, default=None, help="Mindestalter der Löschung in Tagen (Standard: PURGE_AFTER_DAYS).")
+def purge_deleted_command(days):
+    """Entfernt soft-gelöschte Kunden endgültig (inkl. Bestellungen und Kontakte)."""
+    days = current_app.config["PURGE_AFTER_DAYS"] if days is None else days
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    chunk_size = current_app.config["DELETE_CHUNK_SIZE"]
+    count = 0
+
+    for shard in each_shard():
+        # Abgebrochene Lösch-Aufträge zuerst zu Ende bringen
+        count += resume_deletions(chunk_size=chunk_size, log=_log_info)
+        customer_ids = db.session.scalars(
+            db.select(Customer.id).where(Customer.deleted_at.is_not(None), Customer.deleted_at <= cutoff)
+        ).all()
+
+        small, large = [], []
+        for customer_id in customer_ids:
+            if dependent_row_count(customer_id) > current_app.config["DELETE_CHUNKED_THRESHOLD"]:
+                large.append(customer_id)
+            else:
+                small.append(customer_id)
+
+        count += delete_customers(small, chunk_size=chunk_size)
+        # Große Kunden mit Commit pro Chunk, damit keine langen Sperren entstehen
+        count += delete_customers_chunked(large, chunk_size=chunk_size, log=_log_info)
+    print(f"✅ {count} gelöschte Kunden endgültig entfernt.")
+
+
+@click.command("delete-customers")
+@with_appcontext
+@click.argument("customer_ids", nargs=-1, type=int)
+@click.option("--chunk-size", type=int, default=None, help="Zeilen pro DELETE (Standard: DELETE_CHUNK_SIZE).")
+@click.option("--chunked", is_flag=True, help="Commit pro Chunk statt einer Transaktion (für sehr große Kunden, fortsetzbar).")
+@click.option("--resume", is_flag=True, help="Abgebrochene chunkweise Löschungen fortsetzen.")
+def delete_customers_command(customer_ids, chunk_size, chunked, resume):
+    """Löscht Kunden samt Bestellungen, Positionen und Kontakten."""
+    if not customer_ids and not resume:
+        raise click.UsageError("Kunden-IDs oder --resume angeben.")
+    chunk_size = chunk_size or current_app.config["DELETE_CHUNK_SIZE"]
+    count = 0
+    if resume:
+        for _ in each_shard():
+            count += resume_deletions(chunk_size=chunk_size, log=_log_info)
+
+    by_shard = {}
+    for customer_id in customer_ids:
+        by_shard.setdefault(shard_of(customer_id), []).append(customer_id)
+    for shard, ids in sorted(by_shard.items()):
+        with on_shard(shard):
+            if chunked:
+                count += delete_customers_chunked(ids, chunk_size=chunk_size, log=_log_info)
+            else:
+                count += delete_customers(ids, chunk_size=chunk_size)
+    print(f"✅ {count} Kunden gelöscht.")
+
+
+@click.command("shard-distribute")
+@with_appcontext
+@click.option("--batch-size", type=int, default=100, show_default=True, help="Kunden pro Umzug.")
+def shard_distribute_command(batch_size):
+    """Verteilt Kunden ohne Shard-Eintrag auf die Shards aus SHARD_URLS (wiederholbar)."""
+    moved = distribute(batch_size=batch_size)
+    print(f"✅ {sum(moved.values())} Kunden umgezogen.")
+    for shard, stats in enumerate(shard_stats()):
+        print(f"   Shard {shard}: {stats['customers']} Kunden, {stats['orders']} Bestellungen, "
+              f"{stats['contacts']} Kontakte")
+
+
+@click.command("import-orders")
+@with_appcontext
+@click.argument("json_path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--batch-size", type=int, default=1000, show_default=True,
+              help="Bestellungen pro Transaktion (jeder Stapel alles oder nichts).")
+def import_orders_command(json_path, batch_size):
+    """Importiert Bestellungen aus JSON (``{"orders": [...]}`` oder Liste, Format wie POST /api/orders/bulk)."""
+    with open(json_path, encoding="utf-8") as f:
+        payload = json.load(f)
+    orders = payload.get("orders") if isinstance(payload, dict) else payload
+    if not isinstance(orders, list):
+        raise click.ClickException('JSON-Objekt mit Liste "orders" oder JSON-Liste erwartet')
+
+    count = 0
+    for start in range(0, len(orders), batch_size):
+        try:
+            count += len(import_orders(orders[start:start + batch_size]))
+        except BulkOrderError as e:
+            for error in e.errors:
+                where = "Stapel" if error["index"] is None else f"Bestellung {start + error['index']}"
+                print(f"[WARN] {where}: {error['error']}")
+            raise click.ClickException(
+                f"Stapel ab Bestellung {start} abgebrochen ({e}); {count} Bestellungen bereits importiert."
+            )
+    print(f"✅ {count} Bestellungen importiert.")
+
+
+@click.command("dedupe")
+@with_appcontext
+@click.option("--report", is_flag=True, help="Mögliche Dubletten bewerten und ausgeben.")
+@click.option("--threshold", type=float, default=None, help="Mindest-Score 0–1 (Standard: DEDUPE_THRESHOLD).")
+@click.option("--workers", type=int, default=None, help="Prozesse für die Bewertung (Standard: DEDUPE_WORKERS).")
+@click.option("--limit", type=int, default=100, show_default=True, help="Höchstens so viele Paare ausgeben.")
+def dedupe_command(report, threshold, workers, limit):
+    """Baut den Dubletten-Schlüsselindex neu auf; mit --report werden ähnliche Kunden aufgelistet."""
+    config = current_app.config
+    records = load_records()
+    keys = rebuild_keys(records)
+    print(f"✅ Dubletten-Index: {len(records)} Kunden, {keys} Schlüssel.")
+    if not report:
+        return
+
+    duplicates, stats = find_duplicates(
+        records,
+        threshold=config["DEDUPE_THRESHOLD"] if threshold is None else threshold,
+        max_block=config["DEDUPE_MAX_BLOCK"],
+        workers=workers or config["DEDUPE_WORKERS"] or os.cpu_count() or 1,
+    )
+    for duplicate in duplicates[:limit]:
+        print(f"{duplicate.score:.2f}  #{duplicate.a.id} {duplicate.a.company}  ↔  "
+              f"#{duplicate.b.id} {duplicate.b.company}  – {', '.join(duplicate.reasons)}")
+    if len(duplicates) > limit:
+        print(f"… und {len(duplicates) - limit} weitere")
+    all_pairs = len(records) * (len(records) - 1) // 2
+    print(f"✅ {len(duplicates)} mögliche Dubletten; {stats['compared']} von {all_pairs} Paaren verglichen "
+          f"({stats['blocks']} Blöcke, {stats['skipped_blocks']} zu große übersprungen) "
+          f"in {stats['seconds']:.1f} s.")
+
+
+@click.command("backfill")
+@with_appcontext
+@click.argument("names", nargs=-1)
+@click.option("--batch-size", type=int, default=None, help="Zeilen je Chunk (Standard: BACKFILL_BATCH_SIZE).")
+@click.option("--pause", type=float, default=None, help="Pause je Chunk in Sekunden (Standard: BACKFILL_PAUSE_SECONDS).")
+@click.option("--max-rate", type=float, default=None,
+              help="Höchstens so viele Zeilen/s (Standard: BACKFILL_MAX_ROWS_PER_SECOND, 0 = unbegrenzt).")
+@click.option("--restart", is_flag=True, help="Checkpoint verwerfen und von vorn beginnen.")
+def backfill_command(names, batch_size, pause, max_rate, restart):
+    """Führt Online-Backfills in Chunks aus (fortsetzbar); ohne Namen: Übersicht mit Stand."""
+    engines = shard_engines()
+    if not names:
+        states = [backfill_status(engine) for engine in engines]
+        for name, job in BACKFILLS.items():
+            print(f"{name:<28} {job.description}")
+            for shard, state in enumerate(states):
+                row = state.get(name)
+                if row is None:
+                    text = "noch nicht gelaufen"
+                elif row.finished_at is not None:
+                    text = f"fertig {row.finished_at:%Y-%m-%d %H:%M} ({row.rows_scanned} Zeilen, {row.rows_updated} geändert)"
+                else:
+                    text = f"unterbrochen bei ID {row.last_id} von {row.max_id} ({row.rows_scanned} Zeilen)"
+                print(f"    Shard {shard}: {text}")
+        return
+
+    unknown = [name for name in names if name not in BACKFILLS]
+    if unknown:
+        raise click.ClickException(f"Unbekannter Backfill {', '.join(unknown)} – vorhanden: {', '.join(BACKFILLS)}")
+    try:
+        for name in names:
+            for shard, engine in enumerate(engines):
+                run_backfill(name, engine, batch_size=batch_size, pause=pause, max_rate=max_rate,
+                             restart=restart, shard=shard if len(engines) > 1 else None)
+    except KeyboardInterrupt:
+        raise click.ClickException("Abgebrochen – ein erneuter Aufruf macht beim letzten Checkpoint weiter.")
+    print("✅ Backfills fertig.")
+
+
+def register_commands(app):
+    for command in (
+        seed_command,
+        archive_command,
+        fx_load_command,
+        purge_deleted_command,
+        delete_customers_command,
+        shard_distribute_command,
+        import_orders_command,
+        dedupe_command,
+        backfill_command,
+    ):
+        app.cli.add_command(command)
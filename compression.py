@@ -0,0 +1,148 @@
+"""WSGI-Middleware: Antworten on-the-fly mit brotli oder gzip komprimieren.
+
+Komprimiert wird nur, wenn der Client es anbietet (``Accept-Encoding``), der
+Inhaltstyp Text ist und die Antwort mindestens ``min_size`` Bytes hat. Bei
+gestreamten Antworten ohne ``Content-Length`` werden dafür die ersten Bytes
+gepuffert; danach wird jedes Stück sofort komprimiert und geflusht, damit das
+Streaming erhalten bleibt. Bereits kodierte Antworten (z. B. die
+vorkomprimierten Assets) und ``Cache-Control: no-transform`` bleiben unberührt.
+"""
+import zlib
+
+from werkzeug.datastructures import Headers
+from werkzeug.http import parse_accept_header
+
+try:
+    import brotli
+except ImportError:  # optional – dann nur gzip
+    brotli = None
+
+COMPRESSIBLE = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+class _Gzip:
+    def __init__(self, level: int):
+        # wbits=31: gzip-Header statt rohem deflate
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._z.compress(data) + self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._z.flush()
+
+
+class _Brotli:
+    def __init__(self, quality: int):
+        self._c = brotli.Compressor(quality=quality, mode=brotli.MODE_TEXT)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._c.process(data) + self._c.flush()
+
+    def finish(self) -> bytes:
+        return self._c.finish()
+
+
+class CompressionMiddleware:
+    def __init__(self, app, min_size: int = 1024, level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.min_size = min_size
+        self.level = level
+        self.brotli_quality = brotli_quality
+
+    def _negotiate(self, environ) -> str | None:
+        if environ.get("REQUEST_METHOD") == "HEAD":
+            return None
+        accept = parse_accept_header(environ.get("HTTP_ACCEPT_ENCODING", ""))
+        if brotli is not None and accept.quality("br") > 0:
+            return "br"
+        if accept.quality("gzip") > 0:
+            return "gzip"
+        return None
+
+    def _compressor(self, encoding: str):
+        if encoding == "br":
+            return _Brotli(self.brotli_quality)
+        return _Gzip(self.level)
+
+    def _eligible(self, status: str, headers: Headers) -> bool:
+        code = int(status.split(" ", 1)[0])
+        if code < 200 or code in (204, 206, 304):
+            return False
+        if "Content-Encoding" in headers:
+            return False
+        if "no-transform" in headers.get("Cache-Control", ""):
+            return False
+        content_type = headers.get("Content-Type", "")
+        if not content_type.startswith(COMPRESSIBLE):
+            return False
+        length = headers.get("Content-Length", type=int)
+        return length is None or length >= self.min_size
+
+    def __call__(self, environ, start_response):
+        encoding = self._negotiate(environ)
+        if encoding is None:
+            return self.app(environ, start_response)
+
+        captured = []
+
+        def capture(status, headers, exc_info=None):
+            captured[:] = [status, Headers(headers), exc_info]
+            return lambda data: None  # write() wird von Flask nicht benutzt
+
+        body = self.app(environ, capture)
+        return self._respond(body, captured, start_response, encoding)
+
+    def _respond(self, body, captured, start_response, encoding):
+        try:
+            chunks = iter(body)
+            status, headers, exc_info = captured
+            if not self._eligible(status, headers):
+                start_response(status, headers.to_wsgi_list(), exc_info)
+                yield from chunks
+                return
+
+            # Anfang puffern, bis klar ist, ob sich Komprimieren lohnt
+            buffered, size = [], 0
+            for data in chunks:
+                if data:
+                    buffered.append(data)
+                    size += len(data)
+                    if size >= self.min_size:
+                        break
+            else:
+                # Antwort zu klein – unverändert senden
+                headers["Content-Length"] = str(size)
+                start_response(status, headers.to_wsgi_list(), exc_info)
+                yield b"".join(buffered)
+                return
+
+            headers["Content-Encoding"] = encoding
+            headers.remove("Content-Length")
+            vary = headers.get("Vary")
+            if not vary:
+                headers["Vary"] = "Accept-Encoding"
+            elif "accept-encoding" not in vary.lower():
+                headers["Vary"] = f"{vary}, Accept-Encoding"
+            etag = headers.get("ETag")
+            if etag and not etag.startswith("W/"):
+                # anderer Body als unkomprimiert → kein starker Validator mehr
+                headers["ETag"] = f"W/{etag}"
+            start_response(status, headers.to_wsgi_list(), exc_info)
+
+            compressor = self._compressor(encoding)
+            yield compressor.chunk(b"".join(buffered))
+            for data in chunks:
+                if data:
+                    yield compressor.chunk(data)
+            yield compressor.finish()
+        finally:
+            close = getattr(body, "close", None)
+            if close is not None:
+                close()
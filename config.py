@@ -0,0 +1,130 @@
+"""Konfiguration aus Umgebungsvariablen / ``.env``.
+
+Wird erst in ``create_app()`` gelesen – der Import hat keine Seiteneffekte.
+"""
+import os
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+
+
+def _bool(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_config() -> dict:
+    """Liest alle Einstellungen aus ``os.environ`` (nach ``load_dotenv``)."""
+    env = os.environ.get
+    replica_urls = [url.strip() for url in env("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+    shard_urls = [url.strip() for url in env("SHARD_URLS", "").split(",") if url.strip()]
+    return {
+        "SECRET_KEY": env("SECRET_KEY"),
+
+        # --- Datenbank ---
+        "SQLALCHEMY_DATABASE_URI": env("DATABASE_URL"),
+        "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+        # Read-Replicas (replica_1, …, siehe replicas.py) und weitere Shards (shard_1, …,
+        # siehe sharding.py; Shard 0 ist DATABASE_URL) als Binds
+        "SQLALCHEMY_BINDS": {
+            **{f"replica_{i}": url for i, url in enumerate(replica_urls, 1)},
+            **{f"shard_{i}": url for i, url in enumerate(shard_urls, 1)},
+        },
+        "SHARD_FANOUT_THREADS": int(env("SHARD_FANOUT_THREADS", "8")),
+        "REPLICA_STICKY_SECONDS": float(env("REPLICA_STICKY_SECONDS", "5")),  # Read-your-writes
+        "REPLICA_CHECK_INTERVAL": float(env("REPLICA_CHECK_INTERVAL", "10")),
+        "REPLICA_RETRY_AFTER": float(env("REPLICA_RETRY_AFTER", "30")),
+
+        # --- Mail ---
+        "MAIL_SERVER": env("MAIL_SERVER", "smtp.gmail.com"),
+        "MAIL_PORT": int(env("MAIL_PORT", "587")),
+        "MAIL_USE_TLS": _bool(env("MAIL_USE_TLS", "True")),
+        "MAIL_USERNAME": env("MAIL_USER"),
+        "MAIL_PASSWORD": env("MAIL_PASS"),
+        "MAIL_DEFAULT_SENDER": env("MAIL_SENDER", env("MAIL_USER", "noreply@example.com")),
+
+        # --- Archivierung ---
+        "ARCHIVE_AFTER_DAYS": int(env("ARCHIVE_AFTER_DAYS", "730")),
+        "ARCHIVE_BATCH_SIZE": int(env("ARCHIVE_BATCH_SIZE", "500")),
+
+        # --- Löschen / Audit ---
+        # Soft-gelöschte Kunden werden nach so vielen Tagen per "flask purge-deleted" entfernt
+        "PURGE_AFTER_DAYS": int(env("PURGE_AFTER_DAYS", "30")),
+        "DELETE_CHUNK_SIZE": int(env("DELETE_CHUNK_SIZE", "1000")),
+        # Ab so vielen Bestellungen + Kontakten löscht "flask purge-deleted" mit einem Commit pro Chunk
+        "DELETE_CHUNKED_THRESHOLD": int(env("DELETE_CHUNKED_THRESHOLD", "5000")),
+        "AUDIT_BATCH_SIZE": int(env("AUDIT_BATCH_SIZE", "500")),
+        "AUDIT_FLUSH_INTERVAL": float(env("AUDIT_FLUSH_INTERVAL", "2")),
+        # Nach so vielen Fehlversuchen eines Batches werden fehlerhafte Zeilen einzeln aussortiert
+        "AUDIT_MAX_RETRIES": int(env("AUDIT_MAX_RETRIES", "3")),
+        # Höchstens so viele Zeilen im Speicher; bei längerem DB-Ausfall fallen die ältesten heraus
+        "AUDIT_MAX_BUFFER": int(env("AUDIT_MAX_BUFFER", "100000")),
+
+        # --- Geldbeträge ---
+        "MONEY_LOCALE": env("MONEY_LOCALE", "de_DE"),  # de_DE oder de_AT
+        "REPORTING_CURRENCY": env("REPORTING_CURRENCY", "EUR").upper(),
+        # so oft prüft jeder Worker, ob "flask fx-load" neue Kurse geladen hat
+        "FX_CACHE_CHECK_SECONDS": float(env("FX_CACHE_CHECK_SECONDS", "10")),
+
+        # --- Listen / Auslieferung ---
+        "PER_PAGE_MAX": int(env("PER_PAGE_MAX", "200")),  # Obergrenze für ?per_page=
+        "STREAM_TEMPLATES": _bool(env("STREAM_TEMPLATES", "true")),
+        "STREAM_CHUNK_SIZE": int(env("STREAM_CHUNK_SIZE", "8192")),
+        "COMPRESS_ENABLED": _bool(env("COMPRESS_ENABLED", "true")),
+        "COMPRESS_MIN_SIZE": int(env("COMPRESS_MIN_SIZE", "1024")),
+        "COMPRESS_LEVEL": int(env("COMPRESS_LEVEL", "6")),  # gzip 1–9
+        "COMPRESS_BROTLI_QUALITY": int(env("COMPRESS_BROTLI_QUALITY", "4")),  # 0–11
+
+        # --- Login-Schutz (siehe login_guard.py) ---
+        "LOGIN_THROTTLE_STORAGE": env("LOGIN_THROTTLE_STORAGE", "memory").lower(),  # memory oder database
+        "LOGIN_IP_BURST": int(env("LOGIN_IP_BURST", "20")),
+        "LOGIN_IP_PER_MINUTE": float(env("LOGIN_IP_PER_MINUTE", "10")),
+        "LOGIN_USER_BURST": int(env("LOGIN_USER_BURST", "5")),
+        "LOGIN_USER_PER_MINUTE": float(env("LOGIN_USER_PER_MINUTE", "2")),
+        "LOGIN_HASH_WORKERS": int(env("LOGIN_HASH_WORKERS", "1")),  # Prozesse je Web-Worker, 0 = inline
+        "LOGIN_HASH_QUEUE": int(env("LOGIN_HASH_QUEUE", "8")),  # darüber hinaus: 503
+        "LOGIN_HASH_TIMEOUT": float(env("LOGIN_HASH_TIMEOUT", "10")),
+        "LOGIN_HASH_NICE": int(env("LOGIN_HASH_NICE", "10")),
+        # Anzahl vertrauenswürdiger Reverse-Proxys vor der App (X-Forwarded-For), 0 = direkt erreichbar
+        "TRUSTED_PROXIES": int(env("TRUSTED_PROXIES", "0")),
+        "PASSWORD_HASH_METHOD": env("PASSWORD_HASH_METHOD", "scrypt"),  # z. B. "scrypt:65536:8:1"
+        "PASSWORD_SALT_LENGTH": int(env("PASSWORD_SALT_LENGTH", "16")),
+
+        # --- Metriken (GET /metrics, siehe metrics.py) ---
+        "METRICS_ENABLED": _bool(env("METRICS_ENABLED", "true")),
+        # Verzeichnis für mehrere Worker-Prozesse (gunicorn); leer = nur dieser Prozess
+        "METRICS_DIR": env("METRICS_DIR", ""),
+        "METRICS_FLUSH_SECONDS": float(env("METRICS_FLUSH_SECONDS", "5")),
+        "METRICS_TOKEN": env("METRICS_TOKEN", ""),  # gesetzt: Authorization: Bearer <token>
+        "METRICS_PUBLIC": _bool(env("METRICS_PUBLIC", "false")),  # ohne Token: true = jeder, sonst nur localhost
+
+        # --- Kundensuche (Typeahead, siehe suggest.py) ---
+        "SUGGEST_LIMIT": int(env("SUGGEST_LIMIT", "8")),
+        "SUGGEST_REFRESH_SECONDS": float(env("SUGGEST_REFRESH_SECONDS", "2")),  # Änderungen anderer Worker
+        "SUGGEST_REBUILD_SECONDS": float(env("SUGGEST_REBUILD_SECONDS", "900")),  # kompletter Neuaufbau
+
+        # --- Bestellungen (Massen-Erfassung, siehe bulk_orders.py) ---
+        "BULK_ORDERS_MAX": int(env("BULK_ORDERS_MAX", "10000")),  # je Aufruf von POST /api/orders/bulk
+        "PRODUCT_PRICE_CACHE_SECONDS": float(env("PRODUCT_PRICE_CACHE_SECONDS", "60")),
+
+        # --- Dubletten (siehe dedupe.py) ---
+        "DEDUPE_THRESHOLD": float(env("DEDUPE_THRESHOLD", "0.85")),  # Score 0–1 ab dem gewarnt/gemeldet wird
+        "DEDUPE_MAX_BLOCK": int(env("DEDUPE_MAX_BLOCK", "500")),  # größere Blöcke werden übersprungen
+        "DEDUPE_WORKERS": int(env("DEDUPE_WORKERS", "0")),  # Prozesse für "flask dedupe --report", 0 = alle CPUs
+
+        # --- Online-Backfills (flask backfill, siehe backfill.py) ---
+        "BACKFILL_BATCH_SIZE": int(env("BACKFILL_BATCH_SIZE", "1000")),  # Zeilen je Chunk/Transaktion
+        "BACKFILL_PAUSE_SECONDS": float(env("BACKFILL_PAUSE_SECONDS", "0.05")),  # Pause nach jedem Chunk
+        "BACKFILL_MAX_ROWS_PER_SECOND": float(env("BACKFILL_MAX_ROWS_PER_SECOND", "0")),  # 0 = unbegrenzt
+    }
+
+
+def validate(config) -> None:
+    """Pflichtwerte prüfen – Fehler erst beim Erzeugen der App, nicht beim Import."""
+    if not config.get("SECRET_KEY"):
+        raise RuntimeError("SECRET_KEY fehlt in .env")
+    if not config.get("SQLALCHEMY_DATABASE_URI"):
+        raise RuntimeError(
+            "DATABASE_URL ist nicht gesetzt! "
+            "MySQL/MariaDB muss in der .env definiert sein."
+        )
+    if config.get("LOGIN_THROTTLE_STORAGE") not in ("memory", "database"):
+        raise RuntimeError("LOGIN_THROTTLE_STORAGE muss 'memory' oder 'database' sein.")
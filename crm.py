@@ -0,0 +1,403 @@
+"""Blueprint "crm": Dashboard, Kunden, Bestellungen und Kontakte."""
+from datetime import datetime
+
+from sqlalchemy import or_, select
+from flask import (
+    Blueprint, current_app, render_template, stream_template, request, redirect, url_for, flash
+)
+from flask_login import login_required
+
+from archive import archived_revenue, last_archived_contact
+from audit import customer_history
+from dedupe import possible_duplicates
+from forms import CustomerForm
+from fx import order_revenue
+from http_cache import conditional, customer_version, lists_version
+from models import db, Customer, Order, Contact
+from money import Money, format_money
+from read_models import CustomerActivityRow, CustomerRow, ContactRow, OrderRow, customer_timeline
+from replicas import read_replica
+from sharding import allocate_customer_id, customer_shard, on_shard, shard_page
+
+
+bp = Blueprint("crm", __name__)
+
+
+@bp.app_template_filter("money")
+def money_filter(value, currency=None):
+    """Jinja-Filter: ``{{ order.total|money }}`` → ``1.234,56 €``."""
+    return format_money(value, currency, locale=current_app.config["MONEY_LOCALE"])
+
+
+def _per_page(default: int) -> int:
+    """``?per_page=`` aus der URL, begrenzt auf 1 … ``PER_PAGE_MAX``."""
+    value = request.args.get("per_page", default, type=int)
+    return max(1, min(value, current_app.config["PER_PAGE_MAX"]))
+
+
+def _date_range():
+    """Datumsbereich aus ``?from=``/``?to=`` (``JJJJ-MM-TT``): ``(from_str, to_str, from, to)``.
+
+    Ungültige Werte werden ignoriert; ``to`` gilt bis 23:59:59.
+    """
+    date_from_str = (request.args.get("from") or "").strip()
+    date_to_str = (request.args.get("to") or "").strip()
+    date_from = None
+    date_to = None
+
+    if date_from_str:
+        try:
+            date_from = datetime.strptime(date_from_str, "%Y-%m-%d")
+        except ValueError:
+            date_from_str = ""
+
+    if date_to_str:
+        try:
+            date_to = datetime.strptime(date_to_str, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
+        except ValueError:
+            date_to_str = ""
+
+    return date_from_str, date_to_str, date_from, date_to
+
+
+def _range_args(date_from_str: str, date_to_str: str) -> dict:
+    """Datumsfilter für ``url_for`` (``from`` ist in Jinja kein gültiger Argumentname)."""
+    return {key: value for key, value in (("from", date_from_str), ("to", date_to_str)) if value}
+
+
+def _render_list(template: str, **context):
+    """Rendert große Listen gestreamt: Kopf und erste Zeilen gehen raus, bevor der Rest fertig ist.
+
+    Jinja liefert sehr viele kleine Stücke – sie werden zu ``STREAM_CHUNK_SIZE``
+    Zeichen gebündelt, sonst wird jedes Stück ein eigener Chunk/Syscall.
+    """
+    if not current_app.config["STREAM_TEMPLATES"]:
+        return render_template(template, **context)
+
+    chunk_size = current_app.config["STREAM_CHUNK_SIZE"]
+    pieces = stream_template(template, **context)  # hält den Request-Kontext fest
+
+    def chunks():
+        buffer, size = [], 0
+        for piece in pieces:
+            buffer.append(piece)
+            size += len(piece)
+            if size >= chunk_size:
+                yield "".join(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield "".join(buffer)
+
+    return current_app.response_class(chunks(), mimetype="text/html")
+
+
+# ------------------ Routes ------------------
+@bp.route("/")
+@read_replica
+@login_required
+@conditional(lists_version)
+def index():
+    # Alle drei Abschnitte über alle Shards (je 10 neueste bzw. alphabetisch erste)
+    # --- Kunden-Sektion ---
+    q_customers = (request.args.get("q") or "").strip()
+    cust_query = CustomerActivityRow.query()
+
+    if q_customers:
+        like = f"%{q_customers}%"
+        cust_query = cust_query.where(
+            or_(
+                Customer.company.ilike(like),
+                Customer.contact_name.ilike(like),
+                Customer.email.ilike(like),
+                Customer.phone.ilike(like),
+            )
+        )
+
+    customer_list = shard_page(
+        cust_query, Customer.company, Customer.id, per_page=10, into=CustomerActivityRow
+    ).items
+
+    # Aktivität: Tage seit letztem Kontakt (kommt als Spalte mit)
+    now = datetime.utcnow()
+    customer_rows = []
+    for c in customer_list:
+        if c.last_contact_at:
+            days = (now - c.last_contact_at).days
+        else:
+            days = None
+        customer_rows.append((c, days))
+
+    # --- Bestellungen-Sektion ---
+    q_orders = (request.args.get("q_orders") or "").strip()
+    order_query = OrderRow.query()
+
+    if q_orders:
+        like = f"%{q_orders}%"
+        order_query = order_query.where(
+            or_(
+                Order.order_number.ilike(like),
+                Customer.company.ilike(like),
+            )
+        )
+
+    orders = shard_page(
+        order_query, Order.order_date, Order.id, per_page=10, descending=True, into=OrderRow
+    ).items
+
+    # --- Kontakte-Sektion ---
+    channel = (request.args.get("channel") or "all").strip().lower()
+    contact_query = ContactRow.query()
+
+    if channel and channel != "all":
+        contact_query = contact_query.where(Contact.channel == channel)
+
+    contacts = shard_page(
+        contact_query, Contact.contact_at, Contact.id, per_page=10, descending=True, into=ContactRow
+    ).items
+
+    return render_template(
+        "index.html",
+        customers=customer_rows,
+        q_customers=q_customers,
+        orders=orders,
+        q_orders=q_orders,
+        contacts=contacts,
+        channel=channel,
+    )
+
+@bp.route("/customers")
+@read_replica
+@login_required
+@conditional(lists_version)
+def customers():
+    q = request.args.get("q", "", type=str).strip()
+    per_page = _per_page(10)
+
+    query = CustomerRow.query()
+    if q:
+        like = f"%{q}%"
+        query = query.where(
+            db.or_(
+                Customer.company.ilike(like),
+                Customer.contact_name.ilike(like),
+                Customer.email.ilike(like),
+                Customer.phone.ilike(like),
+                Customer.notes.ilike(like),
+            )
+        )
+
+    pagination = shard_page(
+        query, Customer.company, Customer.id, per_page,
+        after=request.args.get("after"), before=request.args.get("before"), into=CustomerRow,
+    )
+    return render_template("customers.html", pagination=pagination, q=q)
+
+@bp.route("/contacts")
+@read_replica
+@login_required
+@conditional(lists_version)
+def contacts():
+    channel = (request.args.get("channel") or "all").strip().lower()
+    per_page = _per_page(20)
+
+    query = ContactRow.query()
+
+    if channel and channel != "all":
+        query = query.where(Contact.channel == channel)
+
+    pagination = shard_page(
+        query, Contact.contact_at, Contact.id, per_page,
+        after=request.args.get("after"), before=request.args.get("before"), descending=True, into=ContactRow,
+    )
+
+    return _render_list(
+        "contacts.html",
+        pagination=pagination,
+        channel=channel,
+    )
+
+@bp.route("/orders")
+@read_replica
+@login_required
+@conditional(lists_version)
+def orders():
+    q = (request.args.get("q") or "").strip()
+    per_page = _per_page(20)
+
+    query = OrderRow.query()
+
+    if q:
+        like = f"%{q}%"
+        query = query.where(
+            or_(
+                Order.order_number.ilike(like),
+                Customer.company.ilike(like),
+            )
+        )
+
+    pagination = shard_page(
+        query, Order.order_date, Order.id, per_page,
+        after=request.args.get("after"), before=request.args.get("before"), descending=True, into=OrderRow,
+    )
+
+    return _render_list(
+        "orders.html",
+        pagination=pagination,
+        q=q,
+    )
+
+@bp.route("/customers/<int:customer_id>")
+@read_replica
+@login_required
+@customer_shard
+@conditional(customer_version)
+def customer_detail(customer_id):
+    customer = Customer.active().filter_by(id=customer_id).first_or_404()
+
+    # Letzter Kontakt (für Header)
+    last_contact = (
+        Contact.query.filter_by(customer_id=customer.id)
+        .order_by(Contact.contact_at.desc())
+        .first()
+    )
+    if last_contact is None:
+        # Ältere Kontakte liegen ggf. bereits im Archiv
+        last_contact = last_archived_contact(customer.id)
+    now = datetime.utcnow()
+    days_since_last_contact = None
+    if last_contact:
+        days_since_last_contact = (now - last_contact.contact_at).days
+
+    # KPI: Umsatz (ohne stornierte) in der Berichtswährung – umgerechnet im SQL,
+    # plus vorberechneter Archiv-Umsatz
+    reporting_currency = current_app.config["REPORTING_CURRENCY"]
+
+    # Umsatz gesamt
+    live_total, missing_total = order_revenue(customer.id, reporting_currency)
+    archived_total, archived_missing = archived_revenue(customer.id, reporting_currency)
+    revenue_total = live_total + Money(archived_total, reporting_currency)
+
+    # Umsatz letztes Jahr (Kalenderjahr)
+    today = now.date()
+    last_year = today.year - 1
+    jan1 = datetime(last_year, 1, 1)
+    dec31 = datetime(last_year, 12, 31, 23, 59, 59)
+
+    live_last_year, _ = order_revenue(customer.id, reporting_currency, start=jan1, end=dec31)
+    archived_last_year, _ = archived_revenue(customer.id, reporting_currency, year=last_year)
+    revenue_last_year = live_last_year + Money(archived_last_year, reporting_currency)
+
+    # Bestellungen ohne Wechselkurs fehlen in den KPIs
+    orders_without_rate = missing_total + archived_missing
+
+    date_from_str, date_to_str, date_from, date_to = _date_range()
+    # Bestellungen und Kontakte als eine Timeline (weitere Seiten per customer_timeline_view)
+    timeline, next_before = customer_timeline(
+        customer.id, before=request.args.get("before"), date_from=date_from, date_to=date_to
+    )
+
+    return render_template(
+        "customer_detail.html",
+        customer=customer,
+        last_contact=last_contact,
+        days_since_last_contact=days_since_last_contact,
+        revenue_total=revenue_total,
+        revenue_last_year=revenue_last_year,
+        orders_without_rate=orders_without_rate,
+        last_year=last_year,
+        date_from=date_from_str,
+        date_to=date_to_str,
+        timeline=timeline,
+        next_before=next_before,
+        range_args=_range_args(date_from_str, date_to_str),
+    )
+
+@bp.route("/customers/<int:customer_id>/timeline")
+@read_replica
+@login_required
+@customer_shard
+def customer_timeline_view(customer_id):
+    """Nächste Timeline-Seite als HTML-Fragment (Nachladen beim Scrollen).
+
+    Bewusst ohne ``@conditional``: jede Seite hat einen eigenen Cursor und wird
+    beim Scrollen nur einmal geladen – ein 304 bringt hier kaum etwas.
+    """
+    db.first_or_404(select(Customer.id).where(Customer.id == customer_id, Customer.deleted_at.is_(None)))
+    date_from_str, date_to_str, date_from, date_to = _date_range()
+    timeline, next_before = customer_timeline(
+        customer_id, before=request.args.get("before"), date_from=date_from, date_to=date_to
+    )
+    return render_template(
+        "customer_timeline.html",
+        customer_id=customer_id,
+        timeline=timeline,
+        next_before=next_before,
+        range_args=_range_args(date_from_str, date_to_str),
+    )
+
+@bp.route("/customers/new", methods=["GET", "POST"])
+@login_required
+def customer_new():
+    form = CustomerForm()
+    duplicates = []
+    if form.validate_on_submit():
+        # Warnung vor möglichen Dubletten; "Trotzdem anlegen" schickt ignore_duplicates mit
+        if not request.form.get("ignore_duplicates"):
+            duplicates = possible_duplicates(form.company.data, form.email.data, form.phone.data)
+        if not duplicates:
+            c = Customer(
+                company=form.company.data,
+                contact_name=form.contact_name.data,
+                email=form.email.data,
+                phone=form.phone.data,
+                notes=form.notes.data,
+            )
+            shard = 0
+            assigned = allocate_customer_id()  # nur mit SHARD_URLS
+            if assigned:
+                c.id, shard = assigned
+            with on_shard(shard):
+                db.session.add(c)
+                db.session.commit()
+            flash("Kunde angelegt.", "success")
+            return redirect(url_for("crm.customers"))
+    return render_template("customer_form.html", form=form, title="Neuer Kunde", duplicates=duplicates)
+
+@bp.route("/customers/<int:customer_id>/edit", methods=["GET", "POST"])
+@login_required
+@customer_shard
+def customer_edit(customer_id):
+    customer = Customer.active().filter_by(id=customer_id).first_or_404()
+    form = CustomerForm(obj=customer)
+    if form.validate_on_submit():
+        form.populate_obj(customer)
+        db.session.commit()
+        flash("Kunde aktualisiert.", "success")
+        return redirect(url_for("crm.customer_detail", customer_id=customer.id))
+    return render_template("customer_form.html", form=form, title="Kunde bearbeiten")
+
+@bp.route("/customers/<int:customer_id>/delete", methods=["POST"])
+@login_required
+@customer_shard
+def customer_delete(customer_id):
+    customer = Customer.active().filter_by(id=customer_id).first_or_404()
+    # Soft Delete – endgültig entfernt wird per "flask purge-deleted"
+    customer.deleted_at = datetime.utcnow()
+    db.session.commit()
+    flash("Kunde gelöscht.", "info")
+    return redirect(url_for("crm.customers"))
+
+@bp.route("/customers/<int:customer_id>/history")
+@login_required
+@customer_shard
+def customer_history_view(customer_id):
+    customer = Customer.active().filter_by(id=customer_id).first_or_404()
+    before = request.args.get("before", type=int)
+    entries, next_before = customer_history(customer.id, before_id=before)
+    return render_template(
+        "customer_history.html",
+        customer=customer,
+        entries=entries,
+        next_before=next_before,
+        before=before,
+    )
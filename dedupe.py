@@ -0,0 +1,325 @@
+"""Dubletten-Suche für Kunden: ``flask dedupe --report`` und Warnung in ``customer_new()``.
+
+Alle Paare zu vergleichen ist O(n²) – bei 500.000 Kunden über 10¹¹ Vergleiche.
+Stattdessen bekommt jeder Kunde einige Blocking-Schlüssel aus normalisierten
+Daten, und verglichen werden nur Kunden mit gemeinsamem Schlüssel:
+
+- ``name:`` Firmenname ohne Rechtsform, Satzzeichen, Leerzeichen und Akzente
+  ("Acme GmbH", "ACME Gmbh." → ``name:acme``)
+- ``words:`` dieselben Wörter sortiert ("Bau Müller" = "Müller Bau")
+- ``pre:`` die ersten fünf Zeichen davon (fängt Tippfehler weiter hinten)
+- ``mail:`` Domain der E-Mail-Adresse (ohne Freemailer)
+- ``tel:`` die letzten sieben Ziffern der Telefonnummer (+43 1 234567 = 01 234567)
+
+Die Schlüssel stehen in ``customer_dedupe_keys`` (Shard 0) und werden per
+Session-Events beim Commit nachgeführt; die Warnung beim Anlegen kostet so eine
+indizierte Abfrage plus das Laden weniger Kandidaten. ``flask dedupe`` baut die
+Tabelle komplett neu auf, mit ``--report`` werden außerdem alle Paare je Block
+in einem Prozess-Pool bewertet (``DEDUPE_WORKERS``). Blöcke mit mehr als
+``DEDUPE_MAX_BLOCK`` Kunden sind zu unspezifisch und werden übersprungen.
+"""
+import multiprocessing
+import re
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from difflib import SequenceMatcher
+from typing import NamedTuple
+
+from flask import current_app
+from sqlalchemy import delete, event, func, insert, inspect, select
+
+from models import db, Customer, CustomerDedupeKey
+from sharding import fan_out
+
+CHANGES_KEY = "dedupe_changes"
+
+LEGAL_FORMS = frozenset({
+    "gmbh", "gesmbh", "mbh", "ges", "ag", "kg", "kgaa", "og", "ohg", "gbr", "ug", "eu", "e", "u",
+    "co", "se", "ltd", "inc", "llc", "und", "and",
+})
+FREEMAIL = frozenset({
+    "gmail.com", "googlemail.com", "gmx.at", "gmx.de", "gmx.net", "web.de", "yahoo.com", "yahoo.de",
+    "hotmail.com", "outlook.com", "live.com", "icloud.com", "aon.at", "chello.at", "a1.net", "t-online.de",
+})
+PREFIX_LENGTH = 5
+PHONE_DIGITS = 7
+
+# Aufschlag auf die Namensähnlichkeit
+DOMAIN_BONUS = 0.15
+PHONE_BONUS = 0.2
+
+# Kandidaten je Warnung (meiste gemeinsame Schlüssel zuerst)
+CANDIDATE_LIMIT = 200
+
+# nur in diese Felder fließen die Schlüssel ein
+WATCHED_FIELDS = ("company", "email", "phone", "deleted_at")
+
+
+class Record(NamedTuple):
+    id: int
+    shard: int
+    company: str
+    name: str  # normalisiert, Wörter mit Leerzeichen
+    email: str
+    domain: str  # leer bei Freemailern
+    phone: str  # letzte Ziffern
+    keys: frozenset
+
+
+class Duplicate(NamedTuple):
+    score: float
+    a: Record
+    b: Record
+    reasons: tuple
+
+
+# ------------------ Normalisieren ------------------
+def company_words(company: str | None) -> list[str]:
+    """Wörter des Firmennamens ohne Rechtsform, Akzente und Satzzeichen."""
+    folded = unicodedata.normalize("NFKD", (company or "").casefold())
+    words = re.findall(r"[a-z0-9]+", "".join(ch for ch in folded if not unicodedata.combining(ch)))
+    return [w for w in words if w not in LEGAL_FORMS] or words
+
+
+def make_record(customer_id: int, shard: int, company: str | None, email: str | None,
+                phone: str | None) -> Record:
+    words = company_words(company)
+    email = (email or "").strip().casefold()
+    domain = email.rpartition("@")[2] if "@" in email else ""
+    if domain in FREEMAIL:
+        domain = ""
+    digits = re.sub(r"\D", "", phone or "")
+    phone = digits[-PHONE_DIGITS:] if len(digits) >= PHONE_DIGITS else ""
+
+    keys = set()
+    compact = "".join(words)
+    if compact:
+        keys.add(f"name:{compact}"[:200])
+        if len(words) > 1:
+            keys.add(f"words:{' '.join(sorted(words))}"[:200])
+        if len(compact) > PREFIX_LENGTH:
+            keys.add(f"pre:{compact[:PREFIX_LENGTH]}")
+    if domain:
+        keys.add(f"mail:{domain}"[:200])
+    if phone:
+        keys.add(f"tel:{phone}")
+    return Record(customer_id, shard, company or "", " ".join(words), email, domain, phone, frozenset(keys))
+
+
+# ------------------ Bewerten ------------------
+def score(a: Record, b: Record, threshold: float) -> tuple[float, tuple] | None:
+    """Ähnlichkeit 0–1 mit Begründung – ``None`` unter ``threshold``."""
+    if a.email and a.email == b.email:
+        return 1.0, ("gleiche E-Mail",)
+    bonus, reasons = 0.0, []
+    if a.domain and a.domain == b.domain:
+        bonus += DOMAIN_BONUS
+        reasons.append("gleiche Domain")
+    if a.phone and a.phone == b.phone:
+        bonus += PHONE_BONUS
+        reasons.append("gleiche Telefonnummer")
+
+    matcher = SequenceMatcher(None, a.name, b.name, autojunk=False)
+    # billige Obergrenzen zuerst – die meisten Paare eines Blocks sind keine Dubletten
+    if matcher.real_quick_ratio() + bonus < threshold or matcher.quick_ratio() + bonus < threshold:
+        return None
+    similarity = matcher.ratio()
+    if similarity + bonus < threshold and " " in a.name:
+        # vertauschte Wörter ("Bau Müller" / "Müller Bau")
+        similarity = max(similarity, SequenceMatcher(
+            None, " ".join(sorted(a.name.split())), " ".join(sorted(b.name.split())), autojunk=False
+        ).ratio())
+    total = min(1.0, similarity + bonus)
+    if total < threshold:
+        return None
+    return round(total, 3), (f"Name {round(similarity * 100)} %", *reasons)
+
+
+_records = None  # im Pool-Prozess: {ID: Record}
+_threshold = None
+
+
+def _init_worker(records: dict, threshold: float) -> None:
+    global _records, _threshold
+    _records, _threshold = records, threshold
+
+
+def _score_blocks(blocks: list[tuple[str, list[int]]]) -> tuple[int, list[tuple]]:
+    """Alle Paare der Blöcke; ein Paar zählt nur in seinem kleinsten gemeinsamen Schlüssel."""
+    compared, found = 0, []
+    for key, ids in blocks:
+        members = [_records[i] for i in ids]
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                if min(a.keys & b.keys) != key:
+                    continue  # schon in einem anderen Block bewertet
+                compared += 1
+                result = score(a, b, _threshold)
+                if result is not None:
+                    found.append((result[0], a.id, b.id, result[1]))
+    return compared, found
+
+
+def _batches(blocks: list, parts: int) -> list[list]:
+    """Teilt die Blöcke in etwa gleich viele Paare auf (größte zuerst)."""
+    blocks = sorted(blocks, key=lambda block: len(block[1]), reverse=True)
+    target = sum(len(ids) * (len(ids) - 1) // 2 for _, ids in blocks) / parts or 1
+    batches, batch, pairs = [], [], 0
+    for block in blocks:
+        batch.append(block)
+        pairs += len(block[1]) * (len(block[1]) - 1) // 2
+        if pairs >= target:
+            batches.append(batch)
+            batch, pairs = [], 0
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def find_duplicates(records: list[Record], threshold: float, max_block: int,
+                    workers: int = 1) -> tuple[list[Duplicate], dict]:
+    """Bewertet alle Kandidatenpaare; gibt ``(Dubletten nach Score, Statistik)`` zurück."""
+    started = time.perf_counter()
+    blocks = {}
+    for record in records:
+        for key in record.keys:
+            blocks.setdefault(key, []).append(record.id)
+    kept = {key for key, ids in blocks.items() if 1 < len(ids) <= max_block}
+    skipped = sum(1 for ids in blocks.values() if len(ids) > max_block)
+
+    # übersprungene Blöcke zählen auch beim "kleinsten gemeinsamen Schlüssel" nicht mit
+    by_id = {r.id: r._replace(keys=r.keys & kept) for r in records}
+    work = [(key, ids) for key, ids in blocks.items() if key in kept]
+
+    if workers > 1 and len(work) > 1:
+        # fork: die Kunden erben die Pool-Prozesse, statt sie je Aufgabe zu picklen
+        context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else None)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(by_id, threshold)) as executor:
+            results = list(executor.map(_score_blocks, _batches(work, workers * 4)))
+    else:
+        _init_worker(by_id, threshold)
+        results = [_score_blocks(work)]
+
+    duplicates = sorted(
+        (Duplicate(total, by_id[a], by_id[b], reasons) for _, found in results for total, a, b, reasons in found),
+        key=lambda d: (-d.score, d.a.id, d.b.id),
+    )
+    stats = {
+        "customers": len(records),
+        "blocks": len(work),
+        "skipped_blocks": skipped,
+        "compared": sum(compared for compared, _ in results),
+        "seconds": time.perf_counter() - started,
+    }
+    return duplicates, stats
+
+
+# ------------------ Schlüsselindex ------------------
+def load_records() -> list[Record]:
+    """Alle aktiven Kunden aller Shards."""
+    def load(session, shard):
+        rows = session.execute(
+            select(Customer.id, Customer.company, Customer.email, Customer.phone)
+            .where(Customer.deleted_at.is_(None))
+        )
+        return [make_record(customer_id, shard, company, email, phone) for customer_id, company, email, phone in rows]
+
+    return [record for part in fan_out(load) for record in part]
+
+
+def rebuild_keys(records: list[Record], batch_size: int = 5000) -> int:
+    """Ersetzt ``customer_dedupe_keys`` komplett; gibt die Anzahl Schlüssel zurück."""
+    table = CustomerDedupeKey.__table__
+    rows = [{"key": key, "customer_id": record.id} for record in records for key in record.keys]
+    with db.engine.begin() as conn:
+        conn.execute(delete(table))
+        for i in range(0, len(rows), batch_size):
+            conn.execute(insert(table), rows[i:i + batch_size])
+    return len(rows)
+
+
+def update_keys(changes: dict) -> None:
+    """``{Kunden-ID: (Firma, E-Mail, Telefon) oder None}`` – ``None`` entfernt die Schlüssel."""
+    table = CustomerDedupeKey.__table__
+    rows = [
+        {"key": key, "customer_id": customer_id}
+        for customer_id, data in changes.items() if data is not None
+        for key in make_record(customer_id, 0, *data).keys
+    ]
+    with db.engine.begin() as conn:
+        conn.execute(delete(table).where(table.c.customer_id.in_(list(changes))))
+        if rows:
+            conn.execute(insert(table), rows)
+
+
+def possible_duplicates(company: str, email: str | None = None, phone: str | None = None,
+                        exclude_id: int | None = None, limit: int = 5) -> list[Duplicate]:
+    """Bestehende Kunden, die dem neuen ähnlich sind – für die Warnung beim Anlegen."""
+    probe = make_record(exclude_id or 0, 0, company, email, phone)
+    if not probe.keys:
+        return []
+    table = CustomerDedupeKey.__table__
+    candidate_ids = db.session.scalars(
+        select(table.c.customer_id)
+        .where(table.c.key.in_(probe.keys))
+        .group_by(table.c.customer_id)
+        .order_by(func.count().desc())
+        .limit(CANDIDATE_LIMIT)
+    ).all()
+    candidate_ids = [i for i in candidate_ids if i != exclude_id]
+    if not candidate_ids:
+        return []
+
+    def load(session, shard):
+        rows = session.execute(
+            select(Customer.id, Customer.company, Customer.email, Customer.phone)
+            .where(Customer.id.in_(candidate_ids), Customer.deleted_at.is_(None))
+        )
+        return [make_record(customer_id, shard, company, email, phone) for customer_id, company, email, phone in rows]
+
+    threshold = current_app.config["DEDUPE_THRESHOLD"]
+    matches = []
+    for part in fan_out(load):
+        for candidate in part:
+            result = score(probe, candidate, threshold)
+            if result is not None:
+                matches.append(Duplicate(result[0], probe, candidate, result[1]))
+    matches.sort(key=lambda d: (-d.score, d.b.id))
+    return matches[:limit]
+
+
+# ------------------ Session-Events ------------------
+def _after_flush(session, flush_context):
+    changes = session.info.setdefault(CHANGES_KEY, {})
+    for obj in session.new | session.dirty:
+        if not isinstance(obj, Customer):
+            continue
+        state = inspect(obj)
+        if obj in session.new or any(state.attrs[field].history.has_changes() for field in WATCHED_FIELDS):
+            changes[obj.id] = None if obj.deleted_at else (obj.company, obj.email, obj.phone)
+    for obj in session.deleted:
+        if isinstance(obj, Customer):
+            changes[obj.id] = None
+
+
+def _after_commit(session):
+    changes = session.info.pop(CHANGES_KEY, None)
+    if changes:
+        try:
+            update_keys(changes)
+        except Exception as e:
+            # der Kunde ist gespeichert; "flask dedupe" baut den Index neu auf
+            print(f"[WARN] Dubletten-Schlüssel nicht aktualisiert: {e}")
+
+
+def _after_rollback(session):
+    session.info.pop(CHANGES_KEY, None)
+
+
+def init_dedupe(app):
+    if not event.contains(db.session, "after_flush", _after_flush):
+        event.listen(db.session, "after_flush", _after_flush)
+        event.listen(db.session, "after_commit", _after_commit)
+        event.listen(db.session, "after_rollback", _after_rollback)
@@ -0,0 +1,180 @@
+"""Löschen von Kunden inkl. aller abhängigen Daten als mengenbasierte Batch-Operationen.
+
+``Customer.orders``/``Customer.contacts`` sind ``lazy="dynamic"`` ohne Cascade.
+Statt alle Bestellungen und Positionen in die Session zu laden, werden
+``order_items``, ``orders``, ``contacts`` (und deren Archiv-Pendants) per
+``DELETE ... WHERE`` in ID-Chunks entfernt.
+
+- ``delete_customers()`` läuft in einer einzigen Transaktion (alles oder nichts).
+- ``delete_customers_chunked()`` committet nach jedem Chunk, damit bei sehr
+  großen Kunden keine langen Sperren entstehen. Jeder Kunde bekommt vorher einen
+  Auftrag in ``backfill_progress`` (``delete_customer:<id>``, Zähler im selben
+  Commit wie der Chunk); der Kundendatensatz wird zuletzt gelöscht. Abgebrochene
+  Aufträge setzt ``resume_deletions()`` fort (``flask delete-customers --resume``,
+  ``flask purge-deleted``).
+"""
+from datetime import datetime
+
+from sqlalchemy import delete, insert, select, update
+
+from models import (
+    db, BackfillProgress, Customer, CustomerDedupeKey, Order, OrderItem, Contact,
+    ArchivedOrder, ArchivedOrderItem, ArchivedContact, ArchivedRevenue,
+)
+from http_cache import LISTS, bump, customer_key
+
+
+DEFAULT_CHUNK_SIZE = 1000
+JOB_PREFIX = "delete_customer:"
+
+
+def _next_ids(column, where, chunk_size):
+    return db.session.scalars(
+        select(column).where(where).order_by(column).limit(chunk_size)
+    ).all()
+
+
+def _delete_dependents(customer_ids, chunk_size, job: str | None = None):
+    """Löscht alle abhängigen Zeilen der Kunden chunkweise. Gibt die Anzahl gelöschter Zeilen zurück.
+
+    Mit ``job`` wird nach jedem Chunk committet, zusammen mit dem Zähler des Auftrags.
+    """
+    deleted = 0
+    committed = 0
+
+    def done():
+        nonlocal committed
+        if job is not None:
+            _update_job(job, deleted - committed)
+            db.session.commit()
+            committed = deleted
+
+    # Bestellungen (live + Archiv) jeweils zusammen mit ihren Positionen
+    for order_model, item_model in ((Order, OrderItem), (ArchivedOrder, ArchivedOrderItem)):
+        while True:
+            order_ids = _next_ids(order_model.id, order_model.customer_id.in_(customer_ids), chunk_size)
+            if not order_ids:
+                break
+            deleted += db.session.execute(
+                delete(item_model).where(item_model.order_id.in_(order_ids))
+            ).rowcount
+            deleted += db.session.execute(
+                delete(order_model).where(order_model.id.in_(order_ids))
+            ).rowcount
+            done()
+
+    # Kontakte (live + Archiv)
+    for contact_model in (Contact, ArchivedContact):
+        while True:
+            contact_ids = _next_ids(contact_model.id, contact_model.customer_id.in_(customer_ids), chunk_size)
+            if not contact_ids:
+                break
+            deleted += db.session.execute(
+                delete(contact_model).where(contact_model.id.in_(contact_ids))
+            ).rowcount
+            done()
+
+    # Vorberechnete Archiv-Umsätze (wenige Zeilen je Kunde)
+    deleted += db.session.execute(
+        delete(ArchivedRevenue).where(ArchivedRevenue.customer_id.in_(customer_ids))
+    ).rowcount
+    done()
+    return deleted
+
+
+def _delete_customer_rows(customer_ids):
+    # Dubletten-Schlüssel liegen auf Shard 0 – Core-Deletes lösen keine Session-Events aus
+    db.session.execute(delete(CustomerDedupeKey).where(CustomerDedupeKey.customer_id.in_(customer_ids)))
+    return db.session.execute(
+        delete(Customer).where(Customer.id.in_(customer_ids)),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+
+
+def delete_customers(customer_ids, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Löscht Kunden samt abhängiger Daten in einer Transaktion. Gibt die Anzahl gelöschter Kunden zurück."""
+    customer_ids = list(customer_ids)
+    if not customer_ids:
+        return 0
+    try:
+        _delete_dependents(customer_ids, chunk_size)
+        count = _delete_customer_rows(customer_ids)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    bump(LISTS, *map(customer_key, customer_ids))
+    return count
+
+
+# ------------------ Fortsetzbare Aufträge ------------------
+def _start_job(job: str):
+    """Legt den Auftrag an (oder lässt einen abgebrochenen stehen) und committet."""
+    progress = BackfillProgress.__table__
+    if db.session.scalar(select(progress.c.name).where(progress.c.name == job)) is None:
+        now = datetime.utcnow()
+        db.session.execute(insert(progress).values(
+            name=job, rows_scanned=0, rows_updated=0, started_at=now, updated_at=now,
+        ))
+        db.session.commit()
+
+
+def _update_job(job: str, deleted: int, finished: bool = False):
+    progress = BackfillProgress.__table__
+    now = datetime.utcnow()
+    values = {"rows_updated": progress.c.rows_updated + deleted, "updated_at": now}
+    if finished:
+        values["finished_at"] = now
+    db.session.execute(update(progress).where(progress.c.name == job).values(values))
+
+
+def delete_customers_chunked(customer_ids, chunk_size: int = DEFAULT_CHUNK_SIZE, log=None) -> int:
+    """Löscht Kunden einzeln mit einem Commit pro Chunk. Gibt die Anzahl gelöschter Kunden zurück.
+
+    Alle ``customer_ids`` müssen auf dem aktuellen Shard liegen (``on_shard``).
+    Bricht der Lauf ab, bleibt der Auftrag offen und ``resume_deletions()`` macht
+    dort weiter – schon gelöschte Chunks fehlen einfach. ``log`` bekommt je
+    fertigem Kunden eine Meldung (die CLI gibt sie aus).
+    """
+    count = 0
+    for customer_id in customer_ids:
+        job = f"{JOB_PREFIX}{customer_id}"
+        try:
+            _start_job(job)
+            deleted = _delete_dependents([customer_id], chunk_size, job=job)
+            count += _delete_customer_rows([customer_id])
+            _update_job(job, 0, finished=True)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        if log is not None:
+            log(f"Kunde {customer_id} gelöscht ({deleted} abhängige Zeilen)")
+        bump(LISTS, customer_key(customer_id))
+    return count
+
+
+def pending_deletions() -> list[int]:
+    """IDs der Kunden mit abgebrochenem Lösch-Auftrag auf dem aktuellen Shard."""
+    progress = BackfillProgress.__table__
+    names = db.session.scalars(
+        select(progress.c.name)
+        .where(progress.c.name.startswith(JOB_PREFIX), progress.c.finished_at.is_(None))
+        .order_by(progress.c.started_at)
+    ).all()
+    return [int(name.removeprefix(JOB_PREFIX)) for name in names]
+
+
+def resume_deletions(chunk_size: int = DEFAULT_CHUNK_SIZE, log=None) -> int:
+    """Setzt alle abgebrochenen Lösch-Aufträge des aktuellen Shards fort."""
+    return delete_customers_chunked(pending_deletions(), chunk_size=chunk_size, log=log)
+
+
+def dependent_row_count(customer_id: int) -> int:
+    """Grobe Größe eines Kunden (Bestellungen + Kontakte, live und Archiv), um den Lösch-Modus zu wählen."""
+    total = 0
+    for model in (Order, Contact, ArchivedOrder, ArchivedContact):
+        total += db.session.scalar(
+            select(db.func.count(model.id)).where(model.customer_id == customer_id)
+        ) or 0
+    return total
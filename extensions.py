@@ -0,0 +1,28 @@
+"""Flask-Erweiterungen, die in ``create_app()`` an die App gebunden werden.
+
+Flask-Mail wird erst beim ersten Versand importiert und initialisiert
+(``get_mail()``) – der Großteil der Prozesse (CLI, Worker ohne Login) braucht es nie.
+"""
+from flask import current_app
+from flask_login import LoginManager
+
+from models import db, User
+
+
+login_manager = LoginManager()
+login_manager.login_view = "auth.login"
+login_manager.login_message = "Bitte melde dich an, um fortzufahren."
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    return db.session.get(User, int(user_id))
+
+
+def get_mail():
+    """Flask-Mail-Instanz der aktuellen App, beim ersten Aufruf erzeugt."""
+    mail = current_app.extensions.get("mail")
+    if mail is None:
+        from flask_mail import Mail
+        mail = Mail(current_app)
+    return mail
@@ -0,0 +1,26 @@
+from flask_wtf import FlaskForm
+from wtforms import StringField, TextAreaField, PasswordField, BooleanField
+from wtforms.validators import DataRequired, Email, Optional, Length, EqualTo
+
+
+class CustomerForm(FlaskForm):
+    company = StringField("Firma", validators=[DataRequired()])
+    contact_name = StringField("Ansprechperson", validators=[Optional()])
+    email = StringField("E-Mail", validators=[Optional(), Email(message="Ungültige E-Mail")])
+    phone = StringField("Telefon", validators=[Optional()])
+    notes = TextAreaField("Notizen", validators=[Optional()])
+
+
+class LoginForm(FlaskForm):
+    # Username wird als E-Mail verwendet
+    username = StringField("E-Mail", validators=[DataRequired(), Email(), Length(max=120)])
+    password = PasswordField("Passwort", validators=[DataRequired(), Length(min=6)])
+    remember = BooleanField("Angemeldet bleiben")
+
+
+class RegisterForm(FlaskForm):
+    username = StringField("E-Mail", validators=[DataRequired(), Email(), Length(max=120)])
+    password = PasswordField("Passwort", validators=[DataRequired(), Length(min=6)])
+    confirm = PasswordField("Passwort wiederholen", validators=[
+        DataRequired(), EqualTo("password", "Passwörter stimmen nicht überein")
+    ])
@@ -0,0 +1,190 @@
+"""Wechselkurse und Umsatz-Umrechnung in eine Berichtswährung.
+
+- Kurse kommen aus einer lokalen CSV-Datei (``date,currency,rate``; ``rate`` =
+  Einheiten der Währung je 1 EUR) und liegen in ``fx_rates``.
+- Die Umrechnung der Bestellumsätze passiert im Aggregat-SQL über einen Join
+  auf den letzten Kurs am oder vor ``DATE(order_date)`` – dieselbe Regel wie
+  ``get_rate()``, nicht pro Bestellung in Python.
+- ``get_rate()`` cacht Einzel-Lookups im Rendering (z. B. Monats-Aggregate aus
+  dem Archiv) je Prozess. Fehlende Kurse werden nicht gemerkt; nach einem
+  ``flask fx-load`` (in irgendeinem Prozess) verwirft jeder Worker seinen Cache
+  spätestens nach ``FX_CACHE_CHECK_SECONDS`` – erkannt am Zähler ``fx`` in
+  ``cache_versions``.
+"""
+import csv
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from flask import current_app
+from sqlalchemy import and_, case, delete, func, insert, select
+from sqlalchemy.orm import aliased
+
+from http_cache import FX, bump
+from models import db, Order, FxRate, CacheVersion
+from money import Money
+
+
+BASE_CURRENCY = "EUR"
+RATE_CACHE_SIZE = 4096
+
+_rates = OrderedDict()  # (Währung, Tag) → Kurs, nur gefundene Kurse, zuletzt benutzte hinten
+_rates_version = None  # Zähler "fx" beim Befüllen
+_rates_checked_at = 0.0
+_rate_stats = {"hit": 0, "miss": 0}
+
+
+# ------------------ Import ------------------
+def _fill_gaps(rates: dict[date, Decimal]) -> dict[date, Decimal]:
+    """Füllt fehlende Tage zwischen erstem und letztem Kurs mit dem Vortageskurs."""
+    days = sorted(rates)
+    filled = {}
+    current = days[0]
+    last_rate = rates[current]
+    while current <= days[-1]:
+        last_rate = rates.get(current, last_rate)
+        filled[current] = last_rate
+        current += timedelta(days=1)
+    return filled
+
+
+def load_rates_csv(path: str) -> int:
+    """Importiert Tageskurse aus einer CSV-Datei und ersetzt vorhandene Kurse im selben Zeitraum."""
+    per_currency: dict[str, dict[date, Decimal]] = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            currency = row["currency"].strip().upper()
+            if currency == BASE_CURRENCY:
+                continue
+            day = datetime.strptime(row["date"].strip(), "%Y-%m-%d").date()
+            per_currency.setdefault(currency, {})[day] = Decimal(row["rate"].strip())
+
+    count = 0
+    for currency, rates in per_currency.items():
+        filled = _fill_gaps(rates)
+        db.session.execute(
+            delete(FxRate).where(
+                FxRate.currency == currency,
+                FxRate.rate_date.between(min(filled), max(filled)),
+            )
+        )
+        db.session.execute(
+            insert(FxRate),
+            [{"rate_date": d, "currency": currency, "rate": r} for d, r in filled.items()],
+        )
+        count += len(filled)
+    db.session.commit()
+    bump(FX)  # alle Prozesse verwerfen ihren Kurs-Cache
+    _rates.clear()
+    return count
+
+
+# ------------------ Umrechnung im SQL ------------------
+def _latest_rate(rate, currency, day):
+    """Join-Bedingung: ``rate`` ist der letzte Kurs von ``currency`` am oder vor ``day``.
+
+    Wie ``get_rate()`` – auch Bestellungen nach dem letzten geladenen Tag haben
+    so einen Kurs. Die Unterabfrage liest nur den Primärschlüssel ``(Währung, Tag)``.
+    """
+    latest = aliased(FxRate)
+    return and_(
+        rate.currency == currency,
+        rate.rate_date == select(func.max(latest.rate_date))
+        .where(latest.currency == currency, latest.rate_date <= day)
+        .scalar_subquery(),
+    )
+
+
+def order_revenue(customer_id: int, currency: str, start=None, end=None) -> tuple[Money, int]:
+    """Umsatz (ohne stornierte) eines Kunden in ``currency``.
+
+    Gibt ``(Betrag, Anzahl Bestellungen ohne Kurs)`` zurück; Bestellungen ohne
+    Kurs am oder vor dem Bestelltag fließen nicht in den Betrag ein.
+    """
+    day = db.func.date(Order.order_date)
+    src = aliased(FxRate)
+    dst = aliased(FxRate)
+
+    # Betrag / Kurs(Quelle) * Kurs(Ziel); EUR hat immer Kurs 1
+    src_rate = case((Order.currency == BASE_CURRENCY, 1), else_=src.rate)
+    dst_rate = 1 if currency == BASE_CURRENCY else dst.rate
+    converted = case(
+        (Order.currency == currency, Order.total_amount_cents),
+        else_=Order.total_amount_cents * dst_rate / src_rate,
+    )
+
+    query = (
+        select(
+            db.func.sum(converted),
+            db.func.sum(case((converted.is_(None), 1), else_=0)),
+        )
+        .select_from(Order)
+        .outerjoin(src, _latest_rate(src, Order.currency, day))
+        .where(Order.customer_id == customer_id, Order.status != "storniert")
+    )
+    if currency != BASE_CURRENCY:
+        query = query.outerjoin(dst, _latest_rate(dst, currency, day))
+    if start is not None:
+        query = query.where(Order.order_date >= start)
+    if end is not None:
+        query = query.where(Order.order_date <= end)
+
+    total, missing = db.session.execute(query).one()
+    return Money(round(total or 0), currency), int(missing or 0)
+
+
+# ------------------ Einzel-Lookups (Rendering) ------------------
+def _rate_cache() -> OrderedDict:
+    """Kurs-Cache dieses Prozesses; leer, sobald sich der Zähler ``fx`` geändert hat."""
+    global _rates, _rates_version, _rates_checked_at
+    now = time.monotonic()
+    if now - _rates_checked_at >= current_app.config["FX_CACHE_CHECK_SECONDS"]:
+        _rates_checked_at = now
+        version = db.session.scalar(select(CacheVersion.version).where(CacheVersion.name == FX))
+        if version != _rates_version:
+            _rates, _rates_version = OrderedDict(), version
+    return _rates
+
+
+def rate_cache_stats() -> dict:
+    """``{"hit": n, "miss": n}`` seit dem Start des Prozesses (für ``/metrics``)."""
+    return dict(_rate_stats)
+
+
+def get_rate(currency: str, day: date) -> Decimal | None:
+    """Letzter bekannter Kurs von ``currency`` je 1 EUR am oder vor ``day``."""
+    if currency == BASE_CURRENCY:
+        return Decimal(1)
+    rates = _rate_cache()
+    rate = rates.get((currency, day))
+    if rate is not None:
+        _rate_stats["hit"] += 1
+        rates.move_to_end((currency, day))
+        return rate
+
+    _rate_stats["miss"] += 1
+    rate = db.session.scalar(
+        select(FxRate.rate)
+        .where(FxRate.currency == currency, FxRate.rate_date <= day)
+        .order_by(FxRate.rate_date.desc())
+        .limit(1)
+    )
+    # Fehlende Kurse nicht merken – sie können jederzeit nachgeladen werden;
+    # ist der Cache voll, fliegt der am längsten nicht benutzte Kurs (LRU)
+    if rate is not None:
+        if len(rates) >= RATE_CACHE_SIZE:
+            rates.popitem(last=False)
+        rates[currency, day] = rate
+    return rate
+
+
+def convert_cents(cents: int, from_currency: str, to_currency: str, day: date) -> int | None:
+    """Rechnet einen Cent-Betrag um; ``None``, wenn ein Kurs fehlt."""
+    if from_currency == to_currency:
+        return cents
+    src = get_rate(from_currency, day)
+    dst = get_rate(to_currency, day)
+    if src is None or dst is None:
+        return None
+    return round(Decimal(cents) * dst / src)
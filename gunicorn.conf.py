@@ -0,0 +1,69 @@
+"""gunicorn-Konfiguration: gunicorn -c gunicorn.conf.py wsgi:application
+
+Alle Werte lassen sich per Umgebungsvariable überschreiben.
+"""
+import os
+
+cpu_count = os.cpu_count() or 1
+
+bind = os.environ.get("BIND", f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+
+# Prozesse: klassische Faustregel 2 × CPU + 1, Threads für I/O-Wartezeit (DB, Mail)
+workers = int(os.environ.get("WEB_CONCURRENCY", cpu_count * 2 + 1))
+threads = int(os.environ.get("WEB_THREADS", "4"))
+worker_class = "gthread"
+
+# App einmal im Master laden (inkl. Template-Warmup), Worker erben sie per fork
+preload_app = True
+
+# Worker nach N Requests neu starten, um Speicherwachstum zu begrenzen;
+# Jitter verhindert, dass alle Worker gleichzeitig recyceln
+max_requests = int(os.environ.get("MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.environ.get("MAX_REQUESTS_JITTER", "100"))
+
+timeout = int(os.environ.get("WEB_TIMEOUT", "30"))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = os.environ.get("ACCESS_LOG", "-")
+errorlog = "-"
+
+# Metriken aller Worker (metrics.py) – ohne METRICS_DIR zeigt /metrics nur den antwortenden Worker
+metrics_dir = os.environ.get("METRICS_DIR", "")
+
+
+def on_starting(server):
+    if metrics_dir:
+        from metrics import clear_directory
+        clear_directory(metrics_dir)
+
+
+def post_fork(server, worker):
+    """DB-Verbindungen des Masters verwerfen, den Pool im Worker neu füllen, Hash-Pool starten."""
+    from wsgi import application, warm_pool
+    from login_guard import start_hash_pool
+    from models import db
+
+    with application.app_context():
+        # close=False: die Sockets gehören dem Master, nur die Referenzen verwerfen
+        for engine in db.engines.values():  # Primary + Read-Replicas
+            engine.dispose(close=False)
+    warm_pool(application)
+    # noch vor den Threads des Workers – die Hash-Prozesse entstehen per fork
+    start_hash_pool(application)
+
+
+def worker_exit(server, worker):
+    """Letzten Stand der Metriken schreiben, bevor der Worker endet."""
+    from wsgi import application
+    from metrics import flush
+
+    with application.app_context():
+        flush()
+
+
+def child_exit(server, worker):
+    """Zähler des beendeten Workers ins Archiv übernehmen (im Master)."""
+    if metrics_dir:
+        from metrics import mark_process_dead
+        mark_process_dead(metrics_dir, worker.pid)
@@ -0,0 +1,188 @@
+"""HTTP-Validatoren (ETag / Last-Modified) für Kundendetail und Listenseiten.
+
+Statt die Seite zu berechnen und danach zu hashen, wird vorab eine billige
+"Version" der zugrunde liegenden Daten gelesen: Zähler in ``cache_versions``
+(Shard 0), ein Primärschlüssel-Lookup. Passt sie zum ``If-None-Match`` des
+Browsers, antwortet die Route mit ``304 Not Modified``, ohne KPIs, Listen oder
+Template anzufassen.
+
+Die Zähler erhöht ``after_commit`` für jeden Commit, der Kunden, Bestellungen
+oder Kontakte über das ORM ändert – ``"lists"`` und ``"customer:<id>"``.
+Schreibpfade über Core (Archivierung, Löschen, Massen-Erfassung, Kursimport)
+rufen ``bump()`` selbst auf. Gelöschte oder archivierte Zeilen ändern die
+Version also ebenso wie neue – ohne ``COUNT(*)`` über ganze Tabellen.
+
+Der ETag enthält außerdem den User (Name in der Topbar), das Datum ("Tage seit
+letztem Kontakt"), die Berichtswährung und das aktuelle Stylesheet (ändert sich
+mit jedem Deployment neuer Template-Klassen).
+"""
+import hashlib
+from datetime import datetime
+from functools import wraps
+
+from flask import current_app, make_response, request, session
+from flask_login import current_user
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from werkzeug.http import is_resource_modified
+
+from assets import asset_url
+from metrics import HTTP_CACHE
+from models import db, Customer, Order, Contact, CacheVersion
+
+CHANGED_KEY = "http_cache_changed"
+
+LISTS = "lists"
+FX = "fx"
+
+
+def customer_key(customer_id: int) -> str:
+    return f"customer:{customer_id}"
+
+
+# ------------------ Versionszähler ------------------
+def bump(*names: str) -> None:
+    """Erhöht die Zähler ``names`` – eigene kurze Transaktion auf Shard 0, nach dem Commit aufrufen."""
+    names = sorted(set(names))  # feste Reihenfolge: keine Deadlocks zwischen Workern
+    if not names:
+        return
+    table = CacheVersion.__table__
+    for attempt in range(2):
+        now = datetime.utcnow()
+        try:
+            with db.engine.begin() as conn:
+                result = conn.execute(
+                    update(table).where(table.c.name.in_(names))
+                    .values(version=table.c.version + 1, changed_at=now)
+                )
+                if result.rowcount < len(names):
+                    existing = set(conn.scalars(select(table.c.name).where(table.c.name.in_(names))))
+                    conn.execute(insert(table), [
+                        {"name": name, "version": 1, "changed_at": now} for name in names if name not in existing
+                    ])
+            return
+        except IntegrityError:
+            if attempt:
+                raise  # zweiter Versuch: die Zeile hat ein anderer Worker gerade angelegt
+
+
+def _versions(*names: str):
+    """``(Teile, Last-Modified)`` der Zähler ``names``; fehlende Zähler = noch nie geändert."""
+    table = CacheVersion.__table__
+    rows = {
+        row.name: (row.version, row.changed_at)
+        for row in db.session.execute(select(table).where(table.c.name.in_(names)))
+    }
+    parts = tuple(rows.get(name) for name in names)
+    return parts, _latest(*(changed_at for _, changed_at in rows.values()))
+
+
+def customer_version(customer_id: int):
+    """``(Teile, Last-Modified)`` für die Detailseite, ``None`` für unbekannte Kunden."""
+    updated_at = db.session.scalar(
+        select(Customer.updated_at).where(Customer.id == customer_id, Customer.deleted_at.is_(None))
+    )
+    if updated_at is None:
+        return None
+    # Umrechnungskurse fließen in die Umsatz-KPIs ein
+    parts, last_modified = _versions(customer_key(customer_id), FX)
+    return (updated_at, *parts), _latest(updated_at, last_modified)
+
+
+def lists_version():
+    """``(Teile, Last-Modified)`` für Dashboard, Kunden-, Bestell- und Kontaktliste.
+
+    Eine gemeinsame Version über alle Shards: Die Bestell- und Kontaktlisten
+    blenden gelöschte Kunden aus, hängen also auch von ``customers`` ab.
+    """
+    return _versions(LISTS, FX)
+
+
+# ------------------ Session-Events ------------------
+def _after_flush(session, flush_context):
+    changed = session.info.setdefault(CHANGED_KEY, set())
+    for obj in session.new | session.dirty | session.deleted:
+        if obj in session.dirty and not session.is_modified(obj, include_collections=False):
+            continue
+        # Positionen ändern sich nur zusammen mit ihrer Bestellung
+        if isinstance(obj, Customer):
+            changed.update((LISTS, customer_key(obj.id)))
+        elif isinstance(obj, (Order, Contact)):
+            changed.update((LISTS, customer_key(obj.customer_id)))
+
+
+def _after_commit(session):
+    changed = session.info.pop(CHANGED_KEY, None)
+    if changed:
+        try:
+            bump(*changed)
+        except Exception as e:
+            # Die Änderung selbst ist committet; schlimmstenfalls bis zum nächsten Schreiben ein veralteter 304
+            current_app.logger.warning("HTTP-Cache-Version konnte nicht erhöht werden: %s", e)
+
+
+def _after_rollback(session):
+    session.info.pop(CHANGED_KEY, None)
+
+
+def init_http_cache(app):
+    if not event.contains(db.session, "after_flush", _after_flush):
+        event.listen(db.session, "after_flush", _after_flush)
+        event.listen(db.session, "after_commit", _after_commit)
+        event.listen(db.session, "after_rollback", _after_rollback)
+
+
+# ------------------ Decorator ------------------
+def _latest(*timestamps):
+    present = [t for t in timestamps if t is not None]
+    return max(present) if present else None
+
+
+def _etag(parts) -> str:
+    key = (
+        parts,
+        current_user.get_id(),
+        request.full_path,
+        datetime.utcnow().date().isoformat(),
+        current_app.config["REPORTING_CURRENCY"],
+        asset_url("app.css"),
+    )
+    return hashlib.sha1(repr(key).encode()).hexdigest()[:20]
+
+
+def conditional(version):
+    """Decorator: beantwortet GET-Requests mit 304, solange ``version(**view_args)`` gleich bleibt.
+
+    ``version`` liefert ``(Teile, Last-Modified)`` oder ``None`` (dann läuft die
+    View normal, z. B. für den 404).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # Ausstehende Flash-Meldungen stehen im HTML – nie aus dem Cache beantworten
+            if request.method != "GET" or session.get("_flashes"):
+                return view(*args, **kwargs)
+
+            validator = version(**kwargs)
+            if validator is None:
+                return view(*args, **kwargs)
+            parts, last_modified = validator
+            etag = _etag(parts)
+
+            if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                HTTP_CACHE.inc(request.endpoint, "hit")
+                response = current_app.response_class(status=304)
+            else:
+                HTTP_CACHE.inc(request.endpoint, "miss")
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            # Browser darf speichern, muss aber jedes Mal nachfragen
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,246 @@
+"""Login ohne CPU-Spitzen: Drosselung und Passwort-Hashing im Prozess-Pool.
+
+``check_password_hash`` ist absichtlich teuer (scrypt). Inline im Web-Worker
+legt eine Welle von Anmeldungen – oder Credential Stuffing – alle Kerne lahm,
+und das CRM steht mit. Deshalb:
+
+1. Token-Buckets je IP (``LOGIN_IP_BURST``, ``LOGIN_IP_PER_MINUTE``) und je
+   Benutzername (``LOGIN_USER_BURST``, ``LOGIN_USER_PER_MINUTE``): jeder Versuch
+   kostet ein Token, *bevor* gehasht wird; ist ein Bucket leer, antwortet
+   ``/login`` mit 429 und ``Retry-After``. Die Buckets liegen im Speicher des
+   Prozesses (je Worker) oder mit ``LOGIN_THROTTLE_STORAGE=database`` in der
+   Tabelle ``login_throttle`` (für alle Worker gemeinsam). Hinter einem
+   Reverse-Proxy muss ``TRUSTED_PROXIES`` gesetzt sein, sonst teilen sich alle
+   Clients den Bucket der Proxy-IP.
+2. Gehasht wird in einem kleinen Prozess-Pool je Worker (``LOGIN_HASH_WORKERS``,
+   mit ``nice`` ``LOGIN_HASH_NICE`` – CRM-Requests haben Vorrang). Warten schon
+   ``LOGIN_HASH_QUEUE`` Hashes, gibt es sofort 503 statt einer endlosen
+   Warteschlange. ``LOGIN_HASH_WORKERS=0`` hasht inline.
+3. Passt ein gespeicherter Hash nicht mehr zu ``PASSWORD_HASH_METHOD`` /
+   ``PASSWORD_SALT_LENGTH``, wird er beim nächsten erfolgreichen Login neu
+   berechnet – die Parameter lassen sich ohne Passwort-Reset ändern.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from flask import current_app
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from models import db, LoginThrottle
+
+# Buckets, die so lange unberührt sind, sind längst wieder voll – wie nicht vorhanden
+STALE_AFTER = timedelta(days=1)
+
+
+class LoginBusy(RuntimeError):
+    """Hash-Pool ausgelastet (Warteschlange voll, Timeout oder Pool abgestürzt)."""
+
+
+# ------------------ Token-Buckets ------------------
+def _take(tokens: float, elapsed: float, burst: int, per_minute: float) -> tuple[float, float]:
+    """Füllt den Bucket für ``elapsed`` Sekunden auf und zieht ein Token: ``(neuer Stand, Wartezeit)``."""
+    rate = per_minute / 60
+    tokens = min(burst, tokens + elapsed * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+
+class MemoryBuckets:
+    """Buckets im Speicher des Prozesses – schnell, aber je Worker getrennt."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self._buckets = {}  # Schlüssel → (Tokens, Zeitpunkt, wieder voll ab), time.monotonic()
+        self._lock = threading.Lock()
+        self._prune_at = max_keys
+
+    def take(self, key: str, burst: int, per_minute: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated, _ = self._buckets.get(key, (burst, now, now))
+            tokens, wait = _take(tokens, now - updated, burst, per_minute)
+            self._buckets[key] = (tokens, now, now + (burst - tokens) / (per_minute / 60))
+            if len(self._buckets) > self._prune_at:
+                # volle Buckets wegwerfen; bleiben trotzdem viele, erst beim Doppelten wieder aufräumen
+                self._buckets = {k: v for k, v in self._buckets.items() if v[2] > now}
+                self._prune_at = max(self._prune_at, len(self._buckets) * 2)
+        return wait
+
+
+class DatabaseBuckets:
+    """Buckets in ``login_throttle`` (Shard 0) – alle Worker und Server teilen sich die Grenzen."""
+
+    def take(self, key: str, burst: int, per_minute: float) -> float:
+        table = LoginThrottle.__table__
+        for _ in range(2):
+            now = datetime.utcnow()
+            try:
+                # eigene Transaktion, unabhängig von db.session des Requests
+                with db.engine.begin() as conn:
+                    row = conn.execute(
+                        select(table.c.tokens, table.c.updated_at)
+                        .where(table.c.bucket == key)
+                        .with_for_update()
+                    ).first()
+                    if row is None:
+                        tokens, wait = _take(burst, 0, burst, per_minute)
+                        conn.execute(insert(table).values(bucket=key, tokens=tokens, updated_at=now))
+                        conn.execute(delete(table).where(table.c.updated_at < now - STALE_AFTER))
+                    else:
+                        elapsed = max(0.0, (now - row.updated_at).total_seconds())
+                        tokens, wait = _take(row.tokens, elapsed, burst, per_minute)
+                        conn.execute(
+                            update(table).where(table.c.bucket == key).values(tokens=tokens, updated_at=now)
+                        )
+                return wait
+            except IntegrityError:
+                continue  # gleichzeitig angelegt – der zweite Durchlauf findet die Zeile
+        return 0.0
+
+
+def throttle(ip: str, username: str | None = None) -> int:
+    """Zieht ein Token aus dem IP- und ggf. dem Benutzer-Bucket.
+
+    Gibt ``0`` zurück, wenn der Versuch erlaubt ist, sonst die Sekunden bis zum
+    nächsten Token (für ``Retry-After``). Ist schon der IP-Bucket leer, wird der
+    Benutzer-Bucket nicht angetastet.
+    """
+    config = current_app.config
+    buckets = current_app.extensions["login_throttle"]
+    wait = buckets.take(f"ip:{ip}", config["LOGIN_IP_BURST"], config["LOGIN_IP_PER_MINUTE"])
+    if not wait and username is not None:
+        wait = buckets.take(
+            f"user:{username.strip().casefold()}", config["LOGIN_USER_BURST"], config["LOGIN_USER_PER_MINUTE"]
+        )
+    return int(wait) + 1 if wait else 0
+
+
+# ------------------ Hash-Pool ------------------
+_pool = None  # (ProcessPoolExecutor, BoundedSemaphore)
+_pool_lock = threading.Lock()
+
+
+def _reset_pool():
+    global _pool
+    _pool = None
+
+
+# Prozesse und Threads des Pools überleben fork() nicht
+os.register_at_fork(after_in_child=_reset_pool)
+
+
+def _lower_priority(nice: int) -> None:
+    if nice and hasattr(os, "nice"):
+        os.nice(nice)
+
+
+def start_hash_pool(app):
+    """Startet den Hash-Pool des Prozesses (einmal); ``None`` bei ``LOGIN_HASH_WORKERS=0``.
+
+    Am besten aufrufen, solange der Prozess noch keine Threads hat (gunicorn
+    ``post_fork``) – die Pool-Prozesse entstehen per fork und sofort.
+    """
+    global _pool
+    workers = app.config["LOGIN_HASH_WORKERS"]
+    if workers <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # fork statt spawn: spawn importiert das Hauptmodul (wsgi.py → create_app) in jedem Pool-Prozess neu
+            context = multiprocessing.get_context(
+                "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+            )
+            executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=context,
+                initializer=_lower_priority, initargs=(app.config["LOGIN_HASH_NICE"],),
+            )
+            executor.submit(int).result()  # mit fork starten dabei alle Prozesse
+            _pool = (executor, threading.BoundedSemaphore(workers + app.config["LOGIN_HASH_QUEUE"]))
+        return _pool
+
+
+def _run(fn, *args, **kwargs):
+    """``fn(*args, **kwargs)`` im Hash-Pool (ohne Pool inline); ``LoginBusy`` bei Überlast."""
+    app = current_app._get_current_object()
+    pool = start_hash_pool(app)
+    if pool is None:
+        return fn(*args, **kwargs)
+
+    executor, slots = pool
+    if not slots.acquire(blocking=False):
+        raise LoginBusy("Hash-Warteschlange voll")
+    try:
+        future = executor.submit(fn, *args, **kwargs)
+    except BrokenProcessPool:
+        slots.release()
+        _discard(pool)
+        raise LoginBusy("Hash-Pool abgestürzt")
+    # Platz erst freigeben, wenn der Hash wirklich fertig ist – auch nach einem Timeout
+    future.add_done_callback(lambda _: slots.release())
+    try:
+        return future.result(timeout=app.config["LOGIN_HASH_TIMEOUT"])
+    except FutureTimeout:
+        raise LoginBusy("Hash-Timeout")
+    except BrokenProcessPool:
+        _discard(pool)  # z. B. Prozess vom OOM-Killer beendet – der nächste Login startet neu
+        raise LoginBusy("Hash-Pool abgestürzt")
+
+
+def _discard(pool) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool[0].shutdown(wait=False, cancel_futures=True)
+
+
+# ------------------ Passwörter ------------------
+def password_hash_options() -> dict:
+    return {
+        "method": current_app.config["PASSWORD_HASH_METHOD"],
+        "salt_length": current_app.config["PASSWORD_SALT_LENGTH"],
+    }
+
+
+@lru_cache
+def _hash_prefix(method: str) -> str:
+    """Verfahren mit allen Parametern, wie werkzeug sie speichert (``"scrypt"`` → ``"scrypt:32768:8:1"``)."""
+    return generate_password_hash("", method=method, salt_length=1).split("$", 1)[0]
+
+
+def needs_rehash(password_hash: str) -> bool:
+    options = password_hash_options()
+    prefix, _, rest = password_hash.partition("$")
+    salt = rest.partition("$")[0]
+    return prefix != _hash_prefix(options["method"]) or len(salt) != options["salt_length"]
+
+
+def hash_password(password: str) -> str:
+    """Neuer Hash nach ``PASSWORD_HASH_METHOD``, berechnet im Hash-Pool."""
+    return _run(generate_password_hash, password, **password_hash_options())
+
+
+def verify_password(user, password: str) -> bool:
+    """Prüft das Passwort im Hash-Pool; veraltete Hashes werden danach neu berechnet und gespeichert."""
+    if not _run(check_password_hash, user.password_hash, password):
+        return False
+    if needs_rehash(user.password_hash):
+        try:
+            user.password_hash = hash_password(password)
+            db.session.commit()
+        except LoginBusy:
+            pass  # Login gilt trotzdem; neu gehasht wird beim nächsten Mal
+    return True
+
+
+def init_login_guard(app):
+    storage = app.config["LOGIN_THROTTLE_STORAGE"]
+    app.extensions["login_throttle"] = DatabaseBuckets() if storage == "database" else MemoryBuckets()
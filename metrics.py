@@ -0,0 +1,400 @@
+"""Laufzeit-Metriken im Prometheus-Textformat: ``GET /metrics``.
+
+Erfasst werden
+
+- Latenz (Histogramm) und Anzahl der Requests je Endpoint und Status,
+- Datenbank-Abfragen und Abfragezeit je Endpoint (auch aus dem Shard-Fan-out),
+- Connection-Pools je Bind,
+- Cache-Treffer: 304-Antworten von ``@conditional`` und ``fx.get_rate``,
+- Versanddauer der 2FA-Mails.
+
+Gezählt wird ohne Locks: jeder Thread schreibt in sein eigenes Dict, erst
+``/metrics`` summiert über alle Threads. Mit mehreren Worker-Prozessen
+(``METRICS_DIR`` gesetzt) schreibt jeder Prozess alle ``METRICS_FLUSH_SECONDS``
+seinen Stand nach ``METRICS_DIR/<pid>.json`` und ``/metrics`` summiert alle
+Dateien. Zähler beendeter Worker übernimmt der gunicorn-Master in
+``archive.json`` (``gunicorn.conf.py``), damit sie nicht zurückspringen.
+"""
+import atexit
+import bisect
+import glob
+import hmac
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Blueprint, current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+bp = Blueprint("metrics", __name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ARCHIVE = "archive.json"
+
+_metrics = {}  # Name → Metrik, in Ausgabe-Reihenfolge
+_shards = []  # ein Dict je Thread: (Name, Labels) → Zahl bzw. Histogramm-Liste
+_shards_lock = threading.Lock()
+_local = threading.local()
+
+
+def _reset_after_fork():
+    # Werte des Elternprozesses (z. B. gunicorn-Master) nicht in jedem Worker mitzählen
+    global _shards, _local
+    _shards = []
+    _local = threading.local()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _shard() -> dict:
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        shard = _local.shard = {}
+        with _shards_lock:  # einmal je Thread
+            _shards.append(shard)
+    return shard
+
+
+# ------------------ Metrik-Typen ------------------
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name, self.help, self.labels = name, help, labels
+        _metrics[name] = self
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        try:
+            shard = _local.shard
+        except AttributeError:
+            shard = _shard()
+        key = (self.name, labels)
+        shard[key] = shard.get(key, 0) + amount
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name, self.help, self.labels, self.buckets = name, help, labels, buckets
+        _metrics[name] = self
+
+    def observe(self, value: float, *labels) -> None:
+        try:
+            shard = _local.shard
+        except AttributeError:
+            shard = _shard()
+        key = (self.name, labels)
+        counts = shard.get(key)
+        if counts is None:
+            # je Bucket (nicht kumuliert), +Inf, Summe
+            counts = shard[key] = [0] * (len(self.buckets) + 2)
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+
+class Collected:
+    """Wert, der erst beim Auslesen berechnet wird (Pool-Stand, ``lru_cache``-Statistik)."""
+
+    def __init__(self, name: str, help: str, type: str, labels: tuple, fn):
+        self.name, self.help, self.type, self.labels, self.fn = name, help, type, labels, fn
+        _metrics[name] = self
+
+
+REQUESTS = Counter("crm_http_requests_total", "Requests je Endpoint und Status.", ("endpoint", "status"))
+REQUEST_SECONDS = Histogram("crm_http_request_duration_seconds", "Dauer der Requests.", ("endpoint",))
+DB_QUERIES = Counter("crm_db_queries_total", "Datenbank-Abfragen je Endpoint.", ("endpoint",))
+DB_SECONDS = Counter("crm_db_query_seconds_total", "Summe der Abfragezeit je Endpoint.", ("endpoint",))
+HTTP_CACHE = Counter(
+    "crm_http_cache_requests_total", "Bedingte GETs: hit = 304, miss = neu gerendert.", ("endpoint", "result")
+)
+MAIL_SECONDS = Histogram(
+    "crm_mail_send_duration_seconds", "Versand der 2FA-Mails.", ("result",),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+
+# ------------------ Auslesen / Zusammenführen ------------------
+def _add(values: dict, name: str, labels: tuple, value) -> None:
+    per_metric = values.setdefault(name, {})
+    old = per_metric.get(labels)
+    if old is None:
+        per_metric[labels] = list(value) if isinstance(value, list) else value
+    elif isinstance(value, list):
+        per_metric[labels] = [a + b for a, b in zip(old, value)]
+    else:
+        per_metric[labels] = old + value
+
+
+def collect() -> dict:
+    """Stand dieses Prozesses: ``{Name: {Labels: Wert}}``."""
+    with _shards_lock:
+        shards = list(_shards)
+    values = {}
+    for shard in shards:
+        for (name, labels), value in list(shard.items()):  # Kopie unter dem GIL – der Thread schreibt weiter
+            _add(values, name, labels, value)
+    for metric in _metrics.values():
+        if isinstance(metric, Collected):
+            try:
+                for labels, value in metric.fn():
+                    _add(values, metric.name, labels, value)
+            except Exception as e:
+                print(f"[WARN] Metrik {metric.name} nicht verfügbar: {e}")
+    return values
+
+
+def _dump(values: dict) -> dict:
+    return {name: [[list(labels), value] for labels, value in per_metric.items()] for name, per_metric in values.items()}
+
+
+def _load(path: str, values: dict, skip_gauges: bool = False) -> None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return  # gerade ersetzt oder schon archiviert
+    for name, entries in data.items():
+        metric = _metrics.get(name)
+        if metric is None or (skip_gauges and metric.type == "gauge"):
+            continue
+        for labels, value in entries:
+            _add(values, name, tuple(labels), value)
+
+
+def _write(path: str, values: dict) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(_dump(values), f)
+    os.replace(tmp, path)
+
+
+def _directory() -> str | None:
+    """``METRICS_DIR`` der aktuellen App; ``None`` ohne Verzeichnis oder mit abgeschalteten Metriken."""
+    state = current_app.extensions.get("metrics")
+    return state["directory"] if state else None
+
+
+def flush() -> None:
+    """Schreibt den Stand dieses Prozesses nach ``METRICS_DIR`` der aktuellen App (ohne: nichts)."""
+    directory = _directory()
+    if directory:
+        _write(os.path.join(directory, f"{os.getpid()}.json"), collect())
+
+
+def _flush_app(app) -> None:
+    with app.app_context():
+        flush()
+
+
+def _flush_loop(app, interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        try:
+            _flush_app(app)
+        except Exception as e:
+            print(f"[WARN] Metriken konnten nicht geschrieben werden: {e}")
+
+
+def _ensure_flusher(interval: float) -> None:
+    """Startet den Schreib-Thread der aktuellen App – einmal je Prozess, nach einem fork also neu."""
+    state = current_app.extensions["metrics"]
+    if not state["directory"] or state["flusher_pid"] == os.getpid():
+        return
+    with _shards_lock:
+        if state["flusher_pid"] != os.getpid():
+            state["flusher_pid"] = os.getpid()
+            app = current_app._get_current_object()
+            threading.Thread(target=_flush_loop, args=(app, interval), name="metrics-flush", daemon=True).start()
+            atexit.register(_flush_app, app)
+
+
+def aggregate() -> dict:
+    """Alle Prozesse: eigener Stand live, die übrigen aus ``METRICS_DIR``."""
+    values = collect()
+    directory = _directory()
+    if directory:
+        own = os.path.join(directory, f"{os.getpid()}.json")
+        for path in glob.glob(os.path.join(directory, "*.json")):
+            if path != own:
+                _load(path, values)
+    return values
+
+
+def mark_process_dead(directory: str, pid: int) -> None:
+    """Zähler eines beendeten Workers ins Archiv übernehmen (Gauges verfallen); im gunicorn-Master aufrufen."""
+    path = os.path.join(directory, f"{pid}.json")
+    if not os.path.exists(path):
+        return
+    archive = os.path.join(directory, ARCHIVE)
+    values = {}
+    _load(archive, values)
+    _load(path, values, skip_gauges=True)
+    _write(archive, values)
+    os.remove(path)
+
+
+def clear_directory(directory: str) -> None:
+    """Beim Serverstart: Dateien eines früheren Laufs entfernen."""
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, "*.json")):
+        os.remove(path)
+
+
+# ------------------ Textformat ------------------
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _labels(names, values, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def render(values: dict) -> str:
+    lines = []
+    for metric in _metrics.values():
+        per_metric = values.get(metric.name)
+        if not per_metric:
+            continue
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        for labels, value in sorted(per_metric.items()):
+            if metric.type != "histogram":
+                lines.append(f"{metric.name}{_labels(metric.labels, labels)} {_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip((*metric.buckets, "+Inf"), value):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{metric.name}_bucket{_labels(metric.labels, labels, le)} {cumulative}")
+            lines.append(f"{metric.name}_sum{_labels(metric.labels, labels)} {_number(value[-1])}")
+            lines.append(f"{metric.name}_count{_labels(metric.labels, labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+LOCALHOST = ("127.0.0.1", "::1")
+
+
+def _metrics_allowed() -> bool:
+    """Mit ``METRICS_TOKEN`` nur per Bearer-Token, sonst nur lokal – außer ``METRICS_PUBLIC``."""
+    token = current_app.config["METRICS_TOKEN"]
+    if token:
+        return hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}")
+    if current_app.config["METRICS_PUBLIC"]:
+        return True
+    # Ein lokaler Reverse-Proxy ohne TRUSTED_PROXIES erscheint auch als 127.0.0.1
+    return request.remote_addr in LOCALHOST and "X-Forwarded-For" not in request.headers
+
+
+@bp.route("/metrics")
+def metrics_view():
+    if not _metrics_allowed():
+        return "Unauthorized\n", 401, {"WWW-Authenticate": "Bearer"}
+    return render(aggregate()), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
+
+# ------------------ Endpoint-Label ------------------
+def current_endpoint() -> str | None:
+    return getattr(_local, "endpoint", None)
+
+
+@contextmanager
+def endpoint_label(endpoint: str | None):
+    """Abfragen in einem anderen Thread (Shard-Fan-out) dem Endpoint des Requests zuordnen."""
+    previous = getattr(_local, "endpoint", None)
+    _local.endpoint = endpoint
+    try:
+        yield
+    finally:
+        _local.endpoint = previous
+
+
+# ------------------ Hooks ------------------
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_metrics_start", None)
+    if start is None:
+        return
+    # ohne Request (Audit-Writer, CLI, Suchindex): "-"
+    endpoint = getattr(_local, "endpoint", None) or "-"
+    DB_QUERIES.inc(endpoint)
+    DB_SECONDS.inc(endpoint, amount=time.perf_counter() - start)
+
+
+def _before_request():
+    _ensure_flusher(current_app.config["METRICS_FLUSH_SECONDS"])
+    _local.endpoint = request.endpoint or "-"
+    g._metrics_start = time.perf_counter()
+
+
+def _after_request(response):
+    g._metrics_status = response.status_code
+    return response
+
+
+def _teardown_request(exc):
+    # läuft bei gestreamten Antworten erst nach dem letzten Stück
+    start = g.pop("_metrics_start", None)
+    if start is None:
+        return
+    endpoint = request.endpoint or "-"
+    status = 500 if exc is not None else g.pop("_metrics_status", 500)
+    REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint)
+    REQUESTS.inc(endpoint, str(status))
+    _local.endpoint = None
+
+
+def _pool_stats():
+    # beim Auslesen: Engines der App, die gerade /metrics beantwortet bzw. schreibt
+    engines = dict(current_app.extensions["sqlalchemy"].engines)
+    for bind, engine in engines.items():
+        pool = engine.pool
+        for state, method in (("size", "size"), ("checked_out", "checkedout"),
+                              ("checked_in", "checkedin"), ("overflow", "overflow")):
+            if hasattr(pool, method):
+                # overflow() ist negativ, solange der Pool noch nicht voll geöffnet ist
+                yield (bind or "default", state), max(0, getattr(pool, method)())
+
+
+def _fx_cache_stats():
+    from fx import rate_cache_stats
+
+    for result, count in rate_cache_stats().items():
+        yield (result,), count
+
+
+def init_metrics(app):
+    if not app.config["METRICS_ENABLED"]:
+        return
+    # je App: Verzeichnis und Schreib-Thread (Metriken selbst sind prozessweit)
+    app.extensions["metrics"] = {"directory": app.config["METRICS_DIR"] or None, "flusher_pid": None}
+    if app.config["METRICS_DIR"]:
+        os.makedirs(app.config["METRICS_DIR"], exist_ok=True)
+
+    if "crm_db_pool_connections" not in _metrics:
+        Collected("crm_db_pool_connections", "Connection-Pool je Bind.", "gauge", ("bind", "state"), _pool_stats)
+        Collected("crm_fx_rate_cache_total", "Kurs-Lookups aus dem Cache (fx.get_rate).", "counter", ("result",),
+                  _fx_cache_stats)
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    app.register_blueprint(bp)
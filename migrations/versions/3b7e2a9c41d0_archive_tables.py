@@ -0,0 +1,81 @@
+"""archive tables for old orders and contacts
+
+Revision ID: 3b7e2a9c41d0
+Revises: f85d45c2422a
+Create Date: 2026-10-19 09:12:04.118532
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7e2a9c41d0'
+down_revision = 'f85d45c2422a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'archived_orders',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('customer_id', sa.Integer(), nullable=False),
+        sa.Column('order_number', sa.String(length=50), nullable=False),
+        sa.Column('order_date', sa.DateTime(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('total_amount', sa.Numeric(10, 2), nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=False, server_default=sa.func.current_timestamp()),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_archived_orders_customer_id', 'archived_orders', ['customer_id'])
+
+    op.create_table(
+        'archived_order_items',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('order_id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('unit_price', sa.Numeric(10, 2), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_archived_order_items_order_id', 'archived_order_items', ['order_id'])
+
+    op.create_table(
+        'archived_contacts',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('customer_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('channel', sa.String(length=20), nullable=False),
+        sa.Column('subject', sa.String(length=200), nullable=False),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('rating', sa.Integer(), nullable=True),
+        sa.Column('contact_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=False, server_default=sa.func.current_timestamp()),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_archived_contacts_customer_contact_at', 'archived_contacts', ['customer_id', 'contact_at'])
+
+    op.create_table(
+        'archived_revenue',
+        sa.Column('customer_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('year', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('month', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=False),
+        sa.Column('revenue', sa.Numeric(14, 2), nullable=False),
+        sa.Column('order_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('customer_id', 'year', 'month', 'currency')
+    )
+
+
+def downgrade():
+    op.drop_table('archived_revenue')
+    op.drop_index('ix_archived_contacts_customer_contact_at', table_name='archived_contacts')
+    op.drop_table('archived_contacts')
+    op.drop_index('ix_archived_order_items_order_id', table_name='archived_order_items')
+    op.drop_table('archived_order_items')
+    op.drop_index('ix_archived_orders_customer_id', table_name='archived_orders')
+    op.drop_table('archived_orders')
@@ -0,0 +1,45 @@
+"""soft delete for customers and append-only audit log
+
+Revision ID: 8d14c6f0a2e7
+Revises: 3b7e2a9c41d0
+Create Date: 2026-10-19 11:40:27.503114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d14c6f0a2e7'
+down_revision = '3b7e2a9c41d0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('customers', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_customers_deleted_at', ['deleted_at'], unique=False)
+
+    op.create_table(
+        'audit_log',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('entity', sa.String(length=20), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('customer_id', sa.Integer(), nullable=True),
+        sa.Column('action', sa.String(length=20), nullable=False),
+        sa.Column('changes', sa.Text(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_audit_log_customer_id_id', 'audit_log', ['customer_id', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_audit_log_customer_id_id', table_name='audit_log')
+    op.drop_table('audit_log')
+
+    with op.batch_alter_table('customers', schema=None) as batch_op:
+        batch_op.drop_index('ix_customers_deleted_at')
+        batch_op.drop_column('deleted_at')
@@ -0,0 +1,36 @@
+"""backfill progress checkpoints
+
+Revision ID: a1c7e5f3b920
+Revises: f2a8c4d61e37
+Create Date: 2026-10-20 00:41:27.913402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c7e5f3b920'
+down_revision = 'f2a8c4d61e37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ab hier können Revisionen backfill.run_from_migration() benutzen
+    op.create_table(
+        'backfill_progress',
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('last_id', sa.BigInteger(), nullable=True),
+        sa.Column('max_id', sa.BigInteger(), nullable=True),
+        sa.Column('rows_scanned', sa.BigInteger(), nullable=False),
+        sa.Column('rows_updated', sa.BigInteger(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade():
+    op.drop_table('backfill_progress')
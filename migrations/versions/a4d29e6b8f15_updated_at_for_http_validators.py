@@ -0,0 +1,42 @@
+"""updated_at on orders/contacts + indexes for HTTP validators
+
+Revision ID: a4d29e6b8f15
+Revises: e2f8b07c9d13
+Create Date: 2026-10-19 16:12:40.518903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d29e6b8f15'
+down_revision = 'e2f8b07c9d13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('orders', 'contacts'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+        op.execute(f"UPDATE {table} SET updated_at = created_at")
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+            # MAX(updated_at) / COUNT(*) je Kunde direkt aus dem Index
+            batch_op.create_index(f'ix_{table}_customer_updated_at', ['customer_id', 'updated_at'], unique=False)
+            batch_op.create_index(f'ix_{table}_updated_at', ['updated_at'], unique=False)
+
+    with op.batch_alter_table('customers', schema=None) as batch_op:
+        batch_op.create_index('ix_customers_updated_at', ['updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('customers', schema=None) as batch_op:
+        batch_op.drop_index('ix_customers_updated_at')
+
+    for table in ('contacts', 'orders'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(f'ix_{table}_updated_at')
+            batch_op.drop_index(f'ix_{table}_customer_updated_at')
+            batch_op.drop_column('updated_at')
@@ -0,0 +1,31 @@
+"""cache version counters for http validators
+
+Revision ID: b6e2d8a4f013
+Revises: a1c7e5f3b920
+Create Date: 2026-10-19 03:21:44.301877
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e2d8a4f013'
+down_revision = 'a1c7e5f3b920'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ersetzt MAX(updated_at)/COUNT(*) je Request – fehlende Zeilen entstehen beim ersten Schreiben
+    op.create_table(
+        'cache_versions',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.Column('changed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade():
+    op.drop_table('cache_versions')
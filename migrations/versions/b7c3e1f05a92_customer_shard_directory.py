@@ -0,0 +1,34 @@
+"""customer shard directory
+
+Revision ID: b7c3e1f05a92
+Revises: a4d29e6b8f15
+Create Date: 2026-10-19 17:48:03.662190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7c3e1f05a92'
+down_revision = 'a4d29e6b8f15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'customer_shards',
+        sa.Column('customer_id', sa.Integer(), nullable=False),
+        sa.Column('shard', sa.SmallInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('customer_id'),
+    )
+    with op.batch_alter_table('customer_shards', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_customer_shards_shard'), ['shard'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('customer_shards', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_customer_shards_shard'))
+
+    op.drop_table('customer_shards')
@@ -0,0 +1,70 @@
+"""cent columns become the only money columns the app writes
+
+Revision ID: c4f7a2e9d5b1
+Revises: b6e2d8a4f013
+Create Date: 2026-10-19 03:48:05.118420
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+from backfill import run_from_migration
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4f7a2e9d5b1'
+down_revision = 'b6e2d8a4f013'
+branch_labels = None
+depends_on = None
+
+
+# (Tabelle, Numeric-Spalte, Cent-Spalte) wie in c5a91e3d7b42
+CENT_COLUMNS = [
+    ('products', 'unit_price', 'unit_price_cents'),
+    ('orders', 'total_amount', 'total_amount_cents'),
+    ('order_items', 'unit_price', 'unit_price_cents'),
+    ('archived_orders', 'total_amount', 'total_amount_cents'),
+    ('archived_order_items', 'unit_price', 'unit_price_cents'),
+]
+
+
+def upgrade():
+    # Numeric(10, 2) wird nicht mehr geschrieben (und begrenzt Beträge nicht mehr auf
+    # 99.999.999,99) – nur noch nullable, gelöscht wird sie in einer späteren Revision,
+    # wenn keine alten Worker mehr laufen
+    for table, decimal_column, _ in CENT_COLUMNS:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column(decimal_column, existing_type=sa.Numeric(10, 2), nullable=True)
+    with op.batch_alter_table('archived_revenue', schema=None) as batch_op:
+        batch_op.alter_column('revenue', existing_type=sa.Numeric(14, 2), nullable=True)
+
+    # Zeilen, die alte Worker seit c5a91e3d7b42 ohne Cent-Betrag geschrieben haben
+    for table, decimal_column, cents_column in CENT_COLUMNS:
+        if context.is_offline_mode():
+            op.execute(
+                f"UPDATE {table} SET {cents_column} = ROUND({decimal_column} * 100) "
+                f"WHERE {cents_column} IS NULL"
+            )
+        else:
+            run_from_migration(f'cents_{table}', restart=True)
+
+    for table, _, cents_column in CENT_COLUMNS:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column(cents_column, existing_type=sa.BigInteger(), nullable=False)
+
+
+def downgrade():
+    for table, _, cents_column in CENT_COLUMNS:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column(cents_column, existing_type=sa.BigInteger(), nullable=True)
+
+    # Numeric aus den Cent-Spalten wiederherstellen – Beträge über 99.999.999,99 passen nicht hinein
+    for table, decimal_column, cents_column in CENT_COLUMNS:
+        op.execute(f"UPDATE {table} SET {decimal_column} = {cents_column} / 100.0")
+    op.execute("UPDATE archived_revenue SET revenue = revenue_cents / 100.0")
+
+    for table, decimal_column, _ in CENT_COLUMNS:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column(decimal_column, existing_type=sa.Numeric(10, 2), nullable=False)
+    with op.batch_alter_table('archived_revenue', schema=None) as batch_op:
+        batch_op.alter_column('revenue', existing_type=sa.Numeric(14, 2), nullable=False)
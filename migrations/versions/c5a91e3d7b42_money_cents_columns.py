@@ -0,0 +1,49 @@
+"""integer cent columns for money amounts
+
+Revision ID: c5a91e3d7b42
+Revises: 8d14c6f0a2e7
+Create Date: 2026-10-19 14:05:51.276310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5a91e3d7b42'
+down_revision = '8d14c6f0a2e7'
+branch_labels = None
+depends_on = None
+
+
+# (Tabelle, Numeric-Spalte, Cent-Spalte)
+CENT_COLUMNS = [
+    ('products', 'unit_price', 'unit_price_cents'),
+    ('orders', 'total_amount', 'total_amount_cents'),
+    ('order_items', 'unit_price', 'unit_price_cents'),
+    ('archived_orders', 'total_amount', 'total_amount_cents'),
+    ('archived_order_items', 'unit_price', 'unit_price_cents'),
+]
+
+
+def upgrade():
+    for table, _, cents_column in CENT_COLUMNS:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column(cents_column, sa.BigInteger(), nullable=True))
+
+    with op.batch_alter_table('archived_revenue', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('revenue_cents', sa.BigInteger(), nullable=False, server_default='0'))
+
+    # Backfill: Numeric bleibt vorerst erhalten, die App liest ab jetzt die Cent-Spalten
+    for table, decimal_column, cents_column in CENT_COLUMNS:
+        op.execute(f"UPDATE {table} SET {cents_column} = ROUND({decimal_column} * 100)")
+    op.execute("UPDATE archived_revenue SET revenue_cents = ROUND(revenue * 100)")
+
+
+def downgrade():
+    with op.batch_alter_table('archived_revenue', schema=None) as batch_op:
+        batch_op.drop_column('revenue_cents')
+
+    for table, _, cents_column in reversed(CENT_COLUMNS):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column(cents_column)
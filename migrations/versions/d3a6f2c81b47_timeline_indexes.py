@@ -0,0 +1,31 @@
+"""(customer_id, date, id) indexes for the customer timeline
+
+Revision ID: d3a6f2c81b47
+Revises: b7c3e1f05a92
+Create Date: 2026-10-19 19:05:22.317640
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3a6f2c81b47'
+down_revision = 'b7c3e1f05a92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Timeline: je Zweig "WHERE customer_id = ? ORDER BY datum DESC, id DESC LIMIT n" direkt aus dem Index
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.create_index('ix_orders_customer_order_date', ['customer_id', 'order_date', 'id'], unique=False)
+    with op.batch_alter_table('contacts', schema=None) as batch_op:
+        batch_op.create_index('ix_contacts_customer_contact_at', ['customer_id', 'contact_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('contacts', schema=None) as batch_op:
+        batch_op.drop_index('ix_contacts_customer_contact_at')
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index('ix_orders_customer_order_date')
@@ -0,0 +1,30 @@
+"""daily fx rates table
+
+Revision ID: e2f8b07c9d13
+Revises: c5a91e3d7b42
+Create Date: 2026-10-19 16:22:38.904417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2f8b07c9d13'
+down_revision = 'c5a91e3d7b42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'fx_rates',
+        sa.Column('rate_date', sa.Date(), nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=False),
+        sa.Column('rate', sa.Numeric(18, 8), nullable=False),
+        sa.PrimaryKeyConstraint('rate_date', 'currency')
+    )
+
+
+def downgrade():
+    op.drop_table('fx_rates')
@@ -0,0 +1,35 @@
+"""login throttle buckets
+
+Revision ID: e9b4c7d21f68
+Revises: d3a6f2c81b47
+Create Date: 2026-10-19 21:12:40.518344
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9b4c7d21f68'
+down_revision = 'd3a6f2c81b47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'login_throttle',
+        sa.Column('bucket', sa.String(length=200), nullable=False),
+        sa.Column('tokens', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('bucket'),
+    )
+    with op.batch_alter_table('login_throttle', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_login_throttle_updated_at'), ['updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('login_throttle', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_login_throttle_updated_at'))
+
+    op.drop_table('login_throttle')
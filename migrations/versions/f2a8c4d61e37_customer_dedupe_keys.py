@@ -0,0 +1,35 @@
+"""customer dedupe keys
+
+Revision ID: f2a8c4d61e37
+Revises: e9b4c7d21f68
+Create Date: 2026-10-19 23:05:12.204917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a8c4d61e37'
+down_revision = 'e9b4c7d21f68'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # befüllt wird die Tabelle mit "flask dedupe"
+    op.create_table(
+        'customer_dedupe_keys',
+        sa.Column('key', sa.String(length=200), nullable=False),
+        sa.Column('customer_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('key', 'customer_id'),
+    )
+    with op.batch_alter_table('customer_dedupe_keys', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_customer_dedupe_keys_customer_id'), ['customer_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('customer_dedupe_keys', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_customer_dedupe_keys_customer_id'))
+
+    op.drop_table('customer_dedupe_keys')
@@ -122,55 +122,22 @@ def upgrade():
 
 
 def downgrade():
-    # ### commands auto generated by Alembic - please adjust! ###
-    op.create_table('customer',
-    sa.Column('id', sa.INTEGER(), nullable=False),
-    sa.Column('company', sa.VARCHAR(length=120), nullable=False),
-    sa.Column('contact_name', sa.VARCHAR(length=120), nullable=True),
-    sa.Column('email', sa.VARCHAR(length=120), nullable=True),
-    sa.Column('phone', sa.VARCHAR(length=50), nullable=True),
-    sa.Column('notes', sa.TEXT(), nullable=True),
-    sa.PrimaryKeyConstraint('id')
-    )
-    op.create_table('login_code',
-    sa.Column('id', sa.INTEGER(), nullable=False),
-    sa.Column('user_id', sa.INTEGER(), nullable=False),
-    sa.Column('code', sa.VARCHAR(length=5), nullable=False),
-    sa.Column('expires_at', sa.DATETIME(), nullable=False),
-    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
-    sa.PrimaryKeyConstraint('id')
-    )
-    with op.batch_alter_table('login_code', schema=None) as batch_op:
-        batch_op.create_index(batch_op.f('ix_login_code_user_id'), ['user_id'], unique=False)
-        batch_op.create_index(batch_op.f('ix_login_code_expires_at'), ['expires_at'], unique=False)
-
-    op.create_table('user',
-    sa.Column('id', sa.INTEGER(), nullable=False),
-    sa.Column('username', sa.VARCHAR(length=80), nullable=False),
-    sa.Column('password_hash', sa.VARCHAR(length=256), nullable=False),
-    sa.PrimaryKeyConstraint('id'),
-    sa.UniqueConstraint('username')
-    )
-    with op.batch_alter_table('order_items', schema=None) as batch_op:
-        batch_op.drop_index(batch_op.f('ix_order_items_product_id'))
-        batch_op.drop_index(batch_op.f('ix_order_items_order_id'))
-
+    # Gegenstück zu upgrade(): Indizes und Tabellen in umgekehrter Reihenfolge
+    op.drop_index('ix_order_items_product_id', table_name='order_items')
+    op.drop_index('ix_order_items_order_id', table_name='order_items')
     op.drop_table('order_items')
-    with op.batch_alter_table('orders', schema=None) as batch_op:
-        batch_op.drop_index(batch_op.f('ix_orders_customer_id'))
 
+    op.drop_index('ix_orders_customer_id', table_name='orders')
     op.drop_table('orders')
-    with op.batch_alter_table('login_codes', schema=None) as batch_op:
-        batch_op.drop_index(batch_op.f('ix_login_codes_user_id'))
-        batch_op.drop_index(batch_op.f('ix_login_codes_expires_at'))
 
+    op.drop_index('ix_login_codes_expires_at', table_name='login_codes')
+    op.drop_index('ix_login_codes_user_id', table_name='login_codes')
     op.drop_table('login_codes')
-    with op.batch_alter_table('contacts', schema=None) as batch_op:
-        batch_op.drop_index(batch_op.f('ix_contacts_user_id'))
-        batch_op.drop_index(batch_op.f('ix_contacts_customer_id'))
 
+    op.drop_index('ix_contacts_user_id', table_name='contacts')
+    op.drop_index('ix_contacts_customer_id', table_name='contacts')
     op.drop_table('contacts')
+
     op.drop_table('users')
     op.drop_table('products')
     op.drop_table('customers')
-    # ### end Alembic commands ###
@@ -4,7 +4,12 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 
-db = SQLAlchemy()
+from money import Money
+from sharding import ShardedSession
+
+# ShardedSession: kundenbezogene Tabellen → Shard des Kunden (sharding.py),
+# SELECTs aus @read_replica-Views → Read-Replica (replicas.py)
+db = SQLAlchemy(session_options={"class_": ShardedSession})
 
 
 # ---------- Auth / User ----------
@@ -26,7 +31,9 @@ class User(db.Model, UserMixin):
     contacts = db.relationship("Contact", back_populates="user", lazy="dynamic")
 
     def set_password(self, password: str):
-        self.password_hash = generate_password_hash(password)
+        # Verfahren aus PASSWORD_HASH_METHOD; Login und Registrierung hashen über login_guard
+        from login_guard import password_hash_options
+        self.password_hash = generate_password_hash(password, **password_hash_options())
 
     def check_password(self, password: str) -> bool:
         return check_password_hash(self.password_hash, password)
@@ -47,6 +54,19 @@ class LoginCode(db.Model):
     expires_at = db.Column(db.DateTime, nullable=False, index=True)
 
 
+class LoginThrottle(db.Model):
+    """Token-Buckets der Login-Drosselung, wenn mehrere Prozesse sie teilen sollen.
+
+    Nur mit ``LOGIN_THROTTLE_STORAGE=database`` (siehe ``login_guard.py``);
+    ``bucket`` ist z. B. ``"ip:203.0.113.7"`` oder ``"user:name@firma.com"``.
+    """
+    __tablename__ = "login_throttle"
+
+    bucket = db.Column(db.String(200), primary_key=True)
+    tokens = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
 # ---------- CRM-Modelle ----------
 
 class Customer(db.Model):
@@ -69,12 +89,20 @@ class Customer(db.Model):
         default=datetime.utcnow,
         onupdate=datetime.utcnow,
         nullable=False,
+        index=True,
     )
+    # Soft Delete: gesetzt = gelöscht, endgültiges Entfernen per "flask purge-deleted"
+    deleted_at = db.Column(db.DateTime, nullable=True, index=True)
 
     # Beziehungen
     orders = db.relationship("Order", back_populates="customer", lazy="dynamic")
     contacts = db.relationship("Contact", back_populates="customer", lazy="dynamic")
 
+    @classmethod
+    def active(cls):
+        """Query auf alle nicht gelöschten Kunden."""
+        return cls.query.filter(cls.deleted_at.is_(None))
+
     def __repr__(self) -> str:
         return f"<Customer {self.company}>"
 
@@ -92,8 +120,8 @@ class Product(db.Model):
 
     name = db.Column(db.String(120), nullable=False)
 
-    # Preis
-    unit_price = db.Column(db.Numeric(10, 2), nullable=False, default=0)
+    # Preis in Cent – maßgeblich; die alte Numeric-Spalte unit_price wird nicht mehr geschrieben
+    unit_price_cents = db.Column(db.BigInteger, nullable=False, default=0)
 
     # Erzeugungsdatum (aus Migration)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -102,7 +130,7 @@ class Product(db.Model):
     order_items = db.relationship("OrderItem", back_populates="product", lazy="dynamic")
 
     def __repr__(self):
-        return f"<Product {self.sku} {self.name} €{self.unit_price}>"
+        return f"<Product {self.sku} {self.name} {Money(self.unit_price_cents)}>"
 
 
 class Order(db.Model):
@@ -115,18 +143,35 @@ class Order(db.Model):
     order_date = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
     status = db.Column(db.String(20), default="offen", nullable=False)
-    total_amount = db.Column(db.Numeric(10, 2), default=0, nullable=False)
+    total_amount_cents = db.Column(db.BigInteger, default=0, nullable=False)
     currency = db.Column(db.String(3), default="EUR", nullable=False)
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(
+        db.DateTime,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        nullable=False,
+    )
 
     # Beziehungen
     customer = db.relationship("Customer", back_populates="orders")
+
+    __table_args__ = (
+        db.Index("ix_orders_customer_updated_at", "customer_id", "updated_at"),
+        db.Index("ix_orders_updated_at", "updated_at"),
+        db.Index("ix_orders_customer_order_date", "customer_id", "order_date", "id"),  # Timeline
+    )
     items = db.relationship("OrderItem", back_populates="order", lazy="dynamic")
 
     def __repr__(self) -> str:
         return f"<Order {self.order_number} customer={self.customer_id}>"
 
+    @property
+    def total(self) -> Money:
+        """Gesamtsumme als ``Money``."""
+        return Money(self.total_amount_cents, self.currency)
+
     @property
     def positions_count(self) -> int:
         """Anzahl der Positionen (für Tabelle 'Positionen')."""
@@ -137,10 +182,10 @@ class OrderItem(db.Model):
     __tablename__ = "order_items"
 
     id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, db.ForeignKey("orders.id"), nullable=False)
-    product_id = db.Column(db.Integer, db.ForeignKey("products.id"), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey("orders.id"), nullable=False, index=True)
+    product_id = db.Column(db.Integer, db.ForeignKey("products.id"), nullable=False, index=True)
     quantity = db.Column(db.Integer, nullable=False)
-    unit_price = db.Column(db.Numeric(10, 2), nullable=False)
+    unit_price_cents = db.Column(db.BigInteger, nullable=False)
 
     order = db.relationship("Order", back_populates="items")
     product = db.relationship("Product", back_populates="order_items")
@@ -162,9 +207,201 @@ class Contact(db.Model):
 
     contact_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
 
     customer = db.relationship("Customer", back_populates="contacts")
     user = db.relationship("User", back_populates="contacts")
 
+    __table_args__ = (
+        db.Index("ix_contacts_customer_updated_at", "customer_id", "updated_at"),
+        db.Index("ix_contacts_updated_at", "updated_at"),
+        db.Index("ix_contacts_customer_contact_at", "customer_id", "contact_at", "id"),  # Timeline
+    )
+
     def __repr__(self):
         return f"<Contact customer={self.customer_id} channel={self.channel} rating={self.rating}>"
+
+
+# ---------- Archiv (alte Bestellungen / Kontakte) ----------
+
+class ArchivedOrder(db.Model):
+    """Archivierte Bestellung – gleiche Spalten wie ``orders``, IDs bleiben erhalten."""
+    __tablename__ = "archived_orders"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    customer_id = db.Column(db.Integer, nullable=False, index=True)
+
+    order_number = db.Column(db.String(50), nullable=False)
+    order_date = db.Column(db.DateTime, nullable=False)
+
+    status = db.Column(db.String(20), nullable=False)
+    total_amount_cents = db.Column(db.BigInteger, nullable=False)
+    currency = db.Column(db.String(3), nullable=False)
+
+    created_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<ArchivedOrder {self.order_number} customer={self.customer_id}>"
+
+
+class ArchivedOrderItem(db.Model):
+    __tablename__ = "archived_order_items"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    order_id = db.Column(db.Integer, nullable=False, index=True)
+    product_id = db.Column(db.Integer, nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    unit_price_cents = db.Column(db.BigInteger, nullable=False)
+
+
+class ArchivedContact(db.Model):
+    __tablename__ = "archived_contacts"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    customer_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, nullable=True)
+
+    channel = db.Column(db.String(20), nullable=False)
+    subject = db.Column(db.String(200), nullable=False)
+    notes = db.Column(db.Text)
+    rating = db.Column(db.Integer, nullable=True)
+
+    contact_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index("ix_archived_contacts_customer_contact_at", "customer_id", "contact_at"),
+    )
+
+
+class ArchivedRevenue(db.Model):
+    """Vorberechneter Umsatz archivierter Bestellungen je Kunde, Monat und Währung.
+
+    Enthält nur nicht stornierte Bestellungen, damit die KPIs in der
+    Detailansicht ohne Zugriff auf ``archived_orders`` ergänzt werden können.
+    """
+    __tablename__ = "archived_revenue"
+
+    customer_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    year = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    month = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    currency = db.Column(db.String(3), primary_key=True)
+
+    revenue_cents = db.Column(db.BigInteger, nullable=False, default=0)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<ArchivedRevenue customer={self.customer_id} {self.year}-{self.month:02d} {Money(self.revenue_cents, self.currency)}>"
+
+
+# ---------- Audit-Log (append-only) ----------
+
+class AuditLog(db.Model):
+    """Änderungshistorie für Kunden, Bestellungen und Kontakte.
+
+    Wird nur per Batch-Insert aus ``audit.py`` befüllt und nie aktualisiert.
+    ``changes`` enthält die geänderten Felder als JSON ``{"feld": [alt, neu]}``.
+    """
+    __tablename__ = "audit_log"
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    customer_id = db.Column(db.Integer, nullable=True)
+    action = db.Column(db.String(20), nullable=False)
+    changes = db.Column(db.Text, nullable=False)
+    user_id = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index("ix_audit_log_customer_id_id", "customer_id", "id"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<AuditLog {self.action} {self.entity}#{self.entity_id}>"
+
+
+# ---------- Wechselkurse ----------
+
+class FxRate(db.Model):
+    """Tageskurs: ``rate`` Einheiten von ``currency`` je 1 EUR (EZB-Konvention).
+
+    Lücken (Wochenenden, Feiertage) werden beim Import mit dem letzten bekannten
+    Kurs aufgefüllt, damit Umsätze per Join auf ``DATE(order_date)`` umgerechnet
+    werden können.
+    """
+    __tablename__ = "fx_rates"
+
+    rate_date = db.Column(db.Date, primary_key=True)
+    currency = db.Column(db.String(3), primary_key=True)
+    rate = db.Column(db.Numeric(18, 8), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<FxRate {self.rate_date} {self.currency}={self.rate}>"
+
+
+# ---------- Sharding ----------
+
+class CustomerShard(db.Model):
+    """Verzeichnis: auf welchem Shard ein Kunde liegt (nur mit ``SHARD_URLS``, siehe ``sharding.py``).
+
+    Liegt immer auf Shard 0 und vergibt zugleich die global eindeutigen
+    Kunden-IDs (Autoincrement). Kunden ohne Eintrag liegen auf Shard 0.
+    """
+    __tablename__ = "customer_shards"
+
+    customer_id = db.Column(db.Integer, primary_key=True)
+    shard = db.Column(db.SmallInteger, nullable=False, index=True)
+
+    def __repr__(self) -> str:
+        return f"<CustomerShard customer={self.customer_id} shard={self.shard}>"
+
+
+class CustomerDedupeKey(db.Model):
+    """Blocking-Schlüssel je Kunde für die Dubletten-Suche (siehe ``dedupe.py``).
+
+    Liegt wie ``customer_shards`` auf Shard 0, damit Dubletten auch über Shards
+    hinweg gefunden werden; ``key`` ist z. B. ``"name:acme"`` oder ``"tel:12345678"``.
+    """
+    __tablename__ = "customer_dedupe_keys"
+
+    key = db.Column(db.String(200), primary_key=True)
+    customer_id = db.Column(db.Integer, primary_key=True, index=True)
+
+
+class BackfillProgress(db.Model):
+    """Checkpoint eines Online-Backfills (siehe ``backfill.py``) – je Datenbank bzw. Shard.
+
+    ``last_id`` ist der Primärschlüssel des letzten fertigen Chunks, ``max_id``
+    die obere Grenze beim Start; neuere Zeilen schreibt die App schon richtig.
+    """
+    __tablename__ = "backfill_progress"
+
+    name = db.Column(db.String(100), primary_key=True)
+    last_id = db.Column(db.BigInteger, nullable=True)
+    max_id = db.Column(db.BigInteger, nullable=True)
+    rows_scanned = db.Column(db.BigInteger, nullable=False, default=0)
+    rows_updated = db.Column(db.BigInteger, nullable=False, default=0)
+    started_at = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+
+class CacheVersion(db.Model):
+    """Versionszähler für ETag/Last-Modified (siehe ``http_cache.py``) – liegt auf Shard 0.
+
+    ``name`` ist ``"lists"``, ``"fx"`` oder ``"customer:<id>"``; jeder Commit, der
+    die Daten dahinter ändert, erhöht ``version``.
+    """
+    __tablename__ = "cache_versions"
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    changed_at = db.Column(db.DateTime, nullable=False)
@@ -0,0 +1,140 @@
+"""Geldbeträge als ganzzahlige Cent-Werte.
+
+``Money`` rechnet ausschließlich mit ``int`` (Cent) – Summen und Vergleiche sind
+damit deutlich billiger als mit ``Decimal`` und haben keine Obergrenze wie
+``Numeric(10, 2)``. ``format_money()`` formatiert für AT/DE ohne ``locale``-Modul
+(das ist prozessweit und nicht thread-sicher).
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+
+CURRENCY_SYMBOLS = {"EUR": "€", "USD": "$", "GBP": "£", "CHF": "CHF"}
+
+# de_DE: "1.234,56 €"   de_AT: "€ 1.234,56"
+SYMBOL_FIRST = {"de_DE": False, "de_AT": True}
+
+DEFAULT_LOCALE = "de_DE"
+
+_CENT = Decimal("0.01")
+
+_TWO_DIGITS = [f"{i:02d}" for i in range(100)]
+_THREE_DIGITS = [f"{i:03d}" for i in range(1000)]
+_AFFIXES = {}  # (Währung, Locale) → (Präfix, Suffix)
+
+
+def to_cents(value) -> int:
+    """Wandelt Decimal/float/str/int (in Währungseinheiten) kaufmännisch gerundet in Cent um."""
+    if isinstance(value, Money):
+        return value.cents
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    return int((value * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+class Money:
+    """Unveränderlicher Geldbetrag in Cent mit Währung."""
+
+    __slots__ = ("cents", "currency")
+
+    def __init__(self, cents: int = 0, currency: str = "EUR"):
+        self.cents = int(cents)
+        self.currency = currency
+
+    @classmethod
+    def from_decimal(cls, value, currency: str = "EUR") -> "Money":
+        return cls(to_cents(value or 0), currency)
+
+    def to_decimal(self) -> Decimal:
+        return (Decimal(self.cents) / 100).quantize(_CENT)
+
+    def _check(self, other: "Money"):
+        if self.currency != other.currency:
+            raise ValueError(f"Währungen passen nicht zusammen: {self.currency} / {other.currency}")
+
+    def __add__(self, other):
+        if isinstance(other, int) and other == 0:
+            # erlaubt sum([...]) mit Startwert 0
+            return self
+        self._check(other)
+        return Money(self.cents + other.cents, self.currency)
+
+    __radd__ = __add__
+
+    def __sub__(self, other: "Money") -> "Money":
+        self._check(other)
+        return Money(self.cents - other.cents, self.currency)
+
+    def __mul__(self, factor: int) -> "Money":
+        return Money(self.cents * factor, self.currency)
+
+    __rmul__ = __mul__
+
+    def __neg__(self) -> "Money":
+        return Money(-self.cents, self.currency)
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, Money)
+            and self.cents == other.cents
+            and self.currency == other.currency
+        )
+
+    def __lt__(self, other: "Money") -> bool:
+        self._check(other)
+        return self.cents < other.cents
+
+    def __hash__(self) -> int:
+        return hash((self.cents, self.currency))
+
+    def __bool__(self) -> bool:
+        return self.cents != 0
+
+    def __repr__(self) -> str:
+        return f"Money({self.cents}, {self.currency!r})"
+
+    def __str__(self) -> str:
+        return format_money(self)
+
+
+def _affixes(currency: str, locale: str) -> tuple[str, str]:
+    symbol = CURRENCY_SYMBOLS.get(currency, currency)
+    affixes = (f"{symbol} ", "") if SYMBOL_FIRST.get(locale, False) else ("", f" {symbol}")
+    _AFFIXES[currency, locale] = affixes
+    return affixes
+
+
+def _grouped(cents: int) -> str:
+    """Beliebig große Beträge: Tausenderpunkte in Dreiergruppen."""
+    sign = "-" if cents < 0 else ""
+    units, rest = divmod(abs(cents), 100)
+    groups = []
+    while units >= 1000:
+        units, group = divmod(units, 1000)
+        groups.append(_THREE_DIGITS[group])
+    groups.append(str(units))
+    return f"{sign}{'.'.join(reversed(groups))},{_TWO_DIGITS[rest]}"
+
+
+def format_money(value, currency: str | None = None, locale: str = DEFAULT_LOCALE) -> str:
+    """Formatiert einen Betrag im AT/DE-Format, z. B. ``1.234,56 €``.
+
+    Akzeptiert ``Money``, ``Decimal``/``float`` (Währungseinheiten) oder ``None``.
+    """
+    if value.__class__ is Money:
+        cents = value.cents
+        if currency is None:
+            currency = value.currency
+    else:
+        cents = to_cents(value or 0)
+        if currency is None:
+            currency = "EUR"
+    prefix, suffix = _AFFIXES.get((currency, locale)) or _affixes(currency, locale)
+
+    # Reine Ganzzahl-Arithmetik mit vorberechneten Ziffern statt Float-Formatierung
+    # und replace(); die beiden häufigen Größen ohne Schleife
+    if 0 <= cents < 100_000:  # bis 999,99
+        return f"{prefix}{cents // 100},{_TWO_DIGITS[cents % 100]}{suffix}"
+    if 0 <= cents < 100_000_000:  # bis 999.999,99
+        thousands, rest = divmod(cents, 100_000)
+        return f"{prefix}{thousands}.{_THREE_DIGITS[rest // 100]},{_TWO_DIGITS[rest % 100]}{suffix}"
+    return f"{prefix}{_grouped(cents)}{suffix}"
@@ -0,0 +1,211 @@
+"""Schlanke Lese-Modelle für die Listenseiten und die Kunden-Timeline.
+
+Die Listen zeigen pro Zeile nur eine Handvoll Spalten. Statt ganzer
+ORM-Entities (mit ``notes``-Textspalten, Identity-Map, Änderungsverfolgung und
+nachgeladenen Beziehungen) liest jede Liste genau diese Spalten in ein
+``NamedTuple`` – ohne ``__dict__``, ohne Session-Bindung. Firma und Benutzername
+kommen per Join in derselben Abfrage mit.
+
+``query()`` liefert das ``SELECT``; Filter hängt die View an, die Zeilenklasse
+geht als ``into=`` an ``shard_page()``. Die Feldnamen entsprechen den
+Spaltennamen, damit ``shard_page()`` Sortierwert und ID daraus lesen kann.
+"""
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy import and_, func, literal, null, or_, select, union_all
+
+from models import db, Customer, Order, OrderItem, Contact, User
+from money import Money
+
+
+class CustomerRow(NamedTuple):
+    """Zeile der Kundenliste."""
+    id: int
+    company: str
+    contact_name: str | None
+    email: str | None
+    phone: str | None
+
+    @staticmethod
+    def query():
+        return select(
+            Customer.id, Customer.company, Customer.contact_name, Customer.email, Customer.phone,
+        ).where(Customer.deleted_at.is_(None))
+
+
+class CustomerActivityRow(NamedTuple):
+    """Zeile der Kunden-Sektion im Dashboard, mit letztem Kontakt (statt einer Abfrage je Kunde)."""
+    id: int
+    company: str
+    contact_name: str | None
+    email: str | None
+    last_contact_at: datetime | None
+
+    @staticmethod
+    def query():
+        last_contact = (
+            select(func.max(Contact.contact_at))
+            .where(Contact.customer_id == Customer.id)
+            .scalar_subquery()
+        )
+        return select(
+            Customer.id, Customer.company, Customer.contact_name, Customer.email,
+            last_contact.label("last_contact_at"),
+        ).where(Customer.deleted_at.is_(None))
+
+
+class OrderRow(NamedTuple):
+    """Zeile der Bestellliste."""
+    id: int
+    order_number: str
+    order_date: datetime
+    status: str
+    total_amount_cents: int
+    currency: str
+    customer_id: int
+    company: str
+
+    @staticmethod
+    def query():
+        return (
+            select(
+                Order.id, Order.order_number, Order.order_date, Order.status,
+                Order.total_amount_cents, Order.currency,
+                Order.customer_id, Customer.company,
+            )
+            .join_from(Order, Customer)
+            .where(Customer.deleted_at.is_(None))
+        )
+
+    @property
+    def total(self) -> Money:
+        """Wie ``Order.total``."""
+        return Money(self.total_amount_cents, self.currency)
+
+
+class ContactRow(NamedTuple):
+    """Zeile der Kontaktliste."""
+    id: int
+    contact_at: datetime
+    channel: str
+    subject: str
+    customer_id: int
+    company: str
+    username: str | None
+
+    @staticmethod
+    def query():
+        return (
+            select(
+                Contact.id, Contact.contact_at, Contact.channel, Contact.subject,
+                Contact.customer_id, Customer.company, User.username,
+            )
+            .join_from(Contact, Customer)
+            .outerjoin(User, Contact.user_id == User.id)
+            .where(Customer.deleted_at.is_(None))
+        )
+
+
+# ------------------ Kunden-Timeline ------------------
+class TimelineRow(NamedTuple):
+    """Eintrag der Kunden-Timeline – Bestellung (``kind="order"``) oder Kontakt (``"contact"``)."""
+    at: datetime
+    kind: str
+    id: int
+    title: str  # Bestellnummer bzw. Betreff
+    label: str  # Status bzw. Kanal
+    positions: int | None
+    total_amount_cents: int | None
+    currency: str | None
+    username: str | None
+    notes: str | None
+
+    @property
+    def total(self) -> Money | None:
+        """Wie ``Order.total``; ``None`` bei Kontakten."""
+        if self.kind != "order":
+            return None
+        return Money(self.total_amount_cents, self.currency)
+
+    @property
+    def cursor(self) -> str:
+        return f"{self.at.isoformat()}~{self.kind}~{self.id}"
+
+
+def _parse_timeline_cursor(token: str | None):
+    if not token:
+        return None
+    try:
+        at, kind, row_id = token.split("~")
+        return datetime.fromisoformat(at), kind, int(row_id)
+    except ValueError:
+        return None  # kaputter Cursor → erste Seite
+
+
+def _older_than(at_column, id_column, kind: str, cursor):
+    """``(Zeitpunkt, Art, ID) < Cursor`` für einen Zweig – die Art ist dort konstant.
+
+    Immer mit einer reinen Bereichsbedingung auf ``at_column`` vorne, damit der
+    Index ``(customer_id, datum, id)`` als Range-Scan genutzt wird (ein ``OR``
+    auf oberster Ebene verhindert das z. B. in SQLite).
+    """
+    at, cursor_kind, cursor_id = cursor
+    if kind == cursor_kind:
+        return and_(at_column <= at, or_(at_column < at, id_column < cursor_id))
+    if kind < cursor_kind:
+        return at_column <= at
+    return at_column < at
+
+
+def customer_timeline(customer_id: int, before: str | None = None, limit: int = 20,
+                      date_from: datetime | None = None, date_to: datetime | None = None):
+    """Bestellungen und Kontakte eines Kunden, neueste zuerst, mit Keyset-Pagination.
+
+    ``UNION ALL`` aus zwei Zweigen, die je höchstens ``limit + 1`` Zeilen über
+    ``(customer_id, datum, id)`` aus dem Index lesen – die Kosten hängen nicht
+    davon ab, wie viele Ereignisse der Kunde insgesamt hat oder wie weit geblättert ist.
+    Gibt ``(einträge, next_before)`` zurück; ``next_before`` ist ``None`` auf der letzten Seite.
+    """
+    cursor = _parse_timeline_cursor(before)
+    positions = select(func.count()).where(OrderItem.order_id == Order.id).scalar_subquery()
+    orders = select(
+        Order.order_date.label("at"), literal("order").label("kind"), Order.id,
+        Order.order_number.label("title"), Order.status.label("label"), positions.label("positions"),
+        Order.total_amount_cents, Order.currency,
+        null().label("username"), null().label("notes"),
+    ).where(Order.customer_id == customer_id)
+    contacts = (
+        select(
+            Contact.contact_at.label("at"), literal("contact").label("kind"), Contact.id,
+            Contact.subject.label("title"), Contact.channel.label("label"), null().label("positions"),
+            null().label("total_amount_cents"), null().label("currency"),
+            User.username, Contact.notes,
+        )
+        .outerjoin(User, Contact.user_id == User.id)
+        .where(Contact.customer_id == customer_id)
+    )
+
+    branches = []
+    for kind, stmt, at_column, id_column in (
+        ("order", orders, Order.order_date, Order.id),
+        ("contact", contacts, Contact.contact_at, Contact.id),
+    ):
+        if date_from:
+            stmt = stmt.where(at_column >= date_from)
+        if date_to:
+            stmt = stmt.where(at_column <= date_to)
+        if cursor is not None:
+            stmt = stmt.where(_older_than(at_column, id_column, kind, cursor))
+        stmt = stmt.order_by(at_column.desc(), id_column.desc()).limit(limit + 1)
+        branches.append(select(stmt.subquery()))
+
+    timeline = union_all(*branches).subquery("timeline")
+    rows = db.session.execute(
+        select(timeline)
+        .order_by(timeline.c.at.desc(), timeline.c.kind.desc(), timeline.c.id.desc())
+        .limit(limit + 1)
+    ).all()
+    entries = [TimelineRow._make(row) for row in rows[:limit]]
+    next_before = entries[-1].cursor if len(rows) > limit else None
+    return entries, next_before
@@ -0,0 +1,127 @@
+"""Lesezugriffe auf Read-Replicas verteilen.
+
+Replicas werden als Flask-SQLAlchemy-Binds ``replica_1``, ``replica_2``, …
+konfiguriert (``DATABASE_REPLICA_URLS``, kommagetrennt). ``RoutingSession``
+schickt ein ``SELECT`` nur dann an eine Replica, wenn
+
+- die View mit ``@read_replica`` markiert ist,
+- die Session gerade nicht flusht (Schreiben geht immer an die Primary) und
+- der User nicht kürzlich selbst geschrieben hat (Read-your-writes).
+
+Nach einem Commit im Request bleibt der User ``REPLICA_STICKY_SECONDS`` lang
+an der Primary (Zeitstempel in der Flask-Session) – so sieht er seine eigene
+Änderung auch dann, wenn die Replica noch hinterherhängt.
+
+Replicas werden reihum gewählt. Jede wird höchstens alle
+``REPLICA_CHECK_INTERVAL`` Sekunden per ``SELECT 1`` geprüft; fällt sie aus
+(Ping oder Verbindungsabbruch während einer Abfrage), wird sie
+``REPLICA_RETRY_AFTER`` Sekunden übersprungen. Ohne gesunde Replica liest die
+Primary.
+"""
+import itertools
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, g, has_request_context, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+from sqlalchemy.sql import Select, CompoundSelect
+
+STICKY_KEY = "_primary_until"
+
+
+class ReplicaSet:
+    """Round-Robin mit einfachem Health-Check über die Replica-Binds einer App."""
+
+    def __init__(self, engines: dict, check_interval: float, retry_after: float):
+        self.engines = engines
+        self.keys = sorted(engines)
+        self.check_interval = check_interval
+        self.retry_after = retry_after
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._checked_at = {key: 0.0 for key in self.keys}
+        self._down_until = {key: 0.0 for key in self.keys}
+        for key, engine in engines.items():
+            event.listen(engine, "handle_error", self._on_error(key))
+
+    def _on_error(self, key):
+        def handle_error(context):
+            if context.is_disconnect:
+                self.mark_down(key)
+        return handle_error
+
+    def mark_down(self, key):
+        self._down_until[key] = time.monotonic() + self.retry_after
+        print(f"[WARN] Read-Replica {key} nicht erreichbar – wird {self.retry_after:.0f} s übersprungen")
+
+    def _healthy(self, key) -> bool:
+        now = time.monotonic()
+        if self._down_until[key] > now:
+            return False
+        with self._lock:
+            if now - self._checked_at[key] < self.check_interval:
+                return True
+            self._checked_at[key] = now
+        try:
+            with self.engines[key].connect() as conn:
+                conn.execute(text("SELECT 1"))
+        except Exception:
+            self.mark_down(key)
+            return False
+        return True
+
+    def pick(self):
+        """Nächste gesunde Replica (Engine) oder ``None``."""
+        for _ in range(len(self.keys)):
+            key = self.keys[next(self._counter) % len(self.keys)]
+            if self._healthy(key):
+                return self.engines[key]
+        return None
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and isinstance(clause, (Select, CompoundSelect)):
+            engine = g.get("replica_engine") if has_request_context() else None
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _remember_write(session_):
+    if has_request_context():
+        g.wrote_primary = True
+
+
+def read_replica(view):
+    """Markiert eine reine Lese-View: ihre SELECTs dürfen an eine Replica gehen."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        replicas = current_app.extensions.get("replicas")
+        if replicas is not None and session.get(STICKY_KEY, 0) < time.time():
+            # Einmal pro Request wählen – alle Abfragen sehen denselben Stand
+            g.replica_engine = replicas.pick()
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def init_replicas(app, db) -> None:
+    keys = [key for key in app.config.get("SQLALCHEMY_BINDS", {}) if key.startswith("replica_")]
+    if keys:
+        with app.app_context():
+            engines = {key: db.engines[key] for key in keys}
+        app.extensions["replicas"] = ReplicaSet(
+            engines,
+            check_interval=app.config["REPLICA_CHECK_INTERVAL"],
+            retry_after=app.config["REPLICA_RETRY_AFTER"],
+        )
+
+    @app.after_request
+    def stick_to_primary(response):
+        # Nach eigenem Schreiben eine Weile von der Primary lesen
+        if g.pop("wrote_primary", False) and keys:
+            session[STICKY_KEY] = time.time() + app.config["REPLICA_STICKY_SECONDS"]
+        return response
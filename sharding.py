@@ -0,0 +1,515 @@
+"""Horizontales Sharding der Kundendaten nach Kunden-ID.
+
+Shard 0 ist die normale Datenbank (``DATABASE_URL``), weitere Shards kommen aus
+``SHARD_URLS`` (kommagetrennt, Binds ``shard_1``, ``shard_2``, …). Ohne
+``SHARD_URLS`` gibt es genau einen Shard und alles verhält sich wie bisher.
+
+Aufteilung der Tabellen:
+
+- kundenbezogen (``customers``, ``orders``, ``order_items``, ``contacts`` und die
+  Archivtabellen): liegen auf dem Shard des Kunden
+- global (``users``, ``login_codes``, ``login_throttle``, ``audit_log``, ``customer_shards``,
+  ``customer_dedupe_keys``, ``cache_versions``): werden nur auf Shard 0 gelesen und geschrieben
+- Referenzdaten (``products``, ``fx_rates`` und – wegen der Fremdschlüssel – eine
+  Kopie von ``users``): auf jedem Shard vollständig, damit Joins lokal bleiben
+
+Welcher Kunde wo liegt, steht im Verzeichnis ``customer_shards`` auf Shard 0, das
+zugleich die global eindeutigen Kunden-IDs vergibt. Neue Kunden landen auf Shard
+``ID mod n`` – wie bei ``flask shard-distribute``; Bestandskunden behalten ihren
+Eintrag, auch wenn später ein Shard dazukommt. Kunden ohne Eintrag liegen auf
+Shard 0 (Stand vor dem Sharding, verteilt mit ``flask shard-distribute``).
+
+``ShardedSession.get_bind`` schickt alle Statements auf kundenbezogene Tabellen an
+``g.shard_engine`` (gesetzt von ``@customer_shard`` bzw. ``on_shard()``). Globale
+Ansichten fragen mit ``fan_out()`` alle Shards parallel ab; ``shard_page()``
+führt die sortierten Teilergebnisse per k-Wege-Merge zusammen und blättert per
+Keyset (Sortierwert, Shard, ID) statt ``OFFSET``.
+"""
+import base64
+import heapq
+import itertools
+import json
+import operator
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+from flask import current_app, g, has_app_context
+from sqlalchemy import and_, bindparam, func, inspect, insert, or_, select, text, true, update
+from sqlalchemy.sql.util import find_tables
+from sqlalchemy.types import DateTime
+
+from metrics import current_endpoint, endpoint_label
+from replicas import RoutingSession
+
+SHARD_PREFIX = "shard_"
+GLOBAL_TABLES = frozenset({
+    "users", "login_codes", "login_throttle", "audit_log", "customer_shards", "customer_dedupe_keys",
+    "cache_versions",
+})
+REFERENCE_TABLES = ("users", "products", "fx_rates")
+
+_pool = None
+
+
+def _reset_pool():
+    # Threads überleben fork() nicht (gunicorn preload_app: Suchindex wird im Master aufgebaut)
+    global _pool
+    _pool = None
+
+
+os.register_at_fork(after_in_child=_reset_pool)
+
+
+# ------------------ Routing ------------------
+def _global_only(mapper, clause) -> bool:
+    if mapper is not None:
+        return inspect(mapper).local_table.name in GLOBAL_TABLES
+    if clause is None:
+        return False
+    tables = find_tables(clause, include_crud=True)
+    return bool(tables) and all(table.name in GLOBAL_TABLES for table in tables)
+
+
+class ShardedSession(RoutingSession):
+    """``db.session``: kundenbezogene Tabellen → Shard, globale → Shard 0 (bzw. Read-Replica)."""
+
+    def __init__(self, db, shard_engine=None, **kwargs):
+        super().__init__(db, **kwargs)
+        # fest gebunden (Fan-out-Sessions) oder pro Request über g.shard_engine
+        self.shard_engine = shard_engine
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            engine = self.shard_engine
+            if engine is None and has_app_context():
+                engine = g.get("shard_engine")
+            if engine is not None and not _global_only(mapper, clause):
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def shard_engines() -> list:
+    """Engines aller Shards, Index = Shard-Nummer (0 = ``DATABASE_URL``)."""
+    return current_app.extensions["shards"]
+
+
+def shard_count() -> int:
+    return len(shard_engines())
+
+
+def shard_of(customer_id: int) -> int:
+    """Shard eines Kunden laut Verzeichnis (pro Request gemerkt)."""
+    if shard_count() == 1:
+        return 0
+    from models import db, CustomerShard
+
+    known = g.setdefault("customer_shards", {})
+    if customer_id not in known:
+        known[customer_id] = db.session.scalar(
+            select(CustomerShard.shard).where(CustomerShard.customer_id == customer_id)
+        ) or 0
+    return known[customer_id]
+
+
+def allocate_customer_id() -> tuple[int, int] | None:
+    """Vergibt ``(ID, Shard)`` für einen neuen Kunden – ``None`` ohne Sharding (Autoincrement)."""
+    n = shard_count()
+    if n == 1:
+        return None
+    from models import db, CustomerShard
+
+    # eigene Transaktion auf Shard 0: die ID bleibt vergeben, auch wenn der Kunde scheitert.
+    # Shard = ID mod n wie bei distribute() – zwei Zugriffe per Primärschlüssel statt Zählen je Shard
+    with db.engine.begin() as conn:
+        customer_id = conn.execute(insert(CustomerShard).values(shard=0)).inserted_primary_key[0]
+        shard = customer_id % n
+        if shard:
+            conn.execute(update(CustomerShard).where(CustomerShard.customer_id == customer_id).values(shard=shard))
+    return customer_id, shard
+
+
+@contextmanager
+def on_shard(shard: int):
+    """Leitet ``db.session`` innerhalb des Blocks auf den Shard ``shard`` um."""
+    previous = g.get("shard_engine")
+    g.shard_engine = shard_engines()[shard] if shard else None
+    try:
+        yield
+    finally:
+        g.shard_engine = previous
+
+
+def each_shard():
+    """Für CLI-Befehle: ``for shard in each_shard(): ...`` läuft nacheinander auf jedem Shard.
+
+    Nach jedem Shard wird die Session verworfen – IDs von Bestellungen und
+    Kontakten sind nur je Shard eindeutig.
+    """
+    from models import db
+
+    for shard in range(shard_count()):
+        with on_shard(shard):
+            try:
+                yield shard
+            finally:
+                db.session.remove()
+
+
+def customer_shard(view):
+    """Leitet alle kundenbezogenen Abfragen der View auf den Shard von ``customer_id``."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        shard = shard_of(kwargs["customer_id"])
+        if shard:
+            g.shard_engine = shard_engines()[shard]
+        return view(*args, **kwargs)
+    return wrapper
+
+
+# ------------------ Fan-out ------------------
+def _sessions() -> list:
+    """Eine Session je Shard für diesen Request.
+
+    Bleibt bis zum Ende des Requests offen, damit die geladenen Objekte beim
+    (ggf. gestreamten) Rendern ihre Beziehungen vom richtigen Shard nachladen.
+    """
+    sessions = g.get("shard_sessions")
+    if sessions is None:
+        from models import db
+
+        engines = list(shard_engines())
+        if g.get("replica_engine") is not None:
+            engines[0] = g.replica_engine  # Shard 0 liest in @read_replica-Views von der Replica
+        sessions = g.shard_sessions = [ShardedSession(db, shard_engine=engine) for engine in engines]
+    return sessions
+
+
+def fan_out(fn) -> list:
+    """Ruft ``fn(session, shard)`` auf allen Shards parallel auf; Ergebnisse in Shard-Reihenfolge."""
+    global _pool
+    sessions = _sessions()
+    if len(sessions) == 1:
+        return [fn(sessions[0], 0)]
+
+    if _pool is None:
+        _pool = ThreadPoolExecutor(
+            max_workers=current_app.config["SHARD_FANOUT_THREADS"], thread_name_prefix="shard-fanout"
+        )
+    app = current_app._get_current_object()
+    endpoint = current_endpoint()
+
+    def run(shard):
+        with app.app_context(), endpoint_label(endpoint):  # Abfragezeit zählt zum Request
+            return fn(sessions[shard], shard)
+
+    return list(_pool.map(run, range(len(sessions))))
+
+
+class ShardPage:
+    """Eine Seite aus ``shard_page()`` – Cursor statt Seitenzahlen."""
+
+    def __init__(self, items, per_page, has_prev, has_next, prev_cursor, next_cursor):
+        self.items = items
+        self.per_page = per_page
+        self.has_prev = has_prev
+        self.has_next = has_next
+        self.prev_cursor = prev_cursor
+        self.next_cursor = next_cursor
+
+
+def _encode_cursor(key) -> str:
+    value, shard, row_id = key
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([value, shard, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(token: str | None, column):
+    if not token:
+        return None
+    try:
+        value, shard, row_id = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        if isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        return value, int(shard), int(row_id)
+    except (ValueError, TypeError):
+        return None  # kaputter Cursor → erste Seite
+
+
+def _keyset(column, id_column, shard, cursor, op):
+    """Bedingung "(Wert, Shard, ID) ``op`` Cursor" für einen Shard – der Shard ist dort konstant."""
+    value, cursor_shard, cursor_id = cursor
+    if shard == cursor_shard:
+        tie = op(id_column, cursor_id)
+    elif op(shard, cursor_shard):
+        tie = true()
+    else:
+        return op(column, value)
+    return or_(op(column, value), and_(column == value, tie))
+
+
+def shard_page(stmt, column, id_column, per_page: int, after=None, before=None, descending=False,
+               into=None) -> ShardPage:
+    """Eine Seite von ``stmt`` über alle Shards, sortiert nach ``column`` (danach Shard, ID).
+
+    Jeder Shard liefert höchstens ``per_page + 1`` Zeilen ab dem Cursor; die
+    sortierten Teillisten werden mit ``heapq.merge`` zusammengeführt.
+    ``after``/``before`` sind ``next_cursor``/``prev_cursor`` einer vorherigen Seite.
+    ``into`` ist eine Zeilenklasse aus ``read_models`` für ein Spalten-``SELECT``;
+    ohne liefert ``stmt`` ORM-Entities.
+    """
+    backwards = before is not None and after is None
+    cursor = _decode_cursor(before if backwards else after, column)
+    # in Leserichtung "danach": bei absteigender Sortierung kleiner
+    op = operator.lt if descending != backwards else operator.gt
+    reverse = op is operator.lt
+
+    def fetch(session, shard):
+        query = stmt
+        if cursor is not None:
+            query = query.where(_keyset(column, id_column, shard, cursor, op))
+        order = (column.desc(), id_column.desc()) if reverse else (column.asc(), id_column.asc())
+        query = query.order_by(*order).limit(per_page + 1)
+        if into is None:
+            rows = session.scalars(query).all()
+        else:
+            rows = [into._make(row) for row in session.execute(query)]
+        return [((getattr(row, column.key), shard, getattr(row, id_column.key)), row) for row in rows]
+
+    merged = list(itertools.islice(
+        heapq.merge(*fan_out(fetch), key=operator.itemgetter(0), reverse=reverse), per_page + 1
+    ))
+    more = len(merged) > per_page
+    merged = merged[:per_page]
+    if backwards:
+        merged.reverse()
+
+    keys = [key for key, _ in merged]
+    return ShardPage(
+        items=[row for _, row in merged],
+        per_page=per_page,
+        has_prev=bool(keys) and (more if backwards else cursor is not None),
+        has_next=bool(keys) and (True if backwards else more),
+        prev_cursor=_encode_cursor(keys[0]) if keys else None,
+        next_cursor=_encode_cursor(keys[-1]) if keys else None,
+    )
+
+
+# ------------------ Verteilen (flask shard-distribute) ------------------
+def _customer_tables(customer_ids):
+    """``(Tabelle, WHERE)`` aller Zeilen der Kunden, in Einfüge-Reihenfolge."""
+    from models import db
+
+    t = db.metadata.tables
+    ids = list(customer_ids)
+    order_ids = select(t["orders"].c.id).where(t["orders"].c.customer_id.in_(ids))
+    archived_order_ids = select(t["archived_orders"].c.id).where(t["archived_orders"].c.customer_id.in_(ids))
+    return [
+        (t["customers"], t["customers"].c.id.in_(ids)),
+        (t["orders"], t["orders"].c.customer_id.in_(ids)),
+        (t["order_items"], t["order_items"].c.order_id.in_(order_ids)),
+        (t["contacts"], t["contacts"].c.customer_id.in_(ids)),
+        (t["archived_orders"], t["archived_orders"].c.customer_id.in_(ids)),
+        (t["archived_order_items"], t["archived_order_items"].c.order_id.in_(archived_order_ids)),
+        (t["archived_contacts"], t["archived_contacts"].c.customer_id.in_(ids)),
+        (t["archived_revenue"], t["archived_revenue"].c.customer_id.in_(ids)),
+    ]
+
+
+def _insert_with_new_ids(conn, table, rows) -> list:
+    """Fügt ``rows`` ohne ``id`` ein – das Ziel vergibt die IDs; Rückgabe in Eingabereihenfolge."""
+    rows = [{key: value for key, value in row.items() if key != "id"} for row in rows]
+    if not rows:
+        return []
+    if conn.dialect.insert_executemany_returning_sort_by_parameter_order:
+        return list(conn.scalars(table.insert().returning(table.c.id, sort_by_parameter_order=True), rows))
+    return [conn.execute(table.insert(), row).inserted_primary_key[0] for row in rows]
+
+
+def _free_archive_ids(conn, table, rows) -> dict:
+    """Alte → neue ID für Archivzeilen: negative IDs unterhalb der kleinsten vorhandenen.
+
+    ``archive.py`` übernimmt als Archiv-ID die (positive) ID der Live-Zeile, ein
+    Autoincrement gibt es dort nicht – negative IDs kollidieren also auch nicht
+    mit später archivierten Zeilen des Ziel-Shards.
+    """
+    lowest = min(conn.scalar(select(func.min(table.c.id))) or 0, 0)
+    return {row["id"]: lowest - i for i, row in enumerate(rows, 1)}
+
+
+def _copy_customer_rows(conn, data: dict) -> None:
+    """Schreibt die gelesenen Zeilen auf den Ziel-Shard und schreibt dabei IDs und Fremdschlüssel um.
+
+    Nur Kunden-IDs sind global eindeutig; Bestellungen, Positionen und Kontakte
+    bekommen auf dem Ziel neue IDs aus dessen Autoincrement.
+    """
+    from models import db
+
+    t = db.metadata.tables
+    for name in ("customers", "archived_revenue"):  # Schlüssel enthalten nur die Kunden-ID
+        if data[name]:
+            conn.execute(t[name].insert(), data[name])
+
+    order_ids = dict(zip(
+        (row["id"] for row in data["orders"]), _insert_with_new_ids(conn, t["orders"], data["orders"])
+    ))
+    _insert_with_new_ids(conn, t["order_items"], [
+        {**row, "order_id": order_ids[row["order_id"]]} for row in data["order_items"]
+    ])
+    _insert_with_new_ids(conn, t["contacts"], data["contacts"])
+
+    archived_order_ids = _free_archive_ids(conn, t["archived_orders"], data["archived_orders"])
+    archived_item_ids = _free_archive_ids(conn, t["archived_order_items"], data["archived_order_items"])
+    archived_contact_ids = _free_archive_ids(conn, t["archived_contacts"], data["archived_contacts"])
+    for name, rows in (
+        ("archived_orders", [{**row, "id": archived_order_ids[row["id"]]} for row in data["archived_orders"]]),
+        ("archived_order_items", [
+            {**row, "id": archived_item_ids[row["id"]], "order_id": archived_order_ids[row["order_id"]]}
+            for row in data["archived_order_items"]
+        ]),
+        ("archived_contacts", [{**row, "id": archived_contact_ids[row["id"]]} for row in data["archived_contacts"]]),
+    ):
+        if rows:
+            conn.execute(t[name].insert(), rows)
+
+
+def _move_customers(source, target, customer_ids) -> None:
+    tables = _customer_tables(customer_ids)
+    with source.connect() as conn:
+        data = {
+            table.name: [dict(row) for row in conn.execute(select(table).where(where)).mappings()]
+            for table, where in tables
+        }
+    with target.begin() as conn:
+        # Reste eines abgebrochenen Laufs entfernen – der Befehl ist wiederholbar. Kunden-IDs
+        # sind global, die WHERE-Bedingungen treffen auf dem Ziel also nur diese Kunden.
+        for table, where in reversed(tables):
+            conn.execute(table.delete().where(where))
+        _copy_customer_rows(conn, data)
+    with source.begin() as conn:
+        for table, where in reversed(tables):
+            conn.execute(table.delete().where(where))
+
+
+def sync_reference_tables() -> None:
+    """Kopiert ``REFERENCE_TABLES`` von Shard 0 auf alle anderen Shards (einfügen/aktualisieren)."""
+    from models import db
+
+    engines = shard_engines()
+    tables = [db.metadata.tables[name] for name in REFERENCE_TABLES]
+    with engines[0].connect() as conn:
+        data = [(table, [dict(row) for row in conn.execute(select(table)).mappings()]) for table in tables]
+
+    for engine in engines[1:]:
+        with engine.begin() as conn:
+            for table, rows in data:
+                pk = list(table.primary_key.columns)
+                existing = {tuple(row) for row in conn.execute(select(*pk))}
+                new, changed = [], []
+                for row in rows:
+                    (changed if tuple(row[c.name] for c in pk) in existing else new).append(row)
+                if new:
+                    conn.execute(table.insert(), new)
+                if changed:
+                    conn.execute(
+                        table.update().where(and_(*(c == bindparam(f"pk_{c.name}") for c in pk))),
+                        [{**row, **{f"pk_{c.name}": row[c.name] for c in pk}} for row in changed],
+                    )
+
+
+def distribute(batch_size: int = 100, log=print) -> dict[int, int]:
+    """Verteilt Kunden ohne Verzeichniseintrag (Shard ``id % n``) und zieht falsch liegende um.
+
+    Gibt die Anzahl umgezogener Kunden je Ziel-Shard zurück.
+    """
+    from models import db
+
+    engines = shard_engines()
+    n = len(engines)
+    if n == 1:
+        raise RuntimeError("SHARD_URLS ist nicht gesetzt – es gibt nur einen Shard.")
+    for index, engine in enumerate(engines):
+        if not inspect(engine).has_table("customers"):
+            raise RuntimeError(
+                f"Shard {index} hat kein Schema – vorher 'DATABASE_URL=<Shard-URL> flask db upgrade' ausführen."
+            )
+
+    sync_reference_tables()
+    log("Referenzdaten (users, products, fx_rates) auf alle Shards kopiert.")
+
+    customers = db.metadata.tables["customers"]
+    directory = db.metadata.tables["customer_shards"]
+    moved = {index: 0 for index in range(n)}
+    for source_index, source in enumerate(engines):
+        last_id = 0
+        while True:
+            with source.connect() as conn:
+                ids = conn.scalars(
+                    select(customers.c.id).where(customers.c.id > last_id)
+                    .order_by(customers.c.id).limit(batch_size)
+                ).all()
+            if not ids:
+                break
+            last_id = ids[-1]
+
+            with engines[0].begin() as conn:
+                target_of = dict(conn.execute(
+                    select(directory.c.customer_id, directory.c.shard).where(directory.c.customer_id.in_(ids))
+                ).all())
+                new = [{"customer_id": i, "shard": i % n} for i in ids if i not in target_of]
+                if new:
+                    conn.execute(directory.insert(), new)
+            target_of.update((row["customer_id"], row["shard"]) for row in new)
+
+            by_target = {}
+            for customer_id in ids:
+                if target_of[customer_id] != source_index:
+                    by_target.setdefault(target_of[customer_id], []).append(customer_id)
+            for target_index, customer_ids in by_target.items():
+                _move_customers(source, engines[target_index], customer_ids)
+                moved[target_index] += len(customer_ids)
+                log(f"  Shard {source_index} → {target_index}: {len(customer_ids)} Kunden")
+
+    if engines[0].dialect.name == "postgresql":
+        # explizit eingefügte IDs schieben die Sequence nicht weiter
+        with engines[0].begin() as conn:
+            conn.execute(text(
+                "SELECT setval(pg_get_serial_sequence('customer_shards', 'customer_id'), "
+                "(SELECT COALESCE(MAX(customer_id), 1) FROM customer_shards))"
+            ))
+    return moved
+
+
+def shard_stats() -> list[dict]:
+    """Zeilen je Shard (Kunden, Bestellungen, Kontakte) – für die CLI-Ausgabe."""
+    from models import db
+
+    t = db.metadata.tables
+    stats = []
+    for engine in shard_engines():
+        with engine.connect() as conn:
+            stats.append({
+                name: conn.scalar(select(func.count()).select_from(t[name]))
+                for name in ("customers", "orders", "contacts")
+            })
+    return stats
+
+
+# ------------------ Setup ------------------
+def init_sharding(app, db) -> None:
+    with app.app_context():
+        engines = db.engines
+        extra = sorted(
+            (key for key in engines if key and key.startswith(SHARD_PREFIX)),
+            key=lambda key: int(key[len(SHARD_PREFIX):]),
+        )
+        app.extensions["shards"] = [engines[None]] + [engines[key] for key in extra]
+
+    @app.teardown_appcontext
+    def close_shard_sessions(exc):
+        for session in g.pop("shard_sessions", ()):
+            session.close()
@@ -0,0 +1,107 @@
+"""Gemeinsame Fixtures: App mit frischer SQLite-Datenbank je Test, optional mit Shards.
+
+    python -m pytest -q
+"""
+import os
+import sys
+from collections import OrderedDict
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def make_app(tmp_path, shards: int = 0, **config):
+    """``create_app()`` auf SQLite-Dateien in ``tmp_path``; Schema auf jedem Shard per ``create_all``."""
+    from app import create_app
+    from models import db
+    from sharding import shard_engines
+
+    app = create_app({
+        "TESTING": True,
+        "SECRET_KEY": "test",
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'crm.db'}",
+        "SQLALCHEMY_BINDS": {f"shard_{i}": f"sqlite:///{tmp_path / f'shard{i}.db'}" for i in range(1, shards + 1)},
+        "WTF_CSRF_ENABLED": False,
+        "LOGIN_HASH_WORKERS": 0,
+        "COMPRESS_ENABLED": False,
+        "METRICS_DIR": "",
+        **config,
+    })
+    with app.app_context():
+        for engine in shard_engines():
+            db.metadata.create_all(engine)
+    return app
+
+
+def _close(app):
+    from audit import writer
+    from models import db
+
+    writer.flush()  # nicht erst per atexit in die dann gelöschte Datenbank
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def _module_caches(monkeypatch):
+    """Prozessweite Caches gehören zur Datenbank des vorigen Tests – je Test leer beginnen."""
+    import bulk_orders
+    import fx
+
+    monkeypatch.setattr(bulk_orders, "_prices", None)
+    monkeypatch.setattr(fx, "_rates", OrderedDict())
+    monkeypatch.setattr(fx, "_rates_version", None)
+    monkeypatch.setattr(fx, "_rates_checked_at", 0.0)
+    monkeypatch.setattr(fx, "_rate_stats", {"hit": 0, "miss": 0})
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = make_app(tmp_path)
+    yield app
+    _close(app)
+
+
+@pytest.fixture
+def app_factory(tmp_path):
+    """``app_factory(**config)``: App mit eigener Konfiguration, z. B. kleinen Login-Buckets."""
+    apps = []
+
+    def factory(shards: int = 0, **config):
+        apps.append(make_app(tmp_path, shards, **config))
+        return apps[-1]
+
+    yield factory
+    for app in apps:
+        _close(app)
+
+
+@pytest.fixture
+def sharded_app(tmp_path):
+    """Drei Shards: ``DATABASE_URL`` plus ``shard_1`` und ``shard_2``."""
+    app = make_app(tmp_path, shards=2)
+    yield app
+    _close(app)
+
+
+@pytest.fixture
+def user(app):
+    from models import db, User
+
+    with app.app_context():
+        user = User(username="test@firma.com", password_hash="x")
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+@pytest.fixture
+def auth_client(app, user):
+    """Test-Client mit angemeldetem Benutzer (ohne Passwort und 2FA)."""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user)
+        session["_fresh"] = True
+    return client
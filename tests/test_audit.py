@@ -0,0 +1,87 @@
+"""Gepufferter Audit-Writer: fehlgeschlagene Batches bleiben im Puffer, fehlerhafte Zeilen fliegen raus (``audit.py``)."""
+import logging
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from audit import writer
+from models import db, AuditLog, Customer
+
+
+@pytest.fixture
+def audited_app(app_factory):
+    app = app_factory(AUDIT_BATCH_SIZE=2, AUDIT_FLUSH_INTERVAL=3600)
+    with app.app_context():
+        writer.flush()
+    return app
+
+
+def test_failed_batch_stays_buffered_in_order(audited_app, caplog):
+    with audited_app.app_context():
+        AuditLog.__table__.drop(db.engine)
+        # der volle Puffer weckt auch den Hintergrund-Thread – dessen Versuch scheitert genauso
+        db.session.add_all([Customer(company=f"Firma {i}") for i in range(5)])
+        db.session.commit()
+
+        with pytest.raises(Exception):
+            writer.flush()
+        with writer._lock:
+            assert [row["entity_id"] for row in writer._buffer] == [1, 2, 3, 4, 5]
+
+        with caplog.at_level(logging.WARNING):
+            writer._flush_logged()
+        assert "5 Zeilen bleiben gepuffert" in caplog.text
+
+        AuditLog.__table__.create(db.engine)
+        writer.flush()
+        assert not writer._buffer
+        logged = db.session.execute(select(AuditLog.entity_id, AuditLog.action).order_by(AuditLog.id)).all()
+        assert logged == [(i, "insert") for i in range(1, 6)]
+
+
+def _row(entity_id, entity="customer"):
+    return {"entity": entity, "entity_id": entity_id, "customer_id": entity_id, "action": "insert",
+            "changes": "{}", "user_id": None, "created_at": datetime(2026, 10, 1)}
+
+
+def test_permanently_bad_row_is_dropped_after_max_retries(app_factory, caplog):
+    app = app_factory(AUDIT_BATCH_SIZE=4, AUDIT_FLUSH_INTERVAL=3600, AUDIT_MAX_RETRIES=2)
+    with app.app_context():
+        writer.flush()
+        writer.enqueue([_row(1), _row(2, entity=None), _row(3)])  # entity ist NOT NULL
+
+        for _ in range(2):
+            with pytest.raises(Exception):
+                writer.flush()
+        with caplog.at_level(logging.ERROR):
+            writer.flush()
+
+        assert not writer._buffer
+        assert db.session.scalars(select(AuditLog.entity_id).order_by(AuditLog.id)).all() == [1, 3]
+        assert "Audit-Zeile verworfen" in caplog.text and '"entity_id": 2' in caplog.text
+
+        writer.enqueue([_row(4)])
+        writer.flush()
+        assert db.session.scalars(select(AuditLog.entity_id).order_by(AuditLog.id)).all() == [1, 3, 4]
+
+
+def test_buffer_keeps_only_the_newest_rows(app_factory, caplog):
+    app = app_factory(AUDIT_BATCH_SIZE=100, AUDIT_FLUSH_INTERVAL=3600, AUDIT_MAX_BUFFER=3)
+    with app.app_context():
+        writer.flush()
+        with caplog.at_level(logging.ERROR):
+            writer.enqueue([_row(i) for i in range(1, 6)])
+        assert [row["entity_id"] for row in writer._buffer] == [3, 4, 5]
+        assert "2 älteste Zeilen verworfen" in caplog.text
+
+
+def test_atexit_hook_is_registered_once(app_factory, monkeypatch):
+    import atexit
+
+    registered = []
+    monkeypatch.setattr(writer, "_atexit_registered", False)
+    monkeypatch.setattr(atexit, "register", registered.append)
+    app_factory()
+    app_factory()
+    assert registered == [writer._flush_logged]
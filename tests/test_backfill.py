@@ -0,0 +1,110 @@
+"""Online-Backfills: Chunks mit Checkpoint in ``backfill_progress``, Fortsetzen nach Abbruch."""
+import time
+from types import SimpleNamespace
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy import func, select
+
+import backfill
+from backfill import Backfill, run_backfill
+from models import db, BackfillProgress, Customer
+
+NAME = "test_company_upper"
+
+
+@pytest.fixture
+def job(monkeypatch):
+    table = sa.table("customers", sa.column("id"), sa.column("company"))
+    job = Backfill(NAME, table, values={"company": func.upper(table.c.company)},
+                   where=(table.c.company != func.upper(table.c.company),), pk="id", description="Test")
+    monkeypatch.setitem(backfill.BACKFILLS, NAME, job)
+    return job
+
+
+@pytest.fixture
+def customers(app):
+    with app.app_context():
+        db.session.add_all([Customer(id=i, company=f"firma {i}") for i in range(1, 11)])
+        db.session.add(Customer(id=11, company="SCHON GROSS"))
+        db.session.commit()
+
+
+def _interrupt_after(monkeypatch, chunks):
+    """Bricht den Lauf in der Pause nach ``chunks`` Chunks ab (wie Strg+C)."""
+    calls = []
+
+    def sleep(seconds):
+        calls.append(seconds)
+        if len(calls) == chunks:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(backfill, "time", SimpleNamespace(monotonic=time.monotonic, sleep=sleep))
+
+
+def _progress():
+    db.session.expire_all()
+    return db.session.get(BackfillProgress, NAME)
+
+
+def _companies():
+    return dict(db.session.execute(select(Customer.id, Customer.company).execution_options(populate_existing=True)).all())
+
+
+def test_interrupted_run_resumes_at_checkpoint(app, job, customers, monkeypatch):
+    with app.app_context():
+        _interrupt_after(monkeypatch, chunks=2)
+        with pytest.raises(KeyboardInterrupt):
+            run_backfill(NAME, db.engine, batch_size=3, pause=0.01, max_rate=0)
+
+        progress = _progress()
+        assert (progress.last_id, progress.max_id, progress.rows_scanned) == (6, 11, 6)
+        assert progress.finished_at is None
+        companies = _companies()
+        assert [companies[i] for i in (1, 6, 7)] == ["FIRMA 1", "FIRMA 6", "firma 7"]
+
+        monkeypatch.setattr(backfill, "time", time)
+        result = run_backfill(NAME, db.engine, batch_size=3, pause=0, max_rate=0)
+
+        assert (result["rows"], result["updated"]) == (5, 4)  # nur der Rest; "SCHON GROSS" bleibt
+        progress = _progress()
+        assert (progress.last_id, progress.rows_scanned, progress.rows_updated) == (11, 11, 10)
+        assert progress.finished_at is not None
+        assert all(company == company.upper() for company in _companies().values())
+
+
+def test_rows_newer_than_the_start_are_left_to_the_app(app, job, customers, monkeypatch):
+    with app.app_context():
+        _interrupt_after(monkeypatch, chunks=1)
+        with pytest.raises(KeyboardInterrupt):
+            run_backfill(NAME, db.engine, batch_size=4, pause=0.01, max_rate=0)
+        db.session.add(Customer(id=12, company="neu nach dem start"))
+        db.session.commit()
+
+        monkeypatch.setattr(backfill, "time", time)
+        run_backfill(NAME, db.engine, batch_size=4, pause=0, max_rate=0)
+
+        assert _companies()[12] == "neu nach dem start"
+        assert _progress().max_id == 11
+
+
+def test_finished_backfill_runs_again_only_with_restart(app, job, customers):
+    with app.app_context():
+        run_backfill(NAME, db.engine, batch_size=5, pause=0, max_rate=0)
+        db.session.add(Customer(id=12, company="neu"))
+        db.session.commit()
+
+        assert run_backfill(NAME, db.engine, batch_size=5, pause=0, max_rate=0)["rows"] == 0
+        assert _companies()[12] == "neu"
+
+        result = run_backfill(NAME, db.engine, batch_size=5, pause=0, max_rate=0, restart=True)
+        assert (result["rows"], result["updated"]) == (12, 1)
+        assert _companies()[12] == "NEU"
+        assert _progress().max_id == 12
+
+
+def test_empty_table_is_finished_immediately(app, job, capsys):
+    with app.app_context():
+        assert run_backfill(NAME, db.engine, batch_size=5, pause=0, max_rate=0)["rows"] == 0
+        assert _progress().finished_at is not None
+        assert "ist leer" in capsys.readouterr().out
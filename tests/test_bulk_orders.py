@@ -0,0 +1,162 @@
+"""``POST /api/orders/bulk`` / ``import_orders()``: Prüfung des ganzen Stapels, alles oder nichts."""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+import bulk_orders
+from bulk_orders import BulkOrderError, import_orders
+from models import db, Customer, CustomerShard, FxRate, Order, OrderItem, Product
+from sharding import on_shard, shard_engines
+
+
+def _populate():
+    db.session.add_all([
+        Product(id=1, sku="P-100", name="Schraube", unit_price_cents=199),
+        Product(id=2, sku="P-200", name="Mutter", unit_price_cents=1250),
+        Customer(id=1, company="Müller GmbH"),
+        Customer(id=2, company="Schmidt KG"),
+        FxRate(currency="USD", rate_date=date(2026, 10, 1), rate=Decimal("1.1")),
+    ])
+    db.session.add(Order(customer_id=2, order_number="B-ALT", status="offen"))
+    db.session.commit()
+
+
+@pytest.fixture
+def shop(app):
+    with app.app_context():
+        _populate()
+
+
+def order(number, customer_id=1, items=(("P-100", 2),), **fields):
+    return {"customer_id": customer_id, "order_number": number, "order_date": "2026-10-02T09:30:00",
+            "items": [{"sku": sku, "quantity": quantity} for sku, quantity in items], **fields}
+
+
+def _order_count():
+    count = 0
+    for engine in shard_engines():
+        with engine.connect() as conn:
+            count += conn.scalar(select(func.count()).select_from(Order.__table__))
+    return count
+
+
+def test_api_stores_batch_with_server_side_totals(app, shop, auth_client):
+    response = auth_client.post("/api/orders/bulk", json={"orders": [
+        order("B-1", items=[("P-100", 2), ("P-200", 1)]),
+        order("B-2", customer_id=2, currency="usd", status="bezahlt"),
+    ]})
+
+    assert response.status_code == 201
+    created = response.get_json()["orders"]
+    assert [o["order_number"] for o in created] == ["B-1", "B-2"]
+    assert created[0]["total_amount"] == "16.48"
+    with app.app_context():
+        first = db.session.get(Order, created[0]["id"])
+        assert first.total_amount_cents == 2 * 199 + 1250
+        assert sorted((i.product_id, i.quantity, i.unit_price_cents) for i in first.items) == [(1, 2, 199), (2, 1, 1250)]
+        second = db.session.get(Order, created[1]["id"])
+        assert (second.currency, second.status, second.total_amount_cents) == ("USD", "bezahlt", 2 * 219)
+
+
+def test_all_errors_are_reported_and_nothing_is_stored(app, shop):
+    with app.app_context():
+        db.session.get(Customer, 2).deleted_at = db.func.now()
+        db.session.commit()
+        before = _order_count()
+        with pytest.raises(BulkOrderError) as excinfo:
+            import_orders([
+                order("B-1"),
+                order("B-2", items=[("P-999", 1)]),
+                order("B-3", items=[("P-100", 0)]),
+                order("B-1"),
+                order("B-4", customer_id=2),
+                order("B-5", customer_id=3),
+                order("B-ALT"),
+                order("B-6", order_date="2026-10-02T09:30:00+02:00"),
+                order("B-7", currency="JPY"),
+                order("B-8", status="verschickt"),
+                order("B-9", items=[]),
+                "keine Bestellung",
+            ])
+        assert _order_count() == before
+
+    errors = {error["index"]: error["error"] for error in excinfo.value.errors}
+    assert 0 not in errors
+    assert errors == {
+        1: "unbekannte SKU P-999",
+        2: "Menge für P-100 muss eine ganze Zahl ≥ 1 sein",
+        3: "Bestellnummer B-1 doppelt im Stapel",
+        4: "Kunde 2 nicht gefunden",
+        5: "Kunde 3 nicht gefunden",
+        6: "Bestellnummer B-ALT existiert bereits",
+        7: "order_date ohne Zeitzone angeben (UTC)",
+        8: "kein Wechselkurs JPY am 2026-10-02",
+        9: "status muss einer von offen, bezahlt, storniert sein",
+        10: "items fehlt oder ist leer",
+        11: "Bestellung muss ein Objekt sein",
+    }
+
+
+def test_api_rejects_bad_requests(app, shop, auth_client):
+    app.config["BULK_ORDERS_MAX"] = 2
+    assert auth_client.post("/api/orders/bulk", data="orders=1").status_code == 415
+    assert auth_client.post("/api/orders/bulk", json={"orders": []}).status_code == 400
+    assert auth_client.post("/api/orders/bulk", json={"orders": [order("B-1")] * 3}).status_code == 413
+
+    response = auth_client.post("/api/orders/bulk", json={"orders": [order("B-1", items=[("P-999", 1)])]})
+    assert response.status_code == 422
+    assert response.get_json()["errors"] == [{"index": 0, "error": "unbekannte SKU P-999"}]
+
+
+def test_api_requires_login(app, shop):
+    response = app.test_client().post("/api/orders/bulk", json={"orders": [order("B-1")]})
+    assert response.status_code in (302, 401)
+
+
+def test_new_product_is_found_without_waiting_for_the_price_cache(app, shop):
+    with app.app_context():
+        import_orders([order("B-1")])
+        db.session.add(Product(id=3, sku="P-300", name="Neu", unit_price_cents=500))
+        db.session.commit()
+        [created] = import_orders([order("B-2", items=[("P-300", 1)])])
+        assert db.session.get(Order, created["id"]).total_amount_cents == 500
+
+
+def test_insert_failure_rolls_back_the_whole_batch(app, shop, monkeypatch):
+    """Bestellnummer zwischen Prüfung und Insert vergeben: nichts vom Stapel bleibt stehen."""
+    monkeypatch.setattr(bulk_orders, "_existing_numbers", lambda numbers: set())
+    with app.app_context():
+        before = _order_count()
+        with pytest.raises(BulkOrderError) as excinfo:
+            import_orders([order("B-1"), order("B-ALT")])
+
+        assert excinfo.value.errors[0]["index"] is None
+        assert _order_count() == before
+        assert db.session.scalar(select(func.count()).select_from(OrderItem)) == 0
+
+
+def test_insert_failure_on_one_shard_rolls_back_all_shards(sharded_app, monkeypatch):
+    monkeypatch.setattr(bulk_orders, "_existing_numbers", lambda numbers: set())
+    with sharded_app.test_request_context():
+        for engine in shard_engines()[1:]:
+            with engine.begin() as conn:
+                conn.execute(Product.__table__.insert(), [
+                    {"id": 1, "sku": "P-100", "name": "Schraube", "unit_price_cents": 199},
+                ])
+        db.session.add(Product(id=1, sku="P-100", name="Schraube", unit_price_cents=199))
+        db.session.add_all([CustomerShard(customer_id=1, shard=1), CustomerShard(customer_id=2, shard=2)])
+        db.session.commit()
+        for shard, customer_id in ((1, 1), (2, 2)):
+            with on_shard(shard):
+                db.session.add(Customer(id=customer_id, company=f"Firma {customer_id}"))
+                db.session.commit()
+        with on_shard(2):
+            db.session.add(Order(customer_id=2, order_number="B-ALT", status="offen"))
+            db.session.commit()
+
+        with pytest.raises(BulkOrderError):
+            import_orders([order("B-1", customer_id=1), order("B-ALT", customer_id=2)])
+
+        assert _order_count() == 1
@@ -0,0 +1,120 @@
+"""Löschen von Kunden: eine Transaktion oder fortsetzbar mit Commit pro Chunk (``deletion.py``)."""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+
+import deletion
+from deletion import delete_customers, delete_customers_chunked, dependent_row_count, pending_deletions, resume_deletions
+from models import (
+    db, ArchivedContact, ArchivedOrder, ArchivedOrderItem, BackfillProgress, Customer, Contact, Order, OrderItem,
+    Product,
+)
+
+CHILD_MODELS = (Order, OrderItem, Contact, ArchivedOrder, ArchivedOrderItem, ArchivedContact)
+
+
+@pytest.fixture
+def customers(app):
+    """Kunde 1 mit Live- und Archivdaten, Kunde 2 als Nachbar, der stehen bleiben muss."""
+    then = datetime(2020, 1, 1)
+    with app.app_context():
+        db.session.add(Product(id=1, sku="P-1", name="Produkt", unit_price_cents=100))
+        for customer_id in (1, 2):
+            db.session.add(Customer(id=customer_id, company=f"Firma {customer_id}"))
+            for i in range(4):
+                order = Order(customer_id=customer_id, order_number=f"B-{customer_id}-{i}", status="offen")
+                db.session.add(order)
+                db.session.flush()
+                db.session.add(OrderItem(order_id=order.id, product_id=1, quantity=1, unit_price_cents=100))
+                db.session.add(Contact(customer_id=customer_id, channel="phone", subject="Anruf"))
+                archived_id = customer_id * 100 + i
+                db.session.add(ArchivedOrder(id=archived_id, customer_id=customer_id, order_number=f"A-{archived_id}",
+                                             order_date=then, status="bezahlt", total_amount_cents=100,
+                                             currency="EUR", created_at=then, archived_at=then))
+                db.session.add(ArchivedOrderItem(id=archived_id, order_id=archived_id, product_id=1, quantity=1,
+                                                 unit_price_cents=100))
+                db.session.add(ArchivedContact(id=archived_id, customer_id=customer_id, channel="mail", subject="Alt",
+                                               contact_at=then, created_at=then, archived_at=then))
+        db.session.commit()
+
+
+def _rows(customer_id):
+    """Verbliebene Zeilen je Tabelle für einen Kunden."""
+    counts = {}
+    for model in CHILD_MODELS:
+        if model in (OrderItem, ArchivedOrderItem):
+            parent = Order if model is OrderItem else ArchivedOrder
+            stmt = select(func.count()).select_from(model).join(parent, model.order_id == parent.id)
+            stmt = stmt.where(parent.customer_id == customer_id)
+        else:
+            stmt = select(func.count()).select_from(model).where(model.customer_id == customer_id)
+        counts[model.__tablename__] = db.session.scalar(stmt)
+    return counts
+
+
+def test_dependent_row_count_includes_archive(app, customers):
+    with app.app_context():
+        assert dependent_row_count(1) == 4 + 4 + 4 + 4
+
+
+@pytest.mark.parametrize("delete", [delete_customers, delete_customers_chunked])
+def test_deletes_live_and_archived_rows(app, customers, delete, capsys):
+    with app.app_context():
+        assert delete([1], chunk_size=3) == 1
+        assert capsys.readouterr().out == ""  # Ausgabe nur über die CLI
+        assert set(_rows(1).values()) == {0}
+        assert db.session.get(Customer, 1) is None
+        assert set(_rows(2).values()) == {4}
+
+
+def test_interrupted_chunked_delete_is_resumed(app, customers, monkeypatch):
+    update_job = deletion._update_job
+    calls = []
+
+    def fail_on_third_chunk(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 3:
+            raise RuntimeError("Verbindung verloren")
+        update_job(*args, **kwargs)
+
+    with app.app_context():
+        monkeypatch.setattr(deletion, "_update_job", fail_on_third_chunk)
+        with pytest.raises(RuntimeError):
+            delete_customers_chunked([1], chunk_size=2)
+
+        # zwei Chunks committet, Kunde und Auftrag stehen noch
+        assert pending_deletions() == [1]
+        assert db.session.get(Customer, 1) is not None
+        remaining = sum(_rows(1).values())
+        assert 0 < remaining < 24
+        job = db.session.get(BackfillProgress, "delete_customer:1")
+        assert job.finished_at is None and job.rows_updated == 4 * 2
+
+        monkeypatch.setattr(deletion, "_update_job", update_job)
+        assert resume_deletions(chunk_size=2) == 1
+        assert pending_deletions() == []
+        assert db.session.get(Customer, 1) is None
+        assert set(_rows(1).values()) == {0}
+        db.session.expire_all()
+        job = db.session.get(BackfillProgress, "delete_customer:1")
+        assert job.finished_at is not None and job.rows_updated == 24
+        assert set(_rows(2).values()) == {4}
+
+
+def test_cli_resume(app, customers, monkeypatch):
+    def fail(customer_ids):
+        raise RuntimeError("Verbindung verloren")
+
+    with app.app_context(), monkeypatch.context() as patch:
+        patch.setattr(deletion, "_delete_customer_rows", fail)
+        with pytest.raises(RuntimeError):
+            delete_customers_chunked([1])
+
+    result = app.test_cli_runner().invoke(args=["delete-customers", "--resume"])
+    assert result.exit_code == 0, result.output
+    assert "[INFO] Kunde 1 gelöscht (0 abhängige Zeilen)" in result.output  # schon vor dem Abbruch entfernt
+    assert "1 Kunden gelöscht" in result.output
+    with app.app_context():
+        assert pending_deletions() == []
+        assert db.session.get(Customer, 1) is None
@@ -0,0 +1,92 @@
+"""``fx.get_rate()``: Cache je Prozess ohne fehlende Kurse, ungültig nach ``bump(FX)``."""
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from sqlalchemy import update
+
+import fx
+from http_cache import FX, bump
+from models import db, FxRate
+
+DAY = date(2026, 10, 2)
+
+
+def test_missing_rate_is_not_cached(app):
+    app.config["FX_CACHE_CHECK_SECONDS"] = 3600
+    with app.app_context():
+        assert fx.get_rate("USD", DAY) is None
+        db.session.add(FxRate(currency="USD", rate_date=date(2026, 10, 1), rate=Decimal("1.1")))
+        db.session.commit()
+
+        assert fx.get_rate("USD", DAY) == Decimal("1.1")
+        assert fx.get_rate("USD", DAY) == Decimal("1.1")
+        assert fx.rate_cache_stats() == {"hit": 1, "miss": 2}
+
+
+def test_bump_from_another_process_invalidates_the_cache(app):
+    app.config["FX_CACHE_CHECK_SECONDS"] = 0
+    with app.app_context():
+        db.session.add(FxRate(currency="USD", rate_date=DAY, rate=Decimal("1.1")))
+        db.session.commit()
+        assert fx.get_rate("USD", DAY) == Decimal("1.1")
+
+        # wie "flask fx-load" in einem anderen Prozess: Kurs ändern, Zähler erhöhen – ohne _rates.clear()
+        with db.engine.begin() as conn:
+            conn.execute(update(FxRate.__table__).values(rate=Decimal("1.2")))
+        assert fx.get_rate("USD", DAY) == Decimal("1.1")
+        bump(FX)
+        assert fx.get_rate("USD", DAY) == Decimal("1.2")
+
+
+def test_base_currency_needs_no_lookup(app):
+    with app.app_context():
+        assert fx.get_rate("EUR", DAY) == 1
+        assert fx.rate_cache_stats() == {"hit": 0, "miss": 0}
+
+
+def test_order_revenue_uses_the_same_rate_as_convert_cents(app):
+    """Bestellung nach dem letzten geladenen Kurs: SQL und ``convert_cents`` nehmen denselben Vortageskurs."""
+    from models import Customer, Order
+
+    with app.app_context():
+        db.session.add_all([
+            FxRate(currency="USD", rate_date=date(2026, 9, 30), rate=Decimal("1.05")),
+            FxRate(currency="USD", rate_date=DAY, rate=Decimal("1.1")),
+            FxRate(currency="CHF", rate_date=DAY, rate=Decimal("0.9")),
+            Customer(id=1, company="Müller GmbH"),
+        ])
+        orders = [  # (Betrag, Währung, Tag) – zwei davon nach dem letzten Kurs, einer genau am Kurstag
+            (10000, "USD", date(2026, 10, 20)),
+            (5000, "EUR", date(2026, 10, 25)),
+            (2000, "USD", DAY),
+        ]
+        for i, (cents, currency, day) in enumerate(orders):
+            db.session.add(Order(customer_id=1, order_number=f"B-{i}", status="offen", currency=currency,
+                                 total_amount_cents=cents, order_date=datetime.combine(day, time(9, 30))))
+        db.session.add(Order(customer_id=1, order_number="B-alt", status="offen", currency="USD",
+                             total_amount_cents=999, order_date=datetime(2026, 9, 1, 9, 30)))
+        db.session.commit()
+
+        revenue, missing = fx.order_revenue(1, "CHF")
+
+        expected = sum(fx.convert_cents(cents, currency, "CHF", day) for cents, currency, day in orders)
+        assert fx.convert_cents(999, "USD", "CHF", date(2026, 9, 1)) is None
+        assert missing == 1
+        assert abs(revenue.cents - expected) <= len(orders)  # SQL rundet erst die Summe
+
+
+def test_full_cache_evicts_the_least_recently_used_rate(app, monkeypatch):
+    monkeypatch.setattr(fx, "RATE_CACHE_SIZE", 2)
+    app.config["FX_CACHE_CHECK_SECONDS"] = 3600
+    with app.app_context():
+        db.session.add(FxRate(currency="USD", rate_date=date(2026, 10, 1), rate=Decimal("1.1")))
+        db.session.commit()
+        first, second, third = (date(2026, 10, d) for d in (1, 2, 3))
+
+        fx.get_rate("USD", first)
+        fx.get_rate("USD", second)
+        fx.get_rate("USD", first)  # Treffer: "first" ist jetzt der jüngste Eintrag
+        fx.get_rate("USD", third)
+
+        assert list(fx._rates) == [("USD", first), ("USD", third)]
+        assert fx.rate_cache_stats() == {"hit": 1, "miss": 3}
@@ -0,0 +1,86 @@
+"""``@conditional``: 304 solange sich nichts ändert, 200 nach jedem Commit (``http_cache.py``)."""
+import pytest
+
+from models import db, Customer
+
+
+@pytest.fixture
+def customer(app):
+    with app.app_context():
+        customer = Customer(company="Müller GmbH")
+        db.session.add(customer)
+        db.session.commit()
+        return customer.id
+
+
+def _rename(app, customer_id, company, commit=True):
+    with app.app_context():
+        db.session.get(Customer, customer_id).company = company
+        if commit:
+            db.session.commit()
+        else:
+            db.session.flush()
+            db.session.rollback()
+
+
+@pytest.mark.parametrize("path", ["/customers", "/customers/{id}"])
+def test_unchanged_page_answers_304(auth_client, customer, path):
+    path = path.format(id=customer)
+    first = auth_client.get(path)
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    second = auth_client.get(path, headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 304
+    assert second.data == b""
+    assert second.headers["ETag"] == first.headers["ETag"]
+
+
+@pytest.mark.parametrize("path", ["/customers", "/customers/{id}"])
+def test_commit_changes_etag(app, auth_client, customer, path):
+    path = path.format(id=customer)
+    etag = auth_client.get(path).headers["ETag"]
+
+    _rename(app, customer, "Müller AG")
+
+    response = auth_client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert "Müller AG" in response.text
+
+
+def test_rollback_keeps_etag(app, auth_client, customer):
+    etag = auth_client.get("/customers").headers["ETag"]
+
+    _rename(app, customer, "Verworfen", commit=False)
+
+    assert auth_client.get("/customers", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_other_customer_keeps_detail_etag(app, auth_client, customer):
+    with app.app_context():
+        other = Customer(company="Schmidt KG")
+        db.session.add(other)
+        db.session.commit()
+        other_id = other.id
+    etag = auth_client.get(f"/customers/{customer}").headers["ETag"]
+
+    _rename(app, other_id, "Schmidt & Söhne KG")
+
+    assert auth_client.get(f"/customers/{customer}", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_pending_flash_is_never_answered_from_cache(auth_client, customer):
+    etag = auth_client.get("/customers").headers["ETag"]
+    with auth_client.session_transaction() as session:
+        session["_flashes"] = [("success", "Kunde gespeichert.")]
+
+    response = auth_client.get("/customers", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert "Kunde gespeichert." in response.text
+
+
+def test_missing_customer_is_404_without_etag(auth_client):
+    response = auth_client.get("/customers/999")
+    assert response.status_code == 404
+    assert "ETag" not in response.headers
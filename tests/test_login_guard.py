@@ -0,0 +1,103 @@
+"""Login-Drosselung: Token-Buckets je IP und Benutzer, 429 mit ``Retry-After`` (``login_guard.py``)."""
+from types import SimpleNamespace
+
+import pytest
+
+import login_guard
+from login_guard import throttle
+
+LIMITS = {"LOGIN_IP_BURST": 3, "LOGIN_IP_PER_MINUTE": 6, "LOGIN_USER_BURST": 2, "LOGIN_USER_PER_MINUTE": 2}
+
+
+@pytest.fixture(params=["memory", "database"])
+def guarded_app(request, app_factory, monkeypatch):
+    """App mit kleinen Buckets; die Uhr der Speicher-Buckets steht, bis der Test ``clock.now`` weiterstellt."""
+    clock = SimpleNamespace(now=1000.0)
+    clock.monotonic = lambda: clock.now
+    monkeypatch.setattr(login_guard, "time", clock)
+    app = app_factory(LOGIN_THROTTLE_STORAGE=request.param, **LIMITS)
+    app.clock = clock
+    return app
+
+
+def seconds(value):
+    """``Retry-After`` in ganzen Sekunden – die Datenbank-Buckets sehen die echte Uhr weiterlaufen."""
+    return pytest.approx(value, abs=1)
+
+
+def test_ip_bucket_allows_burst_then_waits(guarded_app):
+    with guarded_app.app_context():
+        assert [throttle("203.0.113.7") for _ in range(3)] == [0, 0, 0]
+        assert throttle("203.0.113.7") == seconds(11)  # 6 pro Minute: nächstes Token in 10 s
+        assert throttle("198.51.100.1") == 0  # andere IP, eigener Bucket
+
+
+def test_user_bucket_is_case_insensitive(guarded_app):
+    with guarded_app.app_context():
+        assert throttle("203.0.113.7", "Chef@Firma.com") == 0
+        assert throttle("198.51.100.1", " chef@firma.com") == 0
+        assert throttle("192.0.2.5", "CHEF@FIRMA.COM") == seconds(31)  # 2 pro Minute
+        assert throttle("192.0.2.5", "andere@firma.com") == 0
+
+
+def test_empty_ip_bucket_leaves_user_bucket_alone(guarded_app):
+    with guarded_app.app_context():
+        for _ in range(3):
+            throttle("203.0.113.7")
+        for _ in range(5):
+            assert throttle("203.0.113.7", "chef@firma.com") > 0
+        assert throttle("198.51.100.1", "chef@firma.com") == 0
+        assert throttle("198.51.100.1", "chef@firma.com") == 0
+
+
+def test_bucket_refills_over_time(guarded_app):
+    if guarded_app.config["LOGIN_THROTTLE_STORAGE"] == "database":
+        pytest.skip("Datenbank-Buckets rechnen mit datetime.utcnow()")
+    with guarded_app.app_context():
+        for _ in range(3):
+            throttle("203.0.113.7")
+        guarded_app.clock.now += 10
+        assert throttle("203.0.113.7") == 0
+        assert throttle("203.0.113.7") == 11
+        guarded_app.clock.now += 3600
+        assert [throttle("203.0.113.7") for _ in range(4)] == [0, 0, 0, 11]
+
+
+def _login(client, ip, forwarded_for=None, username="chef@firma.com"):
+    headers = {"X-Forwarded-For": forwarded_for} if forwarded_for else {}
+    return client.post("/login", data={"username": username, "password": "falsch!"},
+                       headers=headers, environ_base={"REMOTE_ADDR": ip})
+
+
+def test_login_answers_429_with_retry_after(guarded_app):
+    client = guarded_app.test_client()
+    statuses = [_login(client, "203.0.113.7", username=f"u{i}@firma.com").status_code for i in range(4)]
+
+    assert statuses == [200, 200, 200, 429]
+    response = _login(client, "203.0.113.7")
+    assert int(response.headers["Retry-After"]) == seconds(11)
+    assert "Zu viele Versuche" in response.text
+
+
+def test_without_trusted_proxies_forwarded_for_is_ignored(guarded_app):
+    client = guarded_app.test_client()
+    statuses = [
+        _login(client, "10.0.0.1", f"198.51.100.{i}", username=f"u{i}@firma.com").status_code for i in range(4)
+    ]
+    assert statuses[-1] == 429
+
+
+def test_behind_trusted_proxy_each_client_has_its_own_bucket(app_factory):
+    app = app_factory(TRUSTED_PROXIES=1, **LIMITS)
+    client = app.test_client()
+    # gleiche Proxy-IP, verschiedene Clients: keiner wird gedrosselt
+    statuses = [
+        _login(client, "10.0.0.1", f"198.51.100.{i}", username=f"u{i}@firma.com").status_code for i in range(6)
+    ]
+    assert statuses == [200] * 6
+    # ein Client, der selbst X-Forwarded-For setzt, kommt damit nicht am Bucket vorbei
+    spoofed = [
+        _login(client, "10.0.0.1", f"6.6.6.{i}, 203.0.113.7", username=f"v{i}@firma.com").status_code
+        for i in range(4)
+    ]
+    assert spoofed == [200, 200, 200, 429]
@@ -0,0 +1,49 @@
+"""``/metrics``: ohne Token nur für localhost, mit Token nur per Bearer (``metrics.py``)."""
+import pytest
+
+REQUESTS = {
+    "localhost": {"environ_base": {"REMOTE_ADDR": "127.0.0.1"}},
+    "remote": {"environ_base": {"REMOTE_ADDR": "203.0.113.7"}},
+    "proxied": {"environ_base": {"REMOTE_ADDR": "127.0.0.1"}, "headers": {"X-Forwarded-For": "203.0.113.7"}},
+    "bearer": {"environ_base": {"REMOTE_ADDR": "203.0.113.7"}, "headers": {"Authorization": "Bearer geheim"}},
+}
+
+
+@pytest.mark.parametrize("config, allowed", [
+    ({}, {"localhost"}),
+    ({"METRICS_PUBLIC": True}, {"localhost", "remote", "proxied", "bearer"}),
+    ({"METRICS_TOKEN": "geheim"}, {"bearer"}),
+    ({"METRICS_TOKEN": "geheim", "METRICS_PUBLIC": True}, {"bearer"}),
+])
+def test_access(app_factory, config, allowed):
+    client = app_factory(**config).test_client()
+    for name, kwargs in REQUESTS.items():
+        response = client.get("/metrics", **kwargs)
+        assert response.status_code == (200 if name in allowed else 401), name
+        if name in allowed:
+            assert "# TYPE crm_fx_rate_cache_total counter" in response.text
+
+
+def test_wrong_token_is_rejected(app_factory):
+    client = app_factory(METRICS_TOKEN="geheim").test_client()
+    response = client.get("/metrics", headers={"Authorization": "Bearer falsch"})
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+
+
+def test_each_app_reports_its_own_pools_and_directory(app_factory, tmp_path):
+    """Pools und ``METRICS_DIR`` gehören der App, die gerade ausliest – nicht der zuerst bzw. zuletzt erstellten."""
+    import os
+
+    import metrics
+
+    first = app_factory(METRICS_DIR=str(tmp_path / "metrics"), METRICS_FLUSH_SECONDS=3600)
+    second = app_factory(SQLALCHEMY_BINDS={"replica_1": f"sqlite:///{tmp_path / 'replica.db'}"})
+
+    local = {"environ_base": {"REMOTE_ADDR": "127.0.0.1"}}
+    assert 'bind="replica_1"' in second.test_client().get("/metrics", **local).text
+    assert 'bind="replica_1"' not in first.test_client().get("/metrics", **local).text
+
+    with first.app_context():
+        metrics.flush()
+    assert os.listdir(tmp_path / "metrics") == [f"{os.getpid()}.json"]
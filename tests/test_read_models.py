@@ -0,0 +1,104 @@
+"""``customer_timeline()``: Keyset-Pagination über Bestellungen und Kontakte (Zeitpunkt, Art, ID)."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import db, Customer, Contact, Order, OrderItem, Product, User
+from read_models import customer_timeline
+
+NOW = datetime(2026, 10, 19, 12, 0)
+
+
+@pytest.fixture
+def timeline(app):
+    """Kunde 1 mit Bestellungen und Kontakten, darunter gleiche Zeitpunkte über beide Arten hinweg.
+
+    Gibt die erwartete Reihenfolge ``[(Zeitpunkt, Art, ID)]`` zurück, neueste zuerst.
+    """
+    with app.app_context():
+        db.session.add(User(id=1, username="test@firma.com", password_hash="x"))
+        db.session.add(Product(id=1, sku="P-1", name="Produkt", unit_price_cents=250))
+        db.session.add_all([Customer(id=1, company="Müller GmbH"), Customer(id=2, company="Rauschen AG")])
+        expected = []
+        # je drei Ereignisse pro Zeitpunkt, die letzten beiden Zeitpunkte haben nur eine Art
+        for step in range(5):
+            at = NOW - timedelta(hours=step)
+            kinds = ("order", "contact", "order") if step < 3 else (("order",) if step == 3 else ("contact",))
+            for kind in kinds:
+                if kind == "order":
+                    order = Order(customer_id=1, order_number=f"B-{len(expected)}", order_date=at,
+                                  status="offen", total_amount_cents=500, currency="EUR")
+                    db.session.add(order)
+                    db.session.flush()
+                    db.session.add(OrderItem(order_id=order.id, product_id=1, quantity=2, unit_price_cents=250))
+                    expected.append((at, "order", order.id))
+                else:
+                    contact = Contact(customer_id=1, user_id=1, channel="phone", subject="Anruf", contact_at=at)
+                    db.session.add(contact)
+                    db.session.flush()
+                    expected.append((at, "contact", contact.id))
+        # anderer Kunde zum selben Zeitpunkt – darf nie auftauchen
+        db.session.add(Order(customer_id=2, order_number="X-1", order_date=NOW, status="offen"))
+        db.session.add(Contact(customer_id=2, channel="mail", subject="fremd", contact_at=NOW))
+        db.session.commit()
+    return sorted(expected, reverse=True)
+
+
+def _all_pages(limit, **kwargs):
+    pages, before = [], None
+    while True:
+        entries, before = customer_timeline(1, before=before, limit=limit, **kwargs)
+        pages.append(entries)
+        if before is None:
+            return pages
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 4, 11, 12, 50])
+def test_pages_cover_every_event_once_in_order(app, timeline, limit):
+    with app.app_context():
+        pages = _all_pages(limit)
+
+    keys = [(entry.at, entry.kind, entry.id) for page in pages for entry in page]
+    assert keys == timeline
+    assert all(len(page) == limit for page in pages[:-1])
+    assert 0 < len(pages[-1]) <= limit
+
+
+def test_no_next_cursor_when_last_page_is_exactly_full(app, timeline):
+    with app.app_context():
+        entries, next_before = customer_timeline(1, limit=len(timeline))
+
+    assert len(entries) == len(timeline)
+    assert next_before is None
+
+
+def test_cursor_between_kinds_at_the_same_time(app, timeline):
+    """Cursor auf dem Kontakt eines Zeitpunkts: die Bestellungen desselben Zeitpunkts folgen noch."""
+    cursor = next(i for i, key in enumerate(timeline) if key[1] == "contact")
+    with app.app_context():
+        first, _ = customer_timeline(1, limit=cursor + 1)
+        rest, _ = customer_timeline(1, before=first[-1].cursor, limit=50)
+
+    assert first[-1].kind == "contact"
+    assert [(e.at, e.kind, e.id) for e in rest] == timeline[cursor + 1:]
+
+
+def test_date_range_and_fields(app, timeline):
+    with app.app_context():
+        entries, next_before = customer_timeline(
+            1, limit=50, date_from=NOW - timedelta(hours=1), date_to=NOW - timedelta(hours=1)
+        )
+
+    assert next_before is None
+    assert [(e.at, e.kind, e.id) for e in entries] == [key for key in timeline if key[0] == NOW - timedelta(hours=1)]
+    order = next(e for e in entries if e.kind == "order")
+    assert order.positions == 1 and str(order.total) == "5,00 €"
+    contact = next(e for e in entries if e.kind == "contact")
+    assert contact.username == "test@firma.com" and contact.total is None
+
+
+def test_broken_cursor_starts_at_the_first_page(app, timeline):
+    with app.app_context():
+        entries, _ = customer_timeline(1, before="kaputt", limit=3)
+
+    assert [(e.at, e.kind, e.id) for e in entries] == timeline[:3]
@@ -0,0 +1,68 @@
+"""Read-Replicas: ``@read_replica``-Views lesen von ``replica_1``, außer sie ist ausgefallen
+oder der User hat gerade selbst geschrieben (``replicas.py``)."""
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import replicas
+from models import db, Customer, User
+
+
+@pytest.fixture
+def replica_app(app_factory, tmp_path):
+    """Primary und ``replica_1`` als getrennte SQLite-Dateien – am Firmennamen sieht man, wer gelesen hat."""
+    app = app_factory(
+        SQLALCHEMY_BINDS={"replica_1": f"sqlite:///{tmp_path / 'replica.db'}"},
+        REPLICA_CHECK_INTERVAL=0,
+        REPLICA_RETRY_AFTER=30,
+        REPLICA_STICKY_SECONDS=60,
+    )
+    with app.app_context():
+        replica = db.engines["replica_1"]
+        db.metadata.create_all(replica)
+        db.session.add_all([User(id=1, username="test@firma.com", password_hash="x"), Customer(company="Primary GmbH")])
+        db.session.commit()
+        with replica.begin() as conn:
+            conn.execute(User.__table__.insert(), {"id": 1, "username": "test@firma.com", "password_hash": "x"})
+            conn.execute(Customer.__table__.insert(), {"company": "Replica GmbH"})
+    return app
+
+
+@pytest.fixture
+def client(replica_app):
+    client = replica_app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = "1"
+        session["_fresh"] = True
+    return client
+
+
+def _read_from(client) -> str:
+    body = client.get("/customers").get_data(as_text=True)
+    return "replica" if "Replica GmbH" in body else "primary" if "Primary GmbH" in body else "?"
+
+
+def test_get_reads_from_the_replica(client):
+    assert _read_from(client) == "replica"
+
+
+def test_replica_marked_down_is_skipped_until_retry_after(replica_app, client, monkeypatch):
+    now = time.monotonic()
+    monkeypatch.setattr(replicas, "time", SimpleNamespace(monotonic=lambda: now, time=time.time))
+    replica_app.extensions["replicas"].mark_down("replica_1")
+
+    now += 29
+    assert _read_from(client) == "primary"
+    now += 2
+    assert _read_from(client) == "replica"
+
+
+def test_request_after_a_commit_reads_from_the_primary(client):
+    response = client.post("/customers/new", data={"company": "Neu AG", "ignore_duplicates": "1"})
+    assert response.status_code == 302
+    with client.session_transaction() as session:
+        assert session[replicas.STICKY_KEY] > time.time()
+
+    body = client.get("/customers").get_data(as_text=True)
+    assert "Neu AG" in body and "Replica GmbH" not in body
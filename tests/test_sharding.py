@@ -0,0 +1,180 @@
+"""``shard_page()``: k-Wege-Merge über alle Shards mit Keyset-Cursor (Wert, Shard, ID)."""
+import pytest
+from sqlalchemy import select
+
+from models import db, Customer
+from read_models import CustomerRow
+from sharding import on_shard, shard_count, shard_page
+
+# Gleiche Firmennamen auf verschiedenen Shards: die Reihenfolge entscheidet dann Shard, danach ID
+COMPANIES = ["Beta", "Alpha", "Beta", "Delta", "Beta", "Alpha", "Gamma", "Beta", "Epsilon", "Alpha", "Zeta"]
+
+
+@pytest.fixture
+def customers(sharded_app):
+    """Kunden reihum auf die Shards verteilt; erwartete Reihenfolge ``[(Firma, Shard, ID)]``."""
+    keys = []
+    with sharded_app.test_request_context():
+        assert shard_count() == 3
+        for i, company in enumerate(COMPANIES):
+            customer_id, shard = i + 1, i % 3
+            with on_shard(shard):
+                db.session.add(Customer(id=customer_id, company=company))
+                db.session.commit()
+            keys.append((company, shard, customer_id))
+    return sorted(keys)
+
+
+def _pages(per_page, descending=False, into=None):
+    """Blättert vorwärts bis zum Ende; gibt alle Seiten als ``ShardPage`` zurück."""
+    stmt = select(Customer) if into is None else CustomerRow.query()
+    pages, after = [], None
+    while True:
+        page = shard_page(stmt, Customer.company, Customer.id, per_page,
+                          after=after, descending=descending, into=into)
+        pages.append(page)
+        if not page.has_next:
+            return pages
+        after = page.next_cursor
+
+
+def _ids(page):
+    return [row.id for row in page.items]
+
+
+@pytest.mark.parametrize("per_page", [1, 3, 4, len(COMPANIES), 50])
+def test_forward_paging_returns_every_row_once_in_order(sharded_app, customers, per_page):
+    with sharded_app.test_request_context():
+        pages = _pages(per_page)
+
+    assert [row_id for page in pages for row_id in _ids(page)] == [key[2] for key in customers]
+    assert all(len(page.items) == per_page for page in pages[:-1])
+    assert not pages[0].has_prev
+    assert all(page.has_prev for page in pages[1:])
+    assert not pages[-1].has_next
+
+
+@pytest.mark.parametrize("per_page", [2, 3, 5])
+def test_backward_paging_returns_the_same_pages(sharded_app, customers, per_page):
+    with sharded_app.test_request_context():
+        forward = _pages(per_page)
+        backward, before = [forward[-1]], forward[-1].prev_cursor
+        while backward[-1].has_prev:
+            page = shard_page(select(Customer), Customer.company, Customer.id, per_page, before=before)
+            backward.append(page)
+            before = page.prev_cursor
+
+    # Rückwärts sind die Seiten vom Ende her gefüllt – zusammen ergeben sie dieselbe Folge
+    assert [row_id for page in reversed(backward) for row_id in _ids(page)] == [key[2] for key in customers]
+    assert not backward[-1].has_prev
+    assert all(page.has_next for page in backward[1:])
+
+
+def test_descending_with_read_model_rows(sharded_app, customers):
+    with sharded_app.test_request_context():
+        pages = _pages(4, descending=True, into=CustomerRow)
+
+    rows = [row for page in pages for row in page.items]
+    assert all(isinstance(row, CustomerRow) for row in rows)
+    assert [row.id for row in rows] == [key[2] for key in reversed(customers)]
+
+
+def test_cursor_ties_on_value_and_shard(sharded_app, customers):
+    """Cursor mitten in einer Gruppe gleicher Werte: weder Zeilen doppelt noch ausgelassen."""
+    betas = [key for key in customers if key[0] == "Beta"]
+    with sharded_app.test_request_context():
+        first = shard_page(
+            select(Customer).where(Customer.company == "Beta"), Customer.company, Customer.id, 2
+        )
+        rest = shard_page(
+            select(Customer).where(Customer.company == "Beta"), Customer.company, Customer.id, 10,
+            after=first.next_cursor,
+        )
+
+    assert _ids(first) + _ids(rest) == [key[2] for key in betas]
+    assert not rest.has_next
+
+
+def test_broken_cursor_starts_at_the_first_page(sharded_app, customers):
+    with sharded_app.test_request_context():
+        page = shard_page(select(Customer), Customer.company, Customer.id, 3, after="kaputt!")
+
+    assert _ids(page) == [key[2] for key in customers[:3]]
+    assert not page.has_prev
+
+
+def test_empty_result(sharded_app, customers):
+    with sharded_app.test_request_context():
+        page = shard_page(
+            select(Customer).where(Customer.company == "Omega"), Customer.company, Customer.id, 3
+        )
+
+    assert page.items == []
+    assert not page.has_prev and not page.has_next
+    assert page.next_cursor is None and page.prev_cursor is None
+
+
+def test_distribute_gives_moved_children_new_ids(sharded_app):
+    """Bestellungen, Positionen und Kontakte kollidieren auf dem Ziel nicht mit dessen IDs."""
+    from sharding import distribute, shard_engines
+    from models import CustomerShard, Order, OrderItem, Product, Contact
+
+    with sharded_app.test_request_context():
+        db.session.add(Product(id=1, sku="P-1", name="Produkt", unit_price_cents=500))
+        for customer_id in range(1, 7):
+            db.session.add(Customer(id=customer_id, company=f"Firma {customer_id}"))
+            db.session.add(Order(id=customer_id, customer_id=customer_id, order_number=f"B-{customer_id}",
+                                 status="offen", total_amount_cents=500 * customer_id))
+            db.session.add(OrderItem(order_id=customer_id, product_id=1, quantity=customer_id,
+                                     unit_price_cents=500))
+            db.session.add(Contact(id=customer_id, customer_id=customer_id, channel="phone", subject="Anruf"))
+        db.session.add(CustomerShard(customer_id=100, shard=1))
+        db.session.commit()
+        with on_shard(1):
+            # belegt auf Shard 1 die IDs, die die umziehenden Kunden auf Shard 0 haben
+            db.session.add(Customer(id=100, company="Bestand"))
+            db.session.add(Order(id=1, customer_id=100, order_number="B-100", status="offen"))
+            db.session.add(OrderItem(id=1, order_id=1, product_id=1, quantity=1, unit_price_cents=500))
+            db.session.add(Contact(id=1, customer_id=100, channel="mail", subject="Bestand"))
+            db.session.commit()
+
+        moved = distribute(log=lambda message: None)
+        assert moved == {0: 0, 1: 2, 2: 2}
+
+        orders = 0
+        for shard, engine in enumerate(shard_engines()):
+            with engine.connect() as conn:
+                rows = conn.execute(
+                    select(Customer.id, Order.order_number, OrderItem.quantity)
+                    .join(Order, Order.customer_id == Customer.id)
+                    .join(OrderItem, OrderItem.order_id == Order.id)
+                ).all()
+                contacts = conn.execute(select(Contact.customer_id, Contact.subject)).all()
+            for customer_id, order_number, quantity in rows:
+                assert customer_id % 3 == shard
+                assert order_number == f"B-{customer_id}"
+                assert quantity == (1 if customer_id == 100 else customer_id)
+            assert sorted(c for c, _ in contacts) == sorted(c for c, _, _ in rows)
+            orders += len(rows)
+        assert orders == 7
+
+
+def test_new_customer_ids_are_spread_by_modulo(sharded_app):
+    """Ein INSERT plus höchstens ein UPDATE auf ``customer_shards`` – kein Zählen aller Kunden je Shard."""
+    from sqlalchemy import event
+    from sharding import allocate_customer_id
+    from models import CustomerShard
+
+    statements = []
+
+    def record(conn, cursor, sql, *args):
+        statements.append(sql)
+
+    with sharded_app.app_context():
+        event.listen(db.engine, "before_cursor_execute", record)
+        allocated = [allocate_customer_id() for _ in range(6)]
+        event.remove(db.engine, "before_cursor_execute", record)
+
+        assert allocated == [(i, i % 3) for i in range(1, 7)]
+        assert dict(db.session.execute(select(CustomerShard.customer_id, CustomerShard.shard)).all()) == dict(allocated)
+    assert not [sql for sql in statements if "count(" in sql.lower() or "group by" in sql.lower()]
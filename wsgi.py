@@ -0,0 +1,75 @@
+"""Produktions-Einstiegspunkt.
+
+gunicorn (Linux, Konfiguration in ``gunicorn.conf.py``)::
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+waitress (z. B. Windows, ohne fork)::
+
+    python wsgi.py
+
+Die App wird einmal erzeugt und vor dem ersten Request "aufgewärmt":
+Connection-Pool gefüllt, alle Templates kompiliert, Kunden-Suchindex aufgebaut.
+"""
+import os
+
+from app import create_app
+
+
+def warm_pool(app, connections: int | None = None) -> None:
+    """Öffnet je Engine ``connections`` DB-Verbindungen gleichzeitig und gibt sie an den Pool zurück."""
+    from sqlalchemy import text
+    from models import db
+
+    with app.app_context():
+        for engine in db.engines.values():  # Primary + Read-Replicas
+            count = connections
+            if count is None:
+                # QueuePool: size(); SQLite/NullPool haben keine feste Größe
+                count = getattr(engine.pool, "size", lambda: 1)()
+            opened = []
+            try:
+                for _ in range(count):
+                    conn = engine.connect()
+                    conn.execute(text("SELECT 1"))
+                    opened.append(conn)
+            finally:
+                for conn in opened:
+                    conn.close()
+
+
+def warm_templates(app) -> int:
+    """Kompiliert alle Templates in den Jinja-Cache."""
+    env = app.jinja_env
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
+def warmup(app) -> None:
+    from suggest import build_index
+
+    warm_templates(app)
+    warm_pool(app)
+    build_index(app)  # Kunden-Suchindex – bei preload_app einmal im Master, von den Workern geteilt
+
+
+application = create_app()
+warmup(application)
+
+
+if __name__ == "__main__":
+    from waitress import serve
+
+    from login_guard import start_hash_pool
+
+    start_hash_pool(application)
+
+    # ein Prozess – Parallelität nur über Threads
+    serve(
+        application,
+        host=os.environ.get("HOST", "0.0.0.0"),
+        port=int(os.environ.get("PORT", "8000")),
+        threads=int(os.environ.get("WEB_THREADS", (os.cpu_count() or 1) * 4)),
+    )